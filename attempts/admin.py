@@ -1,3 +1,61 @@
+import time
+
 from django.contrib import admin
+from django.utils import timezone
+
+from . import answer_buffer, channel
+from .models import Attempt, ItemStat, ScoreStat
+
+ONLINE_SECONDS = 60
+
+
+@admin.register(Attempt)
+class AttemptAdmin(admin.ModelAdmin):
+    list_display = ("id", "mock", "user", "status", "current_section", "section_deadline", "started_at", "online")
+    list_filter = ("status", "current_section", "mock")
+    list_select_related = ("mock", "user")
+    raw_id_fields = ("user",)
+    readonly_fields = ("started_at",)
+    actions = ["terminate_attempts"]
+
+    @admin.display(boolean=True, description="Online")
+    def online(self, obj):
+        # oxirgi heartbeat yoki ochiq exam kanali (attempts/channel.py)
+        seen = channel.last_seen([obj.id]).get(obj.id)
+        return seen is not None and time.time() - seen < ONLINE_SECONDS
+
+    @admin.action(description="Terminate selected attempts (proctor)")
+    def terminate_attempts(self, request, queryset):
+        """Davom etayotgan attemptlarni yakunlaydi; ochiq kanal nomzod sahifasini darhol yopadi."""
+        attempts = list(queryset.filter(status="in_progress"))
+        for attempt in attempts:
+            answer_buffer.flush_attempt(attempt.id)
+            attempt.status = "terminated"
+            attempt.finished_at = timezone.now()
+        Attempt.objects.bulk_update(attempts, ["status", "finished_at"])
+        channel.publish_attempts(attempts)
+        self.message_user(request, f"{len(attempts)} attempt(s) terminated.")
+
+
+@admin.register(ItemStat)
+class ItemStatAdmin(admin.ModelAdmin):
+    list_display = ("question_id", "section", "test_id", "attempts", "p_value", "discrimination", "blank")
+    list_filter = ("section",)
+    search_fields = ("=test_id", "=question_id")
+    readonly_fields = [f.name for f in ItemStat._meta.fields]
+
+    @admin.display(description="p-value")
+    def p_value(self, obj):
+        return None if obj.p_value is None else round(obj.p_value, 3)
+
+    @admin.display(description="Discrimination")
+    def discrimination(self, obj):
+        return None if obj.discrimination is None else round(obj.discrimination, 3)
+
 
-# Register your models here.
+@admin.register(ScoreStat)
+class ScoreStatAdmin(admin.ModelAdmin):
+    list_display = ("mock", "section", "raw", "count")
+    list_filter = ("section", "mock")
+    list_select_related = ("mock",)
+    readonly_fields = ("mock", "section", "raw", "count")
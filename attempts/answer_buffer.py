@@ -0,0 +1,232 @@
+"""
+Write-behind answer buffer (ixtiyoriy, settings.ANSWER_WRITE_BEHIND).
+
+Autosave javoblari DB ga emas, Django cache ga (settings.ANSWER_BUFFER_CACHE) yoziladi.
+Har save alohida kalitga tushadi — read-modify-write yo'q, faqat atomik incr/add:
+
+    answer-buffer:<section>:<attempt_id>:gen        joriy avlod (flush oshiradi)
+    answer-buffer:<section>:<attempt_id>:base       eng eski hali DB ga yozilmagan avlod
+    answer-buffer:<section>:<attempt_id>:<gen>:n    avloddagi batchlar soni (incr)
+    answer-buffer:<section>:<attempt_id>:<gen>:<i>  i-batch: {qid: response}
+    answer-buffer:<section>:<attempt_id>:<gen>:since  avloddagi birinchi javob vaqti (add)
+
+Save: i = incr(<gen>:n), batch <gen>:<i> ga yoziladi, keyin gen qayta o'qiladi — orada
+flush avlodni almashtirgan bo'lsa batch yangi avlodga qayta yoziladi (eski avlod flush
+ichida o'qilgan bo'lmasligi mumkin). Bir avlod ichida keyingi batch yutadi.
+
+Flush qachon bo'ladi:
+  - save request ichida, agar avloddagi eng eski javob ANSWER_BUFFER_FLUSH_SECONDS dan eski bo'lsa;
+  - `manage.py flush_answer_buffer` (cron yoki --loop) — barcha in_progress attemptlar;
+  - majburiy: *_submit, *_terminate va mock_start (oldingi attempt) da, baholashdan oldin.
+
+Flush attempt bo'yicha lock (cache.add) ostida: avval gen oshiriladi (yangi saqlashlar
+yangi avlodga tushadi), keyin base..gen-1 avlodlari o'qiladi va DB ga yoziladi, shundan
+keyingina base suriladi va eski kalitlar o'chiriladi. Majburiy flush lock ni kutadi
+(boshqa flush yozib bo'lgach baholanadi), cron flush band attemptni o'tkazib yuboradi.
+
+Crash-safety:
+  - DB ga yozish (idempotent upsert) muvaffaqiyatsiz bo'lsa base surilmaydi — keyingi
+    flush o'sha avlodlarni qayta o'qiydi va yozadi.
+  - Flush paytida kelgan javoblar yangi avlodda qoladi, o'chirilmaydi.
+  - Yo'qotish chegarasi backendga bog'liq: locmem da process yiqilsa oxirgi
+    ANSWER_BUFFER_FLUSH_SECONDS dagi javoblar yo'qoladi; file/redis backend processdan
+    tashqarida saqlaydi, server qayta ishga tushsa ham flush qilinadi.
+
+Metrikalar: buffer_metrics() — depth (flush kutayotgan javob yozuvlari), flushlar soni,
+oxirgi/maksimal flush latency (ms). Ular ham shu cache da saqlanadi.
+"""
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+DEPTH_KEY = "answer-buffer:depth"
+METRICS_KEY = "answer-buffer:metrics"
+LOCK_SECONDS = 30
+LOCK_POLL_SECONDS = 0.05
+# batch kalitlari: flush bilan poyga bo'lgan save qayta yozgan eski nusxa shu vaqtda o'chadi
+ENTRY_TIMEOUT = 7 * 24 * 3600
+
+
+def is_enabled() -> bool:
+    return getattr(settings, "ANSWER_WRITE_BEHIND", False)
+
+
+def _cache():
+    return caches[getattr(settings, "ANSWER_BUFFER_CACHE", "default")]
+
+
+def _flush_seconds() -> float:
+    return getattr(settings, "ANSWER_BUFFER_FLUSH_SECONDS", 10)
+
+
+def _key(section: str, attempt_id: int, *parts) -> str:
+    return ":".join(["answer-buffer", section, str(attempt_id), *map(str, parts)])
+
+
+def _incr(cache, key: str, delta: int = 1, timeout=ENTRY_TIMEOUT) -> int:
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, timeout=timeout)
+        return cache.incr(key, delta)
+
+
+def _add_depth(cache, delta: int) -> None:
+    if delta:
+        _incr(cache, DEPTH_KEY, delta, timeout=None)
+
+
+def buffer_answers(section: str, attempt_id: int, answers: dict) -> None:
+    """answers: {question_id: response}. Oxirgi yozilgan qiymat yutadi."""
+    cache = _cache()
+    now = time.time()
+    gen_key = _key(section, attempt_id, "gen")
+
+    gen = cache.get(gen_key, 0)
+    while True:
+        n = _incr(cache, _key(section, attempt_id, gen, "n"))
+        cache.set(_key(section, attempt_id, gen, n), answers, timeout=ENTRY_TIMEOUT)
+        cache.add(_key(section, attempt_id, gen, "since"), now, timeout=ENTRY_TIMEOUT)
+        current = cache.get(gen_key, 0)
+        if current == gen:
+            break
+        gen = current  # flush avlodni almashtirdi: batch yangi avlodga qayta yoziladi
+    _add_depth(cache, len(answers))
+
+    since = cache.get(_key(section, attempt_id, gen, "since"), now)
+    if now - since >= _flush_seconds():
+        flush(section, [attempt_id])
+
+
+def _read(cache, section: str, gens: dict) -> tuple[dict, list, int]:
+    """
+    gens: {attempt_id: range(avlodlar)}.
+    Qaytaradi: ({attempt_id: {qid: response}}, avlodlar kalitlari, javob yozuvlari soni).
+    Avlodlar va batchlar tartibida birlashtiriladi — keyingisi yutadi.
+    """
+    count_keys = [_key(section, a, g, "n") for a, rng in gens.items() for g in rng]
+    counts = cache.get_many(count_keys)
+    batch_keys = {
+        a: [_key(section, a, g, i) for g in rng for i in range(1, counts.get(_key(section, a, g, "n"), 0) + 1)]
+        for a, rng in gens.items()
+    }
+    batches = cache.get_many([k for keys in batch_keys.values() for k in keys])
+
+    merged = {}
+    for a, keys in batch_keys.items():
+        answers = {}
+        for k in keys:
+            answers.update(batches.get(k, {}))
+        if answers:
+            merged[a] = answers
+    since_keys = [_key(section, a, g, "since") for a, rng in gens.items() for g in rng]
+    depth = sum(len(batch) for batch in batches.values())
+    return merged, [*batches, *count_keys, *since_keys], depth
+
+
+def _marks(cache, section: str, attempt_ids) -> dict:
+    """{attempt_id: (base, gen)}."""
+    found = cache.get_many([_key(section, a, m) for a in attempt_ids for m in ("base", "gen")])
+    return {a: (found.get(_key(section, a, "base"), 0), found.get(_key(section, a, "gen"), 0)) for a in attempt_ids}
+
+
+def peek(section: str, attempt_id: int) -> dict:
+    """Hali DB ga yozilmagan javoblar: {question_id: response}."""
+    cache = _cache()
+    base, gen = _marks(cache, section, [attempt_id])[attempt_id]
+    merged, _, _ = _read(cache, section, {attempt_id: range(base, gen + 1)})
+    return merged.get(attempt_id, {})
+
+
+def _lock(cache, section: str, attempt_ids, wait: bool) -> list:
+    deadline = time.monotonic() + (LOCK_SECONDS if wait else 0)
+    locked, waiting = [], list(attempt_ids)
+    while True:
+        for attempt_id in waiting:
+            if cache.add(_key(section, attempt_id, "lock"), 1, timeout=LOCK_SECONDS):
+                locked.append(attempt_id)
+        waiting = [a for a in waiting if a not in locked]
+        if not waiting or time.monotonic() >= deadline:
+            if waiting:
+                logger.warning("answer buffer flush: %s %s still locked, skipped", section, waiting)
+            return locked
+        time.sleep(LOCK_POLL_SECONDS)
+
+
+def flush(section: str, attempt_ids, wait: bool = True) -> int:
+    """
+    Berilgan attemptlar bufferini DB ga yozadi (bitta bulk upsert) va bufferni tozalaydi.
+    wait=False: boshqa flush band qilgan attemptlar kutilmaydi (cron). Yozilgan javoblar sonini qaytaradi.
+    """
+    from .answers import write_answers
+
+    cache = _cache()
+    attempt_ids = list(attempt_ids)
+    if not attempt_ids:
+        return 0
+
+    started = time.perf_counter()
+    # bo'sh bufferlar lock siz o'tkazib yuboriladi: eski avlod yo'q va joriy avlodda batch yo'q
+    marks = _marks(cache, section, attempt_ids)
+    current = cache.get_many([_key(section, a, gen, "n") for a, (_, gen) in marks.items()])
+    pending = [a for a, (base, gen) in marks.items() if base < gen or _key(section, a, gen, "n") in current]
+    if not pending:
+        return 0
+
+    locked = _lock(cache, section, pending, wait)
+    try:
+        gens = {}
+        for attempt_id, (base, _) in _marks(cache, section, locked).items():
+            # shu paytdan keyingi saqlashlar yangi avlodga tushadi
+            gens[attempt_id] = range(base, _incr(cache, _key(section, attempt_id, "gen"), timeout=None))
+        merged, keys, depth = _read(cache, section, gens)
+
+        written = write_answers(section, merged) if merged else 0
+
+        # DB ga yozildi — endi avlodlar bufferdan olib tashlanadi
+        cache.set_many({_key(section, a, "base"): rng.stop for a, rng in gens.items()}, timeout=None)
+        cache.delete_many(keys)
+        _add_depth(cache, -depth)
+    finally:
+        cache.delete_many([_key(section, a, "lock") for a in locked])
+
+    _record_flush(cache, written, (time.perf_counter() - started) * 1000)
+    return written
+
+
+def flush_attempt(attempt_id: int, sections=("listening", "reading")) -> int:
+    """Submit/terminate oldidan majburiy flush (write-behind o'chiq bo'lsa no-op)."""
+    if not is_enabled():
+        return 0
+    return sum(flush(section, [attempt_id]) for section in sections)
+
+
+async def aflush_attempt(attempt_id: int, sections=("listening", "reading")) -> int:
+    if not is_enabled():
+        return 0
+    return await sync_to_async(flush_attempt)(attempt_id, sections)
+
+
+def _record_flush(cache, written: int, elapsed_ms: float) -> None:
+    metrics = cache.get(METRICS_KEY) or {
+        "flushes": 0, "flushed_answers": 0, "last_flush_ms": 0.0, "max_flush_ms": 0.0,
+    }
+    metrics["flushes"] += 1
+    metrics["flushed_answers"] += written
+    metrics["last_flush_ms"] = round(elapsed_ms, 3)
+    metrics["max_flush_ms"] = max(metrics["max_flush_ms"], round(elapsed_ms, 3))
+    cache.set(METRICS_KEY, metrics, timeout=None)
+    logger.info("answer buffer flush: %d answers in %.1f ms", written, elapsed_ms)
+
+
+def buffer_metrics() -> dict:
+    cache = _cache()
+    metrics = cache.get(METRICS_KEY) or {
+        "flushes": 0, "flushed_answers": 0, "last_flush_ms": 0.0, "max_flush_ms": 0.0,
+    }
+    return {"depth": max(cache.get(DEPTH_KEY, 0), 0), **metrics}
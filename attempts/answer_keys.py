@@ -0,0 +1,161 @@
+"""
+Test bo'yicha kompilyatsiya qilingan answer key.
+
+JSON answer_key lar har baholashda qayta o'qilmaydi: test bir marta kompilyatsiya
+qilinadi (normalizatsiya qilingan javoblar set, mcq_multi uchun bitmask, so'z limiti)
+va process ichida keshlanadi. Kesh test.content_version bo'yicha tekshiriladi —
+admin savol/variantni o'zgartirsa versiya oshadi (listening/reading signals.py).
+"""
+from asgiref.sync import sync_to_async
+from django.apps import apps
+
+
+def normalize(value, case_sensitive: bool = False) -> str:
+    text = " ".join(str(value or "").split())
+    return text if case_sensitive else text.lower()
+
+
+class CompiledQuestion:
+    __slots__ = ("qid", "order", "qtype", "accepted", "case_sensitive", "max_words", "bits", "mask")
+
+    def __init__(self, qid, order, qtype, answer_key, option_keys=()):
+        answer_key = answer_key or {}
+        self.qid = qid
+        self.order = order
+        self.qtype = qtype
+        self.case_sensitive = bool(answer_key.get("case_sensitive", False))
+        max_words = answer_key.get("max_words")
+        self.max_words = int(max_words) if max_words else 0
+        self.bits = {}
+        self.mask = 0
+
+        if qtype == "short":
+            self.accepted = frozenset(
+                normalize(v, self.case_sensitive) for v in answer_key.get("values", []) if normalize(v)
+            )
+        elif qtype == "mcq_multi":
+            expected = {normalize(v) for v in answer_key.get("values", []) if normalize(v)}
+            keys = sorted({normalize(k) for k in option_keys} | expected)
+            self.bits = {k: 1 << i for i, k in enumerate(keys)}
+            self.mask = sum(self.bits[k] for k in expected)
+            self.accepted = frozenset(expected)
+        else:
+            value = normalize(answer_key.get("value"))
+            self.accepted = frozenset([value]) if value else frozenset()
+
+    def check(self, response: dict) -> bool:
+        response = response or {}
+
+        if self.qtype == "short":
+            given = normalize(response.get("text", response.get("value", "")), self.case_sensitive)
+            if not given:
+                return False
+            if self.max_words and given.count(" ") + 1 > self.max_words:
+                return False
+            return given in self.accepted
+
+        if self.qtype == "mcq_multi":
+            if not self.mask:
+                return False
+            mask = 0
+            for v in response.get("values", ()):
+                bit = self.bits.get(normalize(v))
+                if bit is None:
+                    return False  # variantlarda yo'q javob
+                mask |= bit
+            return mask == self.mask
+
+        # tfng, yesno, mcq_single, matching, map, heading
+        return normalize(response.get("value")) in self.accepted
+
+
+class CompiledAnswerKey:
+    def __init__(self, section: str, test_id: int, version: int, questions):
+        self.section = section
+        self.test_id = test_id
+        self.version = version
+        self.questions = {q.qid: q for q in questions}
+        self.total = len(self.questions)
+
+    @property
+    def question_ids(self):
+        return self.questions.keys()
+
+    def check(self, qid, response) -> bool:
+        q = self.questions.get(qid)
+        return bool(q) and q.check(response)
+
+    def score(self, responses: dict) -> int:
+        """responses: {question_id: response}."""
+        questions = self.questions
+        return sum(1 for qid, r in responses.items() if qid in questions and questions[qid].check(r))
+
+
+# (section, test_id) -> CompiledAnswerKey
+_cache = {}
+
+
+def compile_answer_key(section: str, test_id: int, version: int) -> CompiledAnswerKey:
+    from .scoring import SECTIONS
+
+    _, question_label, option_label, _, _ = SECTIONS[section]
+    question_model = apps.get_model(question_label)
+    option_model = apps.get_model(option_label)
+
+    option_keys = {}
+    for qid, key in (
+        option_model.objects
+        .filter(question__test_id=test_id, question__qtype="mcq_multi")
+        .values_list("question_id", "key")
+    ):
+        option_keys.setdefault(qid, []).append(key)
+
+    questions = [
+        CompiledQuestion(qid, order, qtype, answer_key, option_keys.get(qid, ()))
+        for qid, order, qtype, answer_key in (
+            question_model.objects
+            .filter(test_id=test_id)
+            .values_list("id", "order", "qtype", "answer_key")
+        )
+    ]
+    return CompiledAnswerKey(section, test_id, version, questions)
+
+
+def get_answer_key(section: str, test_id: int, version: int) -> CompiledAnswerKey:
+    """Keshdan oladi; versiya mos kelmasa qayta kompilyatsiya qiladi."""
+    compiled = _cache.get((section, test_id))
+    if compiled is None or compiled.version != version:
+        compiled = compile_answer_key(section, test_id, version)
+        _cache[(section, test_id)] = compiled
+    return compiled
+
+
+def answer_key_for_test(section: str, test) -> CompiledAnswerKey:
+    return get_answer_key(section, test.id, test.content_version)
+
+
+def answer_key_for_test_id(section: str, test_id: int) -> CompiledAnswerKey:
+    """
+    Autosave yo'li uchun: keshda bo'lsa versiyani tekshirmasdan qaytaradi (DB ga murojaat yo'q).
+    Savollar ro'yxatini tekshirish uchun yetarli; baholash esa har doim versiyani tekshiradi.
+    """
+    compiled = _cache.get((section, test_id))
+    if compiled is None:
+        from .scoring import SECTIONS
+
+        test_model = apps.get_model(SECTIONS[section][0])
+        version = test_model.objects.values_list("content_version", flat=True).get(id=test_id)
+        compiled = get_answer_key(section, test_id, version)
+    return compiled
+
+
+async def aanswer_key_for_test_id(section: str, test_id: int) -> CompiledAnswerKey:
+    """Async autosave uchun: kesh issiq bo'lsa thread ga o'tilmaydi."""
+    compiled = _cache.get((section, test_id))
+    if compiled is None:
+        compiled = await sync_to_async(answer_key_for_test_id)(section, test_id)
+    return compiled
+
+
+def clear_cache():
+    _cache.clear()
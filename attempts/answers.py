@@ -0,0 +1,113 @@
+"""
+Listening/Reading javoblarini batch holda saqlash uchun umumiy yordamchilar.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+
+from . import answer_buffer
+
+MAX_BATCH_ANSWERS = 100
+
+
+def parse_answer_batch(body: bytes) -> dict | None:
+    """
+    Body: {"answers": [{"question_id": 12, "value": "...", "client_seq": 7}, ...]}
+
+    Qaytaradi: {question_id: (client_seq, value)} yoki noto'g'ri body bo'lsa None.
+    Bitta savol bir necha marta kelsa eng katta client_seq (teng bo'lsa oxirgisi) olinadi.
+    """
+    try:
+        items = json.loads(body or b"{}")["answers"]
+    except (ValueError, KeyError, TypeError):
+        return None
+    if not isinstance(items, list) or len(items) > MAX_BATCH_ANSWERS:
+        return None
+
+    latest = {}
+    for item in items:
+        if not isinstance(item, dict):
+            return None
+        try:
+            qid = int(item["question_id"])
+            seq = int(item.get("client_seq") or 0)
+        except (KeyError, TypeError, ValueError):
+            return None
+        value = item.get("value", "")
+        if isinstance(value, list):
+            value = ",".join(map(str, value))
+        elif not isinstance(value, str):
+            value = str(value)
+        if qid not in latest or seq >= latest[qid][0]:
+            latest[qid] = (seq, value)
+    return latest
+
+
+def _answer_rows(section: str, answers_by_attempt: dict):
+    from .scoring import SECTIONS
+
+    answer_model = apps.get_model(SECTIONS[section][3])
+    rows = [
+        answer_model(attempt_id=attempt_id, question_id=qid, response=response)
+        for attempt_id, answers in answers_by_attempt.items()
+        for qid, response in answers.items()
+    ]
+    return answer_model, rows
+
+
+UPSERT_OPTIONS = {
+    "batch_size": 1000,
+    "update_conflicts": True,
+    "unique_fields": ["attempt", "question"],
+    "update_fields": ["response", "updated_at"],
+}
+
+
+def write_answers(section: str, answers_by_attempt: dict) -> int:
+    """
+    {attempt_id: {question_id: response}} ni bitta INSERT ... ON CONFLICT DO UPDATE
+    bilan yozadi ((attempt, question) unique). Yozilgan qatorlar sonini qaytaradi.
+    """
+    answer_model, rows = _answer_rows(section, answers_by_attempt)
+    if rows:
+        answer_model.objects.bulk_create(rows, **UPSERT_OPTIONS)
+    return len(rows)
+
+
+async def awrite_answers(section: str, answers_by_attempt: dict) -> int:
+    answer_model, rows = _answer_rows(section, answers_by_attempt)
+    if rows:
+        await answer_model.objects.abulk_create(rows, **UPSERT_OPTIONS)
+    return len(rows)
+
+
+def store_answers(section: str, attempt_id: int, answers: dict) -> None:
+    """
+    View lar shu orqali saqlaydi: write-behind yoqilgan bo'lsa javoblar bufferga tushadi
+    (attempts.answer_buffer), aks holda darhol DB ga yoziladi.
+    """
+    if answer_buffer.is_enabled():
+        answer_buffer.buffer_answers(section, attempt_id, answers)
+    else:
+        write_answers(section, {attempt_id: answers})
+
+
+async def astore_answers(section: str, attempt_id: int, answers: dict) -> None:
+    if answer_buffer.is_enabled():
+        await sync_to_async(answer_buffer.buffer_answers)(section, attempt_id, answers)
+    else:
+        await awrite_answers(section, {attempt_id: answers})
+
+
+def load_answers(section: str, attempt_id: int) -> dict:
+    """Attemptning saqlangan javoblari (DB + hali flush qilinmagan bufer): {question_id: response}."""
+    from .scoring import SECTIONS
+
+    answer_model = apps.get_model(SECTIONS[section][3])
+    answers = dict(
+        answer_model.objects.filter(attempt_id=attempt_id).values_list("question_id", "response")
+    )
+    if answer_buffer.is_enabled():
+        answers.update(answer_buffer.peek(section, attempt_id))
+    return answers
@@ -0,0 +1,330 @@
+"""
+Imtihon kanali: serverdan klientga SSE, klientdan serverga token bilan POST.
+
+    GET  /attempts/channel/                 text/event-stream (attempt_channel)
+    POST /<section>/channel/save-answers/   X-Attempt-Token bilan batch autosave
+
+Server -> klient eventlari:
+    state       {"status", "section", "deadline"} — ulanishda va holat o'zgarganda
+                (submit, sweeper, proktor terminate); klient shunga qarab sahifani almashtiradi
+    tick        {"remaining", "server_time"} — server bo'yicha qolgan vaqt (taymer shunga to'g'rilanadi)
+    time_up     deadline o'tdi
+
+Holat attempt bo'yicha cache da ("attempt-channel:<id>", ATTEMPT_CHANNEL_CACHE):
+publish() ni store_context/astore_context, sweeper va admin terminate chaqiradi
+(mock_start eski attemptni terminate qilganda — publish_status()).
+Stream cache ni CHANNEL_POLL_SECONDS da o'qiydi — DB ga faqat cache bo'sh bo'lsa yoki
+deadline o'tgan bo'lsa (sweeper boshqa jarayonda surgan bo'lishi mumkin) murojaat qiladi;
+o'tgan deadline DB da CHANNEL_TICK_SECONDS da bir marta tekshiriladi. Holat
+(status, section, deadline) o'zgarmagan bo'lsa "rev" saqlanadi — eventlar takrorlanmaydi.
+Cache jarayonlar orasida umumiy bo'lishi shart (settings: file-based "channel"; bir nechta
+hostda redis) — LocMem da boshqa worker dagi submit streamga faqat deadline da yetadi.
+
+ASGI da (ASYNC_VIEWS) stream CHANNEL_STREAM_SECONDS ochiq turadi, keyin yopiladi va
+EventSource qayta ulanadi. WSGI da bitta holat+tick yuborib darhol yopiladi (worker thread
+band qilinmaydi) — EventSource CHANNEL_RETRY_SECONDS da qayta ulanadi, ya'ni polling.
+
+Token (issue_token) sahifa render bo'lganda beriladi: attempt, section, test, mock
+imzolangan. Token bilan POST da sessiya, user va CSRF tekshirilmaydi (token cookie emas,
+sahifadan olinadi); section/status/deadline esa kanal holatidan tekshiriladi. Bo'sh
+batch — heartbeat (last_seen).
+"""
+import asyncio
+import json
+import time
+from dataclasses import replace
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django.http import HttpResponseForbidden, JsonResponse
+
+from .context import AttemptContext, deny
+
+TOKEN_SALT = "attempts.channel"
+TOKEN_HEADER = "X-Attempt-Token"
+STATE_TIMEOUT = 6 * 3600
+STATE_FIELDS = ("status", "current_section", "section_deadline")
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def _cache():
+    return caches[_setting("ATTEMPT_CHANNEL_CACHE", "default")]
+
+
+def _state_key(attempt_id: int) -> str:
+    return f"attempt-channel:{attempt_id}"
+
+
+def _seen_key(attempt_id: int) -> str:
+    return f"attempt-seen:{attempt_id}"
+
+
+# --- token ---
+
+def issue_token(ctx: AttemptContext) -> str:
+    return signing.dumps(
+        {"a": ctx.attempt_id, "s": ctx.current_section, "t": ctx.test_id, "m": ctx.mock_slug}, salt=TOKEN_SALT
+    )
+
+
+def read_token(token: str) -> dict | None:
+    try:
+        return signing.loads(token, salt=TOKEN_SALT, max_age=_setting("CHANNEL_TOKEN_MAX_AGE", STATE_TIMEOUT))
+    except signing.BadSignature:
+        return None
+
+
+# --- holat ---
+
+def _state(status: str, section: str, deadline) -> dict:
+    if hasattr(deadline, "timestamp"):
+        deadline = deadline.timestamp()
+    return {"status": status, "section": section, "deadline": deadline if status == "in_progress" else None,
+            "rev": time.time_ns()}
+
+
+def publish(ctx: AttemptContext) -> None:
+    _cache().set(_state_key(ctx.attempt_id), _state(ctx.status, ctx.current_section, ctx.deadline), STATE_TIMEOUT)
+
+
+async def apublish(ctx: AttemptContext) -> None:
+    await _cache().aset(
+        _state_key(ctx.attempt_id), _state(ctx.status, ctx.current_section, ctx.deadline), STATE_TIMEOUT
+    )
+
+
+def publish_attempts(attempts) -> None:
+    """Attempt obyektlari (bulk_update dan keyin, masalan sweeper) uchun bitta set_many."""
+    _cache().set_many(
+        {_state_key(a.id): _state(a.status, a.current_section, a.section_deadline) for a in attempts},
+        STATE_TIMEOUT,
+    )
+
+
+def publish_status(attempt_id: int, status: str) -> None:
+    """
+    DB da .update() bilan status o'zgartirilganda (masalan mock_start eski attemptni
+    terminate qiladi): cache dagi holat DB ga murojaatsiz yangilanadi. Cache bo'sh
+    bo'lsa load_state o'zi DB dan o'qiydi.
+    """
+    cache = _cache()
+    cached = cache.get(_state_key(attempt_id))
+    if cached is not None:
+        cache.set(_state_key(attempt_id), _state(status, cached["section"], None), STATE_TIMEOUT)
+
+
+def _expired(state: dict) -> bool:
+    return state["status"] == "in_progress" and state["deadline"] is not None and time.time() > state["deadline"]
+
+
+def _recheck_due(state: dict) -> bool:
+    # deadline o'tgan, lekin sweeper hali surmagan: DB CHANNEL_TICK_SECONDS da bir marta tekshiriladi
+    return _expired(state) and time.time() - state.get("checked", 0) >= _setting("CHANNEL_TICK_SECONDS", 10)
+
+
+def _from_row(row, cached: dict | None) -> dict:
+    state = _state(*row)
+    if cached is not None and _public(cached) == _public(state):
+        state["rev"] = cached["rev"]  # holat o'zgarmagan — streamlar state/time_up ni qayta yubormaydi
+    state["checked"] = time.time()
+    return state
+
+
+def load_state(attempt_id: int, refresh: bool = False) -> dict | None:
+    """Kanal holati; cache bo'sh, refresh yoki deadline o'tgan bo'lsa DB dan o'qib cache ga yozadi."""
+    cache = _cache()
+    cached = cache.get(_state_key(attempt_id))
+    if cached is not None and not refresh and not _recheck_due(cached):
+        return cached
+    from .models import Attempt
+
+    row = Attempt.objects.filter(id=attempt_id).values_list(*STATE_FIELDS).first()
+    if row is None:
+        return None
+    state = _from_row(row, cached)
+    cache.set(_state_key(attempt_id), state, STATE_TIMEOUT)
+    return state
+
+
+async def aload_state(attempt_id: int, refresh: bool = False) -> dict | None:
+    cache = _cache()
+    cached = await cache.aget(_state_key(attempt_id))
+    if cached is not None and not refresh and not _recheck_due(cached):
+        return cached
+    from .models import Attempt
+
+    row = await Attempt.objects.filter(id=attempt_id).values_list(*STATE_FIELDS).afirst()
+    if row is None:
+        return None
+    state = _from_row(row, cached)
+    await cache.aset(_state_key(attempt_id), state, STATE_TIMEOUT)
+    return state
+
+
+def touch(attempt_id: int) -> None:
+    _cache().set(_seen_key(attempt_id), time.time(), STATE_TIMEOUT)
+
+
+async def atouch(attempt_id: int) -> None:
+    await _cache().aset(_seen_key(attempt_id), time.time(), STATE_TIMEOUT)
+
+
+def last_seen(attempt_ids) -> dict:
+    """{attempt_id: unix vaqt} — oxirgi heartbeat yoki ochiq stream."""
+    found = _cache().get_many([_seen_key(i) for i in attempt_ids])
+    return {i: found[_seen_key(i)] for i in attempt_ids if _seen_key(i) in found}
+
+
+# --- token bilan POST ---
+
+def _token_context(claims: dict, state: dict) -> AttemptContext:
+    return AttemptContext(
+        attempt_id=claims["a"],
+        status=state["status"],
+        current_section=state["section"],
+        mock_slug=claims["m"],
+        test_id=claims["t"],
+        deadline=state["deadline"],
+    )
+
+
+def _token_claims(request, section: str):
+    claims = read_token(request.headers.get(TOKEN_HEADER, ""))
+    if claims is None or claims["s"] != section:
+        return None
+    return claims
+
+
+def _conflict(state: dict, section: str):
+    # holat o'zgargan (submit/terminate/sweeper): klient yangi holatga o'tadi
+    if state["status"] != "in_progress" or state["section"] != section:
+        return JsonResponse({"ok": False, "error": "state changed", "state": _public(state)}, status=409)
+    return None
+
+
+def _checked(ctx: AttemptContext, state: dict | None, section: str):
+    if state is None:
+        return ctx, HttpResponseForbidden()
+    ctx = replace(ctx, status=state["status"], current_section=state["section"], deadline=state["deadline"])
+    return ctx, _conflict(state, section) or deny(ctx, section)
+
+
+def verify(ctx: AttemptContext, section: str):
+    """
+    attempt_required uchun: sessiyadagi kontekst kanal holati bilan tekshiriladi (boshqa
+    tabdagi submit, proktor terminate, sweeper sessiyani yangilamaydi).
+    Qaytaradi: (holatdan yangilangan kontekst, rad javobi yoki None).
+    """
+    return _checked(ctx, load_state(ctx.attempt_id), section)
+
+
+async def averify(ctx: AttemptContext, section: str):
+    return _checked(ctx, await aload_state(ctx.attempt_id), section)
+
+
+def channel_token_required(section: str):
+    """
+    attempt_required ning token varianti: request.attempt_ctx kanal holatidan quriladi.
+    CSRF dan ozod qilingan view larga qo'yiladi (csrf_exempt tashqarida).
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                claims = _token_claims(request, section)
+                if claims is None:
+                    return HttpResponseForbidden()
+                state = await aload_state(claims["a"])
+                if state is None:
+                    return HttpResponseForbidden()
+                denied = _conflict(state, section) or deny(_token_context(claims, state), section)
+                if denied is not None:
+                    return denied
+                request.attempt_ctx = _token_context(claims, state)
+                await atouch(claims["a"])
+                return await view(request, *args, **kwargs)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            claims = _token_claims(request, section)
+            if claims is None:
+                return HttpResponseForbidden()
+            state = load_state(claims["a"])
+            if state is None:
+                return HttpResponseForbidden()
+            denied = _conflict(state, section) or deny(_token_context(claims, state), section)
+            if denied is not None:
+                return denied
+            request.attempt_ctx = _token_context(claims, state)
+            touch(claims["a"])
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- SSE ---
+
+def sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def _tick(state: dict, now: float) -> str:
+    remaining = None if state["deadline"] is None else max(0, int(state["deadline"] - now))
+    return sse("tick", {"remaining": remaining, "server_time": round(now, 3)})
+
+
+def _public(state: dict) -> dict:
+    return {k: state[k] for k in ("status", "section", "deadline")}
+
+
+async def stream_events(attempt_id: int, stream_seconds: float):
+    """
+    Eventlar generatori. stream_seconds=0: bitta state + tick (WSGI polling rejimi).
+    Attempt yakunlansa (status in_progress emas) stream tugaydi.
+    """
+    poll = _setting("CHANNEL_POLL_SECONDS", 1)
+    tick_every = _setting("CHANNEL_TICK_SECONDS", 10)
+    retry = _setting("CHANNEL_RETRY_SECONDS", 15) if not stream_seconds else poll
+    yield f"retry: {int(retry * 1000)}\n\n"
+
+    started = last_tick = time.time()
+    rev = None
+    sent = None
+    time_up_sent = False
+    while True:
+        state = await aload_state(attempt_id)
+        if state is None:
+            return
+        now = time.time()
+        # rev faqat publish/DB dan qayta o'qilganda o'zgaradi; event esa holat o'zgargandagina
+        if state["rev"] != rev:
+            rev = state["rev"]
+            if _public(state) != sent:
+                sent = _public(state)
+                time_up_sent = False
+                yield sse("state", sent)
+                yield _tick(state, now)
+                last_tick = now
+        if state["status"] != "in_progress":
+            return
+        if _expired(state) and not time_up_sent:
+            time_up_sent = True
+            yield sse("time_up", {"section": state["section"]})
+        if now - last_tick >= tick_every:
+            last_tick = now
+            await atouch(attempt_id)
+            yield _tick(state, now)
+        if now - started >= stream_seconds:
+            return
+        await asyncio.sleep(poll)
+
+
+async def snapshot_events(attempt_id: int) -> list:
+    return [chunk async for chunk in stream_events(attempt_id, 0)]
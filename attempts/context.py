@@ -0,0 +1,343 @@
+"""
+Sessiyada saqlanadigan attempt holati (AttemptContext).
+
+Listening/Reading API lar har so'rovda Attempt va testni DB dan o'qimasligi uchun
+kerakli hamma narsa sessiyada turadi: attempt id, status, current_section, mock slug,
+joriy section testi id si va deadline. Kontekst faqat holat o'zgarganda yangilanadi
+(mock_start, *_submit, *_terminate) — o'sha joylarda Attempt DB dan yangidan o'qiladi.
+
+Deadline Attempt.section_deadline da (enter_section qo'yadi): sessiyadagi nusxa va kanal
+holati bo'yicha autosave muddat + DEADLINE_GRACE_SECONDS dan keyin rad etiladi, muddati o'tgan
+attemptlarni esa attempts.sweeper server tomonda baholab keyingi sectionga o'tkazadi.
+
+store_context kanal holatini ham yangilaydi (attempts.channel.publish) — ochiq SSE stream
+yangi section/status ni darhol oladi.
+
+Sessiya settings.SESSION_ENGINE = cached_db orqali cache dan o'qiladi, shuning uchun
+autosave yo'li yozishdan oldin DB ga umuman murojaat qilmaydi.
+
+Async view lar (ASYNC_VIEWS) uchun a-prefiksli variantlar: aget_context, astore_context,
+aenter_section — sessiya va ORM ning async API si orqali.
+"""
+import time
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponseForbidden, JsonResponse
+from django.utils import timezone
+
+from mocks.models import MockSection
+
+SESSION_KEY = "attempt_ctx"
+
+# section -> MockSection dagi test related_name
+SECTION_TESTS = {
+    "listening": "listening_test",
+    "reading": "reading_test",
+    "writing": "writing_test",
+}
+# submit view lari shu tartibda o'tkazadi (listening -> reading -> writing -> yakun);
+# sweeper ham shu tartibga amal qiladi
+SECTION_ORDER = ("listening", "reading", "writing")
+# o'z duration_seconds maydoni bor testlar
+TIMED_TESTS = {"listening", "reading"}
+# testida davomiylik maydoni yo'q sectionlar: MockSection.duration_seconds 0 bo'lsa shu
+# qo'llanadi (server deadline, sweeper rejasi va sahifa taymeri bir xil bo'lishi uchun)
+DEFAULT_SECTION_SECONDS = {"writing": 3600}
+
+
+@dataclass(frozen=True)
+class AttemptContext:
+    attempt_id: int
+    status: str
+    current_section: str
+    mock_slug: str
+    test_id: int | None
+    deadline: float | None  # unix timestamp
+
+    def allows(self, section: str) -> bool:
+        return self.status == "in_progress" and self.current_section == section
+
+    def expired(self, grace: float = 0) -> bool:
+        return self.deadline is not None and time.time() > self.deadline + grace
+
+    def remaining_seconds(self, default: int) -> int:
+        if self.deadline is None:
+            return default
+        return max(0, int(self.deadline - time.time()))
+
+
+def grace_seconds() -> float:
+    return getattr(settings, "DEADLINE_GRACE_SECONDS", 30)
+
+
+def _section_test_query(attempt, section: str):
+    related = SECTION_TESTS.get(section)
+    fields = ["duration_seconds"]
+    if related:
+        fields.append(f"{related}__id")
+    if section in TIMED_TESTS:
+        fields.append(f"{related}__duration_seconds")
+    return MockSection.objects.filter(mock_id=attempt.mock_id, section=section).values(*fields), related
+
+
+def section_duration(section: str, row: dict):
+    """MockSection.duration_seconds, u 0 bo'lsa testning davomiyligi yoki DEFAULT_SECTION_SECONDS."""
+    related = SECTION_TESTS.get(section)
+    return (
+        row["duration_seconds"]
+        or row.get(f"{related}__duration_seconds")
+        or DEFAULT_SECTION_SECONDS.get(section)
+        or None
+    )
+
+
+def _section_test_result(row, related, section: str):
+    if row is None:
+        return None, None
+    test_id = row[f"{related}__id"] if related else None
+    return test_id, section_duration(section, row)
+
+
+def _section_test(attempt, section: str):
+    """
+    (test_id, duration_seconds) bitta so'rovda (davomiylik — section_duration). Natija
+    attempt obyektida saqlanadi — enter_section + store_context bitta so'rovda ishlaydi.
+    """
+    cache = attempt.__dict__.setdefault("_section_tests", {})
+    if section not in cache:
+        queryset, related = _section_test_query(attempt, section)
+        cache[section] = _section_test_result(queryset.first(), related, section)
+    return cache[section]
+
+
+async def _asection_test(attempt, section: str):
+    cache = attempt.__dict__.setdefault("_section_tests", {})
+    if section not in cache:
+        queryset, related = _section_test_query(attempt, section)
+        cache[section] = _section_test_result(await queryset.afirst(), related, section)
+    return cache[section]
+
+
+def _set_section(attempt, section: str, duration, now) -> None:
+    attempt.current_section = section
+    attempt.section_deadline = (now or timezone.now()) + timedelta(seconds=duration) if duration else None
+
+
+def enter_section(attempt, section: str, now=None) -> None:
+    """current_section va server deadline ni qo'yadi (saqlash chaqiruvchida)."""
+    _, duration = _section_test(attempt, section)
+    _set_section(attempt, section, duration, now)
+
+
+async def aenter_section(attempt, section: str, now=None) -> None:
+    _, duration = await _asection_test(attempt, section)
+    _set_section(attempt, section, duration, now)
+
+
+TRANSITION_FIELDS = ("status", "current_section", "section_deadline", "finished_at")
+
+
+def _set_next(attempt, next_section, test_id, duration, now) -> None:
+    if next_section is None or test_id is None:
+        # oxirgi section yoki keyingi sectionning testi yo'q (masalan writing qo'shilmagan
+        # mock): attempt yakunlanadi — testsiz sahifada in_progress holda qolib ketmaydi
+        attempt.status = "submitted"
+        attempt.finished_at = now or timezone.now()
+        attempt.section_deadline = None
+    else:
+        _set_section(attempt, next_section, duration, now)
+
+
+def _claim(attempt, section: str) -> bool:
+    from .models import Attempt
+
+    return Attempt.objects.filter(id=attempt.id, status="in_progress", current_section=section).update(
+        **{field: getattr(attempt, field) for field in TRANSITION_FIELDS}
+    ) == 1
+
+
+def advance_section(attempt, section: str, next_section: str | None, now=None) -> bool:
+    """
+    section -> next_section o'tishi shartli UPDATE bilan (attempt hali shu sectionda
+    in_progress bo'lsagina). next_section None yoki uning testi yo'q bo'lsa attempt
+    yakunlanadi (submitted). Parallel submit lar va sweeper dan faqat bittasi yutadi —
+    baholashni faqat True olgan so'rov qiladi. Yutqazganda attempt DB dan qayta o'qiladi.
+    """
+    test_id, duration = _section_test(attempt, next_section) if next_section else (None, None)
+    _set_next(attempt, next_section, test_id, duration, now)
+    if _claim(attempt, section):
+        return True
+    attempt.refresh_from_db(fields=TRANSITION_FIELDS)
+    return False
+
+
+async def aadvance_section(attempt, section: str, next_section: str | None, now=None) -> bool:
+    test_id, duration = await _asection_test(attempt, next_section) if next_section else (None, None)
+    _set_next(attempt, next_section, test_id, duration, now)
+    if await sync_to_async(_claim)(attempt, section):
+        return True
+    await attempt.arefresh_from_db(fields=TRANSITION_FIELDS)
+    return False
+
+
+def section_url(attempt) -> str:
+    """Submit dan keyingi sahifa: davom etayotgan section, natija yoki mock sahifasi."""
+    from django.urls import reverse
+
+    if attempt.status == "in_progress":
+        return f"/{attempt.current_section}/"
+    if attempt.status == "submitted":
+        return reverse("attempt_result", args=[attempt.id])
+    return f"/mocks/{attempt.mock.slug}/"
+
+
+def _make_context(attempt, mock_slug: str, test_id) -> AttemptContext:
+    deadline = None
+    if attempt.status == "in_progress" and attempt.section_deadline:
+        deadline = attempt.section_deadline.timestamp()
+    return AttemptContext(
+        attempt_id=attempt.id,
+        status=attempt.status,
+        current_section=attempt.current_section,
+        mock_slug=mock_slug,
+        test_id=test_id if attempt.status == "in_progress" else None,
+        deadline=deadline,
+    )
+
+
+def build_context(attempt, mock_slug: str) -> AttemptContext:
+    test_id = None
+    if attempt.status == "in_progress":
+        test_id, _ = _section_test(attempt, attempt.current_section)
+    return _make_context(attempt, mock_slug, test_id)
+
+
+async def abuild_context(attempt, mock_slug: str) -> AttemptContext:
+    test_id = None
+    if attempt.status == "in_progress":
+        test_id, _ = await _asection_test(attempt, attempt.current_section)
+    return _make_context(attempt, mock_slug, test_id)
+
+
+def _session_values(attempt, ctx: AttemptContext) -> dict:
+    return {SESSION_KEY: asdict(ctx), "active_attempt_id": attempt.id, "active_mock_slug": ctx.mock_slug}
+
+
+def store_context(request, attempt, mock_slug: str | None = None) -> AttemptContext:
+    """Holat o'zgargandan keyin chaqiriladi: kontekstni qayta quradi va sessiyaga yozadi."""
+    from . import channel
+
+    ctx = build_context(attempt, mock_slug or attempt.mock.slug)
+    request.session.update(_session_values(attempt, ctx))
+    channel.publish(ctx)
+    return ctx
+
+
+async def astore_context(request, attempt, mock_slug: str | None = None) -> AttemptContext:
+    """store_context ning async varianti (attempt.mock oldindan select_related qilingan bo'lsin)."""
+    from . import channel
+
+    ctx = await abuild_context(attempt, mock_slug or attempt.mock.slug)
+    await request.session.aupdate(_session_values(attempt, ctx))
+    await channel.apublish(ctx)
+    return ctx
+
+
+def refresh_context(request, ctx: AttemptContext) -> AttemptContext:
+    """
+    Sahifalar uchun: sessiyadagi kontekst eskirgan bo'lishi mumkin — deadline o'tgan
+    (sweeper boshqa sectionga o'tkazgan yoki yakunlagan) yoki kanal holati boshqacha
+    (proktor terminate, boshqa tabdagi submit). Shunda attempt DB dan qayta o'qiladi.
+    """
+    from . import channel
+    from .models import Attempt
+
+    state = channel.load_state(ctx.attempt_id)
+    if state is None:
+        return ctx
+    if not ctx.expired() and (state["status"], state["section"]) == (ctx.status, ctx.current_section):
+        return ctx
+    attempt = Attempt.objects.filter(id=ctx.attempt_id).first()
+    if attempt is None:
+        return ctx
+    return store_context(request, attempt, ctx.mock_slug)
+
+
+def get_context(request) -> AttemptContext | None:
+    data = request.session.get(SESSION_KEY)
+    if data is not None:
+        return AttemptContext(**data)
+
+    # eski sessiya (kontekstsiz): bir marta DB dan quramiz
+    attempt_id = request.session.get("active_attempt_id")
+    if not attempt_id:
+        return None
+    from .models import Attempt
+
+    attempt = Attempt.objects.select_related("mock").filter(id=attempt_id).first()
+    if attempt is None:
+        return None
+    return store_context(request, attempt)
+
+
+async def aget_context(request) -> AttemptContext | None:
+    """Async view lar uchun: sessiya async API orqali o'qiladi (cached_db da odatda faqat cache)."""
+    data = await request.session.aget(SESSION_KEY)
+    if data is not None:
+        return AttemptContext(**data)
+    return await sync_to_async(get_context)(request)
+
+
+def deny(ctx: AttemptContext | None, section: str):
+    """Sectionga ruxsat bo'lmasa 403 javob, bo'lsa None (attempt_required, exam kanali)."""
+    if ctx is None or not ctx.allows(section):
+        return HttpResponseForbidden()
+    if ctx.expired(grace_seconds()):
+        return JsonResponse({"ok": False, "error": "time is up"}, status=403)
+    return None
+
+
+def attempt_required(section: str):
+    """
+    Autosave API lar uchun: sessiyada shu sectionda ishlayotgan attempt bo'lmasa 403.
+    Kontekst faqat login_required mock_start da yaratiladi (logout sessiyani tozalaydi),
+    shuning uchun bu yerda user ni DB dan o'qish shart emas. request.attempt_ctx beriladi.
+    Sessiyadagi nusxa kanal holati bilan ham tekshiriladi (channel.verify, odatda faqat
+    cache): attempt boshqa joyda surilgan/yakunlangan bo'lsa 409 yoki 403.
+    Section vaqti (+ grace) tugagan bo'lsa ham 403 — javoblar muddatdan keyin qabul qilinmaydi.
+    Sync va async view larga qo'yiladi.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                from . import channel
+
+                ctx = await aget_context(request)
+                denied = deny(ctx, section)
+                if denied is None:
+                    ctx, denied = await channel.averify(ctx, section)
+                if denied is not None:
+                    return denied
+                request.attempt_ctx = ctx
+                return await view(request, *args, **kwargs)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            from . import channel
+
+            ctx = get_context(request)
+            denied = deny(ctx, section)
+            if denied is None:
+                ctx, denied = channel.verify(ctx, section)
+            if denied is not None:
+                return denied
+            request.attempt_ctx = ctx
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,218 @@
+"""
+Item analysis: savol qiyinligi (p-value), discrimination, distractor chastotalari va
+mock section ball taqsimoti (attempts.models: ItemStat, OptionStat, ScoreStat).
+
+Inkremental: grade_attempts baholash uchun o'qigan javoblarni (jadvalni qayta
+o'qimasdan) Accumulator ga beradi, batch oxirida fold() hisoblagichlarga qo'shadi —
+har jadvalga bitta INSERT ... ON CONFLICT DO UPDATE SET n = n + excluded.n.
+Faqat birinchi marta baholanayotgan attemptlar qo'shiladi ({section}_raw NULL edi):
+grade_attempts --regrade ikki marta sanamaydi. Answer key o'zgargan bo'lsa
+`manage.py rebuild_item_stats` hammasini joriy kalit bo'yicha noldan quradi.
+
+Discrimination — point-biserial korrelyatsiya (savol to'g'riligi va attemptning
+section raw bali; bal savolning o'zini ham o'z ichiga oladi).
+"""
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.db import connection, transaction
+
+from .answer_keys import normalize
+from .models import Attempt, ItemStat, OptionStat, ScoreStat
+
+CHOICE_MAX_LENGTH = 64
+REBUILD_BATCH_SIZE = 2000
+
+ITEM_COUNTERS = ["attempts", "correct", "blank", "score_sum", "score_sq_sum", "score_sum_correct"]
+
+
+def _answered(response) -> bool:
+    response = response or {}
+    return bool(response.get("values") or str(response.get("value") or response.get("text") or "").strip())
+
+
+def _choices(question, response) -> list:
+    """Distractor hisobiga kiradigan tanlovlar; short (erkin matn) javoblar kirmaydi."""
+    if question.qtype == "short" or not response:
+        return []
+    if question.qtype == "mcq_multi":
+        values = response.get("values") or ()
+    else:
+        values = [response.get("value")]
+    return [normalize(v)[:CHOICE_MAX_LENGTH] for v in values if normalize(v)]
+
+
+class Accumulator:
+    """Bir section bo'yicha attemptlar hissasini xotirada yig'adi."""
+
+    def __init__(self, section: str):
+        self.section = section
+        self.items = {}  # qid -> [test_id, *ITEM_COUNTERS]
+        self.options = Counter()  # (qid, choice) -> count
+        self.scores = Counter()  # (mock_id, raw) -> count
+
+    def __bool__(self):
+        return bool(self.scores)
+
+    def add(self, key, mock_id: int, raw: int, answers: dict) -> None:
+        """answers: {question_id: (response, correct)} — attemptning shu sectiondagi javoblari."""
+        self.scores[(mock_id, raw)] += 1
+        for qid, question in key.questions.items():
+            row = self.items.get(qid)
+            if row is None:
+                row = self.items[qid] = [key.test_id, 0, 0, 0, 0, 0, 0]
+            row[1] += 1
+            row[4] += raw
+            row[5] += raw * raw
+            response, correct = answers.get(qid, (None, False))
+            if not _answered(response):
+                row[3] += 1
+            if correct:
+                row[2] += 1
+                row[6] += raw
+            for choice in _choices(question, response):
+                self.options[(qid, choice)] += 1
+
+    def item_rows(self) -> list:
+        return [
+            ItemStat(section=self.section, question_id=qid, test_id=row[0], **dict(zip(ITEM_COUNTERS, row[1:])))
+            for qid, row in self.items.items()
+        ]
+
+    def option_rows(self) -> list:
+        return [
+            OptionStat(section=self.section, question_id=qid, choice=choice, count=count)
+            for (qid, choice), count in self.options.items()
+        ]
+
+    def score_rows(self) -> list:
+        return [
+            ScoreStat(mock_id=mock_id, section=self.section, raw=raw, count=count)
+            for (mock_id, raw), count in self.scores.items()
+        ]
+
+
+def _increment(model, unique_fields, counter_fields, objs, batch_size: int = 500) -> None:
+    """
+    Upsert + qo'shish: mavjud qatorda counter_fields ga yangi qiymat qo'shiladi.
+    bulk_create(update_conflicts) faqat ustiga yozadi, shuning uchun SQL qo'lda
+    (SQLite >= 3.24 va PostgreSQL da bir xil sintaksis).
+    """
+    if not objs:
+        return
+    qn = connection.ops.quote_name
+    opts = model._meta
+    fields = [f for f in opts.concrete_fields if not f.primary_key]
+    table = qn(opts.db_table)
+    columns = ", ".join(qn(f.column) for f in fields)
+    conflict = ", ".join(qn(opts.get_field(name).column) for name in unique_fields)
+    updates = ", ".join(
+        f"{qn(column)} = {table}.{qn(column)} + excluded.{qn(column)}"
+        for column in (opts.get_field(name).column for name in counter_fields)
+    )
+    placeholder = "(" + ", ".join(["%s"] * len(fields)) + ")"
+    with connection.cursor() as cursor:
+        for start in range(0, len(objs), batch_size):
+            chunk = objs[start:start + batch_size]
+            params = [f.get_db_prep_save(getattr(obj, f.attname), connection) for obj in chunk for f in fields]
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) VALUES {', '.join([placeholder] * len(chunk))} "
+                f"ON CONFLICT ({conflict}) DO UPDATE SET {updates}",
+                params,
+            )
+
+
+def fold(acc: Accumulator) -> None:
+    """
+    Yangi baholangan attemptlar hissasini hisoblagichlarga qo'shadi (jadvalga bitta so'rov).
+    Alohida tranzaksiya ochilmaydi — grade_attempts ning batch tranzaksiyasi ichida
+    (attempt qatorlari qulflangan holda) natija bilan birga yoziladi.
+    """
+    if not acc:
+        return
+    _increment(ItemStat, ["section", "question_id"], ITEM_COUNTERS, acc.item_rows())
+    _increment(OptionStat, ["section", "question_id", "choice"], ["count"], acc.option_rows())
+    _increment(ScoreStat, ["mock", "section", "raw"], ["count"], acc.score_rows())
+
+
+def rebuild(section: str, batch_size: int = REBUILD_BATCH_SIZE) -> Accumulator:
+    """
+    Shu section statistikasini noldan quradi: baholangan attemptlar id bo'yicha
+    batchlab o'tiladi (har batchga attemptlar, testlar va javoblar — 3 so'rov),
+    hisoblagichlar xotirada yig'iladi va oxirida bitta tranzaksiyada almashtiriladi.
+    """
+    from .scoring import SECTIONS, _answer_keys_by_mock
+
+    answer_model = apps.get_model(SECTIONS[section][3])
+    acc = Accumulator(section)
+    last_id = 0
+    while True:
+        batch = list(
+            Attempt.objects
+            .filter(id__gt=last_id, **{f"{section}_raw__isnull": False})
+            .order_by("id")
+            .values_list("id", "mock_id")[:batch_size]
+        )
+        if not batch:
+            break
+        last_id = batch[-1][0]
+        mock_by_attempt = dict(batch)
+        keys = _answer_keys_by_mock(section, set(mock_by_attempt.values()))
+
+        answers = defaultdict(dict)
+        rows = (
+            answer_model.objects
+            .filter(attempt_id__in=mock_by_attempt)
+            .values_list("attempt_id", "question_id", "response")
+        )
+        for attempt_id, qid, response in rows.iterator(chunk_size=5000):
+            key = keys.get(mock_by_attempt[attempt_id])
+            question = key.questions.get(qid) if key else None
+            if question is not None:
+                answers[attempt_id][qid] = (response, question.check(response))
+
+        for attempt_id, mock_id in batch:
+            key = keys.get(mock_id)
+            if key is None:
+                continue
+            given = answers.get(attempt_id, {})
+            acc.add(key, mock_id, sum(1 for _, correct in given.values() if correct), given)
+
+    with transaction.atomic():
+        for model in (ItemStat, OptionStat, ScoreStat):
+            model.objects.filter(section=section).delete()
+        ItemStat.objects.bulk_create(acc.item_rows(), batch_size=1000)
+        OptionStat.objects.bulk_create(acc.option_rows(), batch_size=1000)
+        ScoreStat.objects.bulk_create(acc.score_rows(), batch_size=1000)
+    return acc
+
+
+def test_report(section: str, test_id: int) -> list:
+    """Test savollari bo'yicha: [{question_id, attempts, p_value, discrimination, blank_rate, choices}, ...]."""
+    choices = defaultdict(dict)
+    for qid, choice, count in (
+        OptionStat.objects
+        .filter(section=section, question_id__in=ItemStat.objects.filter(section=section, test_id=test_id)
+                .values("question_id"))
+        .order_by("-count")
+        .values_list("question_id", "choice", "count")
+    ):
+        choices[qid][choice] = count
+    return [
+        {
+            "question_id": stat.question_id,
+            "attempts": stat.attempts,
+            "p_value": stat.p_value,
+            "discrimination": stat.discrimination,
+            "blank_rate": stat.blank / stat.attempts if stat.attempts else None,
+            "choices": choices.get(stat.question_id, {}),
+        }
+        for stat in ItemStat.objects.filter(section=section, test_id=test_id).order_by("question_id")
+    ]
+
+
+def score_distribution(mock_id: int, section: str) -> dict:
+    """{raw: count} — mock section ball taqsimoti."""
+    return dict(
+        ScoreStat.objects.filter(mock_id=mock_id, section=section).order_by("raw").values_list("raw", "count")
+    )
@@ -0,0 +1,359 @@
+"""
+Imtihon xonasi simulyatsiyasi (manage.py loadtest).
+
+N ta virtual nomzod bitta mockni boshidan oxirigacha o'tadi:
+
+    mock_start -> listening_page -> listening_save_answers (xN) -> listening_submit
+               -> reading_page -> reading_save_answers (xN) -> reading_submit
+
+Saqlash haqiqiy klientdagidek: har `batch` ta javobdan keyin bitta batch POST
+(static/js/autosave.js debounce), oralarida `think` sekund (±50% jitter) kutiladi.
+
+Ikki transport:
+  - "client": django.test.Client, server jarayonsiz, shu jarayonda. Har so'rov
+    uchun DB so'rovlari soni ham yoziladi (CaptureQueriesContext, thread bo'yicha);
+  - "http": ishlab turgan serverga (runserver/gunicorn) urllib orqali. Server shu
+    DATABASES ga ulangan bo'lishi kerak — foydalanuvchi va sessiyalar shu yerdan yaratiladi.
+
+Natija: endpoint bo'yicha p50/p95/p99 (ms), xatolar, o'rtacha so'rovlar soni va
+umumiy throughput (req/s) — JSON ga yoziladi va oldingi natija bilan solishtiriladi.
+
+capacity(): bir jarayon nechta bir vaqtdagi nomzodni ko'tarishini topadi — har
+darajada shuncha nomzod bir vaqtda ishlaydi; xatosiz va autosave p95 SLO ichida
+qolgan eng katta daraja "held". Sync (WSGI) va async (ASGI, ASYNC_VIEWS) serverlarni
+shu bilan solishtiriladi.
+"""
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http.cookies import SimpleCookie
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from listening.models import ListeningQuestion
+from mocks.models import Mock, MockAccess
+from reading.models import ReadingQuestion
+
+from .models import Attempt
+
+USER_PREFIX = "loadtest-"
+ENDPOINTS = [
+    "mock_start",
+    "listening_page",
+    "listening_save_answers",
+    "listening_submit",
+    "reading_page",
+    "reading_save_answers",
+    "reading_submit",
+]
+
+
+def percentile(samples, p: float):
+    """Nearest-rank percentil (p: 0..100); bo'sh ro'yxat uchun None."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * p // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+class Recorder:
+    """Thread-safe o'lchovlar: endpoint -> [(ms, ok, queries), ...]."""
+
+    def __init__(self):
+        self.samples = {name: [] for name in ENDPOINTS}
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def add(self, endpoint: str, ms: float, ok: bool, queries=None) -> None:
+        with self.lock:
+            self.samples[endpoint].append((ms, ok, queries))
+
+    def stop(self) -> None:
+        self.finished = time.perf_counter()
+
+    def summary(self) -> dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        endpoints = {}
+        total = errors = 0
+        for name, rows in self.samples.items():
+            if not rows:
+                continue
+            latencies = [ms for ms, _, _ in rows]
+            queries = [q for _, _, q in rows if q is not None]
+            failed = sum(1 for _, ok, _ in rows if not ok)
+            endpoints[name] = {
+                "requests": len(rows),
+                "errors": failed,
+                "p50_ms": round(percentile(latencies, 50), 2),
+                "p95_ms": round(percentile(latencies, 95), 2),
+                "p99_ms": round(percentile(latencies, 99), 2),
+                "max_ms": round(max(latencies), 2),
+                "queries_avg": round(sum(queries) / len(queries), 2) if queries else None,
+                "queries_max": max(queries) if queries else None,
+            }
+            total += len(rows)
+            errors += failed
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "requests": total,
+            "errors": errors,
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0,
+            "endpoints": endpoints,
+        }
+
+
+# --- transportlar ---
+
+class ClientTransport:
+    """Jarayon ichida django.test.Client orqali; DB so'rovlarini ham sanaydi."""
+
+    def __init__(self, user):
+        # "testserver" faqat test runnerda ALLOWED_HOSTS ga qo'shiladi
+        hosts = [h for h in settings.ALLOWED_HOSTS if h != "*" and not h.startswith(".")]
+        self.client = Client(HTTP_HOST=hosts[0] if hosts else "localhost")
+        self.client.force_login(user)
+
+    def request(self, method: str, path: str, body=None):
+        with CaptureQueriesContext(connection) as ctx:
+            if method == "POST":
+                response = self.client.post(path, body or b"", content_type="application/json")
+            else:
+                response = self.client.get(path)
+        return response.status_code, len(ctx)
+
+    def close(self):
+        connection.close()
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpTransport:
+    """Ishlab turgan serverga HTTP; sessiya cookie si force_login orqali yaratiladi."""
+
+    def __init__(self, user, base_url: str, timeout: float = 30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(_NoRedirect)
+
+        client = Client()
+        client.force_login(user)
+        self.cookies = {settings.SESSION_COOKIE_NAME: client.cookies[settings.SESSION_COOKIE_NAME].value}
+
+    def _store_cookies(self, headers) -> None:
+        for header in headers.get_all("Set-Cookie") or []:
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+
+    def request(self, method: str, path: str, body=None):
+        headers = {"Cookie": "; ".join(f"{k}={v}" for k, v in self.cookies.items())}
+        if method == "POST":
+            headers.update({
+                "Content-Type": "application/json",
+                "X-CSRFToken": self.cookies.get(settings.CSRF_COOKIE_NAME, ""),
+                "Referer": self.base_url + "/",
+            })
+        req = urllib.request.Request(self.base_url + path, data=body if method == "POST" else None,
+                                     headers=headers, method=method)
+        try:
+            with self.opener.open(req, timeout=self.timeout) as response:
+                response.read()
+                status, response_headers = response.status, response.headers
+        except urllib.error.HTTPError as exc:
+            # redirect (302) ham shu yerga tushadi — _NoRedirect kuzatmaydi
+            status, response_headers = exc.code, exc.headers
+            exc.close()
+        self._store_cookies(response_headers)
+        return status, None
+
+    def close(self):
+        pass
+
+
+# --- stsenariy ---
+
+@dataclass
+class Plan:
+    slug: str
+    listening: list  # [(question_id, value), ...]
+    reading: list
+    batch: int = 3
+    think: float = 0.0
+
+
+ANSWER_VALUES = {"short": "answer", "mcq_multi": "A,C", "tfng": "True", "yesno": "Yes"}
+
+
+def _answer_value(qtype: str) -> str:
+    return ANSWER_VALUES.get(qtype, "A")
+
+
+def build_plan(mock: Mock, batch: int = 3, think: float = 0.0) -> Plan:
+    def answers(model, field):
+        return [
+            (qid, _answer_value(qtype))
+            for qid, qtype in model.objects.filter(**{field: mock}).order_by("order").values_list("id", "qtype")
+        ]
+
+    return Plan(
+        slug=mock.slug,
+        listening=answers(ListeningQuestion, "test__section__mock"),
+        reading=answers(ReadingQuestion, "test__section__mock"),
+        batch=max(1, batch),
+        think=think,
+    )
+
+
+def _timed(recorder: Recorder, transport, endpoint: str, method: str, path: str, body=None) -> bool:
+    started = time.perf_counter()
+    try:
+        status, queries = transport.request(method, path, body)
+    except Exception:
+        status, queries = 0, None
+    ok = 0 < status < 400
+    recorder.add(endpoint, (time.perf_counter() - started) * 1000, ok, queries)
+    return ok
+
+
+def run_candidate(transport, plan: Plan, recorder: Recorder, rng: random.Random) -> bool:
+    """Bitta nomzodning to'liq o'tishi; True: hamma so'rov muvaffaqiyatli."""
+    ok = _timed(recorder, transport, "mock_start", "GET", f"/mocks/{plan.slug}/start/")
+    seq = 0
+    for section, answers in (("listening", plan.listening), ("reading", plan.reading)):
+        ok &= _timed(recorder, transport, f"{section}_page", "GET", f"/{section}/")
+        for i in range(0, len(answers), plan.batch):
+            if plan.think:
+                time.sleep(plan.think * rng.uniform(0.5, 1.5))
+            items = []
+            for qid, value in answers[i:i + plan.batch]:
+                seq += 1
+                items.append({"question_id": qid, "value": value, "client_seq": seq})
+            body = json.dumps({"answers": items}).encode()
+            ok &= _timed(recorder, transport, f"{section}_save_answers", "POST", f"/{section}/save-answers/", body)
+        ok &= _timed(recorder, transport, f"{section}_submit", "POST", f"/{section}/submit/", b"")
+    return ok
+
+
+def prepare_users(mock: Mock, count: int) -> list:
+    User = get_user_model()
+    users = []
+    for n in range(count):
+        user, created = User.objects.get_or_create(username=f"{USER_PREFIX}{n}")
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=["password"])
+        users.append(user)
+    if not mock.is_free:
+        MockAccess.objects.bulk_create([MockAccess(user=u, mock=mock) for u in users], ignore_conflicts=True)
+    return users
+
+
+def run(mock: Mock, candidates: int, concurrency: int, make_transport, batch: int = 3,
+        think: float = 0.0, ramp: float = 0.0, seed: int = 0) -> dict:
+    """
+    Load testni bajaradi va Recorder.summary() + "candidates" ni qaytaradi.
+    make_transport(user) — har nomzod uchun transport. concurrency=1 da hammasi shu
+    threadda bajariladi (test tranzaksiyasi ichida ham ishlaydi).
+    """
+    plan = build_plan(mock, batch=batch, think=think)
+    users = prepare_users(mock, candidates)
+    recorder = Recorder()
+
+    def candidate(index: int) -> bool:
+        rng = random.Random(seed + index)
+        if ramp and candidates > 1:
+            time.sleep(ramp * index / (candidates - 1))
+        transport = make_transport(users[index])
+        try:
+            return run_candidate(transport, plan, recorder, rng)
+        finally:
+            if concurrency > 1:
+                transport.close()
+
+    if concurrency <= 1:
+        results = [candidate(i) for i in range(candidates)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(candidate, range(candidates)))
+    recorder.stop()
+
+    summary = recorder.summary()
+    summary["candidates"] = {"total": candidates, "completed": sum(results)}
+    return summary
+
+
+def cleanup(mock: Mock) -> int:
+    """
+    Load test yaratgan attemptlar va foydalanuvchilarni o'chiradi. Faqat sintetik
+    (USER_PREFIX) userlarniki — shu vaqtda real nomzodlar yaratgan attemptlar qoladi.
+    """
+    deleted, _ = Attempt.objects.filter(mock=mock, user__username__startswith=USER_PREFIX).delete()
+    get_user_model().objects.filter(username__startswith=USER_PREFIX).delete()
+    return deleted
+
+
+SAVE_ENDPOINTS = ("listening_save_answers", "reading_save_answers")
+
+
+def capacity(mock: Mock, levels, make_transport, slo_ms: float, **options) -> dict:
+    """
+    levels dagi har daraja uchun run(candidates=concurrency=daraja). Daraja "held":
+    hamma nomzod xatosiz tugadi va autosave p95 <= slo_ms. Darajalar orasida oldingi
+    daraja yaratgan attemptlar tozalanadi.
+    """
+    rows = []
+    for n, level in enumerate(levels):
+        if n:
+            cleanup(mock)
+        summary = run(mock, level, level, make_transport, **options)
+        save_p95 = max(
+            (summary["endpoints"][name]["p95_ms"] for name in SAVE_ENDPOINTS if name in summary["endpoints"]),
+            default=None,
+        )
+        held = (
+            summary["errors"] == 0
+            and summary["candidates"]["completed"] == level
+            and save_p95 is not None and save_p95 <= slo_ms
+        )
+        rows.append({
+            "concurrency": level,
+            "completed": summary["candidates"]["completed"],
+            "errors": summary["errors"],
+            "throughput_rps": summary["throughput_rps"],
+            "save_p95_ms": save_p95,
+            "held": held,
+        })
+    return {
+        "slo_ms": slo_ms,
+        "levels": rows,
+        "held": max((row["concurrency"] for row in rows if row["held"]), default=0),
+    }
+
+
+def compare(current: dict, previous: dict) -> list:
+    """[(endpoint, metric, oldingi, hozirgi, farq %), ...] — p50/p95/p99 va throughput."""
+    rows = []
+    for name, stats in current["endpoints"].items():
+        before = previous.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            old, new = before[metric], stats[metric]
+            rows.append((name, metric, old, new, round((new - old) / old * 100, 1) if old else None))
+    old, new = previous.get("throughput_rps"), current["throughput_rps"]
+    if old:
+        rows.append(("*", "throughput_rps", old, new, round((new - old) / old * 100, 1)))
+    return rows
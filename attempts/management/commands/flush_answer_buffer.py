@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from attempts import answer_buffer
+from attempts.models import Attempt
+from attempts.scoring import SECTIONS
+
+
+class Command(BaseCommand):
+    help = "Flush write-behind answer buffers of in-progress attempts to the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", type=float, metavar="SECONDS",
+                            help="Keep running and flush every SECONDS")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--all", action="store_true",
+                            help="Also flush finished attempts (e.g. after disabling write-behind)")
+
+    def handle(self, *args, **opts):
+        while True:
+            self.flush_once(opts["batch_size"], opts["all"])
+            if not opts["loop"]:
+                break
+            time.sleep(opts["loop"])
+
+    def flush_once(self, batch_size, include_finished):
+        qs = Attempt.objects.all() if include_finished else Attempt.objects.filter(status="in_progress")
+        ids = list(qs.order_by("id").values_list("id", flat=True))
+
+        depth_before = answer_buffer.buffer_metrics()["depth"]
+        started = time.perf_counter()
+        written = 0
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start:start + batch_size]
+            for section in SECTIONS:
+                # boshqa flush (submit) band qilgan attemptlar kutilmaydi — keyingi aylanishda
+                written += answer_buffer.flush(section, chunk, wait=False)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        metrics = answer_buffer.buffer_metrics()
+        self.stdout.write(
+            f"flushed {written} answers for {len(ids)} attempts in {elapsed_ms:.1f} ms "
+            f"(depth {depth_before} -> {metrics['depth']}, max flush {metrics['max_flush_ms']} ms)"
+        )
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from attempts.models import Attempt
+from attempts.scoring import BATCH_SIZE, SECTIONS, grade_attempts
+
+
+class Command(BaseCommand):
+    help = "Batch-grade listening/reading attempts and store raw scores + bands on Attempt."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--section", choices=sorted(SECTIONS), action="append",
+                            help="Section to grade (repeatable). Default: all.")
+        parser.add_argument("--mock", help="Only attempts of this mock slug")
+        parser.add_argument("--regrade", action="store_true", help="Also re-grade already graded attempts")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **opts):
+        for section in opts["section"] or sorted(SECTIONS):
+            qs = Attempt.objects.filter(**{f"{section}_answers__isnull": False})
+            # hali shu sectionda ishlayotganlarni tegmaymiz
+            qs = qs.exclude(Q(status="in_progress") & Q(current_section=section))
+            if not opts["regrade"]:
+                qs = qs.filter(**{f"{section}_raw__isnull": True})
+            if opts["mock"]:
+                qs = qs.filter(mock__slug=opts["mock"])
+
+            ids = list(qs.order_by("id").values_list("id", flat=True).distinct())
+            started = time.perf_counter()
+            grade_attempts(section, ids, batch_size=opts["batch_size"])
+            elapsed = time.perf_counter() - started
+
+            rate = len(ids) / elapsed if elapsed else 0
+            self.stdout.write(self.style.SUCCESS(
+                f"{section}: graded {len(ids)} attempts in {elapsed:.2f}s ({rate:.0f}/s)."
+            ))
@@ -0,0 +1,133 @@
+import argparse
+import json
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from attempts import loadtest
+from config.database import describe
+from mocks.models import Mock
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate N candidates taking a mock (start, listening, saves, submit, reading) and report "
+        "p50/p95/p99 latency per endpoint, throughput and DB query counts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mock", required=True, help="Mock slug")
+        parser.add_argument("--candidates", type=int, default=20)
+        parser.add_argument("--concurrency", type=int, default=10, help="Candidates running at the same time")
+        parser.add_argument("--base-url", help="Run over HTTP against a live server (default: in-process client)")
+        parser.add_argument("--batch", type=int, default=3, help="Answers per save-answers request")
+        parser.add_argument("--think", type=float, default=1.0, help="Mean seconds between save batches")
+        parser.add_argument("--ramp", type=float, default=0.0, help="Spread candidate starts over this many seconds")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write results JSON to this path")
+        parser.add_argument("--compare", help="Previous results JSON to compare against")
+        parser.add_argument("--keep", action="store_true", help="Keep load-test users and attempts")
+        parser.add_argument(
+            "--levels", type=_levels,
+            help="Capacity mode: comma-separated concurrency levels, e.g. 10,25,50,100 "
+                 "(each level runs that many candidates at once)",
+        )
+        parser.add_argument("--slo-ms", type=float, default=500,
+                            help="Capacity mode: save-answers p95 a level must stay under")
+        parser.add_argument("--label", default="", help="Server profile name stored in the results, e.g. wsgi or asgi")
+
+    def handle(self, *args, **opts):
+        mock = Mock.objects.filter(slug=opts["mock"], is_active=True).first()
+        if mock is None:
+            raise CommandError(f"Active mock slug={opts['mock']!r} not found.")
+        previous = None
+        if opts["compare"]:
+            with open(opts["compare"], encoding="utf-8") as f:
+                previous = json.load(f)
+
+        if opts["base_url"]:
+            make_transport = partial(loadtest.HttpTransport, base_url=opts["base_url"])
+        else:
+            make_transport = loadtest.ClientTransport
+
+        options = {"batch": opts["batch"], "think": opts["think"], "ramp": opts["ramp"], "seed": opts["seed"]}
+        try:
+            if opts["levels"]:
+                result = loadtest.capacity(mock, opts["levels"], make_transport, opts["slo_ms"], **options)
+            else:
+                result = loadtest.run(mock, opts["candidates"], opts["concurrency"], make_transport, **options)
+        finally:
+            if not opts["keep"]:
+                loadtest.cleanup(mock)
+
+        result["config"] = {
+            "mock": mock.slug,
+            "transport": "http" if opts["base_url"] else "client",
+            "database": describe(connection),
+            **{k: opts[k] for k in (
+                "candidates", "concurrency", "batch", "think", "ramp", "seed", "base_url", "label",
+            )},
+        }
+        if opts["levels"]:
+            self.report_capacity(result, previous)
+        else:
+            self.report(result, previous)
+
+        if opts["output"]:
+            with open(opts["output"], "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2)
+            self.stdout.write(f"Results written to {opts['output']}")
+
+    def report(self, result, previous):
+        candidates = result["candidates"]
+        self.stdout.write(f"{result['config']['transport']} transport, {result['config']['database']}")
+        self.stdout.write(
+            f"{candidates['completed']}/{candidates['total']} candidates completed, "
+            f"{result['requests']} requests in {result['elapsed_s']}s "
+            f"({result['throughput_rps']} req/s), {result['errors']} errors"
+        )
+        self.stdout.write(f"  {'endpoint':<24}{'n':>6}{'err':>5}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}")
+        for name, s in result["endpoints"].items():
+            queries = "-" if s["queries_avg"] is None else f"{s['queries_avg']:g}"
+            self.stdout.write(
+                f"  {name:<24}{s['requests']:>6}{s['errors']:>5}"
+                f"{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}{queries:>9}"
+            )
+
+        if previous:
+            self.stdout.write(f"Compared with previous run ({previous.get('config', {}).get('database', '?')}):")
+            for name, metric, old, new, delta in loadtest.compare(result, previous):
+                change = "n/a" if delta is None else f"{delta:+.1f}%"
+                self.stdout.write(f"  {name:<24}{metric:<16}{old:>9} -> {new:<9} {change}")
+
+        style = self.style.SUCCESS if not result["errors"] else self.style.WARNING
+        self.stdout.write(style("Load test done."))
+
+    def report_capacity(self, result, previous):
+        config = result["config"]
+        self.stdout.write(
+            f"{config['label'] or config['transport']}: {config['database']}, "
+            f"SLO save p95 <= {result['slo_ms']:g} ms"
+        )
+        self.stdout.write(f"  {'concurrency':>11}{'completed':>11}{'err':>5}{'req/s':>9}{'save p95':>10}  held")
+        for row in result["levels"]:
+            p95 = "-" if row["save_p95_ms"] is None else f"{row['save_p95_ms']:.1f}"
+            self.stdout.write(
+                f"  {row['concurrency']:>11}{row['completed']:>11}{row['errors']:>5}"
+                f"{row['throughput_rps']:>9.1f}{p95:>10}  {'yes' if row['held'] else 'no'}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Held {result['held']} concurrent candidates."))
+        if previous and "held" in previous:
+            label = previous.get("config", {}).get("label") or "previous run"
+            self.stdout.write(f"Compared with {label}: held {previous['held']} -> {result['held']}")
+
+
+def _levels(value):
+    try:
+        levels = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError("levels must be comma-separated integers")
+    if not levels or min(levels) < 1:
+        raise argparse.ArgumentTypeError("levels must be positive integers")
+    return sorted(set(levels))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from attempts.item_stats import REBUILD_BATCH_SIZE, rebuild
+from attempts.scoring import SECTIONS
+
+
+class Command(BaseCommand):
+    help = "Recompute item statistics (p-value, discrimination, distractors, score distribution) from scratch."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--section", choices=sorted(SECTIONS), action="append",
+                            help="Only this section (repeatable); default: all graded sections")
+        parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE)
+
+    def handle(self, *args, **opts):
+        for section in opts["section"] or sorted(SECTIONS):
+            started = time.perf_counter()
+            acc = rebuild(section, batch_size=opts["batch_size"])
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.stdout.write(
+                f"{section}: {sum(acc.scores.values())} attempts, {len(acc.items)} questions, "
+                f"{len(acc.options)} choices in {elapsed_ms:.1f} ms"
+            )
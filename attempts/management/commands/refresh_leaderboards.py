@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from attempts.rankings import refresh_leaderboard
+from mocks.models import Mock
+
+
+class Command(BaseCommand):
+    help = "Recompute the cached top-N leaderboard of every active mock (run from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mock", action="append", metavar="SLUG", help="Only this mock (repeatable)")
+
+    def handle(self, *args, **opts):
+        mocks = Mock.objects.filter(is_active=True)
+        if opts["mock"]:
+            mocks = mocks.filter(slug__in=opts["mock"])
+        started = time.perf_counter()
+        count = 0
+        for mock_id in mocks.values_list("id", flat=True):
+            refresh_leaderboard(mock_id)
+            count += 1
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stdout.write(f"refreshed {count} leaderboards in {elapsed_ms:.1f} ms")
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from attempts.scoring import BATCH_SIZE
+from attempts.sweeper import sweep
+
+
+class Command(BaseCommand):
+    help = "Grade and advance (or submit) in-progress attempts whose section deadline has passed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", type=float, metavar="SECONDS",
+                            help="Keep running and sweep every SECONDS")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **opts):
+        while True:
+            started = time.perf_counter()
+            stats = sweep(batch_size=opts["batch_size"])
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if stats or not opts["loop"]:
+                self.stdout.write(
+                    f"swept {stats['advanced'] + stats['submitted']} attempts "
+                    f"({stats['advanced']} advanced, {stats['submitted']} submitted, {stats['graded']} graded) "
+                    f"in {stats['batches']} batches, {elapsed_ms:.1f} ms"
+                )
+            if not opts["loop"]:
+                break
+            time.sleep(opts["loop"])
@@ -0,0 +1,43 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attempts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attempt',
+            name='listening_band',
+            field=models.DecimalField(blank=True, decimal_places=1, max_digits=2, null=True),
+        ),
+        migrations.AddField(
+            model_name='attempt',
+            name='listening_raw',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='attempt',
+            name='listening_total',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='attempt',
+            name='reading_band',
+            field=models.DecimalField(blank=True, decimal_places=1, max_digits=2, null=True),
+        ),
+        migrations.AddField(
+            model_name='attempt',
+            name='reading_raw',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='attempt',
+            name='reading_total',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
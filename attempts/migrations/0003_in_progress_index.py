@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attempts', '0002_attempt_scores'),
+        ('mocks', '0003_access_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attempt',
+            index=models.Index(condition=models.Q(('status', 'in_progress')), fields=['current_section', 'started_at'], name='attempt_in_progress_idx'),
+        ),
+    ]
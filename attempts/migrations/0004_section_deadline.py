@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attempts', '0003_in_progress_index'),
+        ('mocks', '0003_access_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='attempt',
+            name='attempt_in_progress_idx',
+        ),
+        migrations.AddField(
+            model_name='attempt',
+            name='section_deadline',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='attempt',
+            index=models.Index(condition=models.Q(('status', 'in_progress')), fields=['section_deadline', 'current_section'], name='attempt_in_progress_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attempts', '0004_section_deadline'),
+        ('mocks', '0003_access_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(max_length=20)),
+                ('question_id', models.PositiveIntegerField()),
+                ('test_id', models.PositiveIntegerField()),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('blank', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.PositiveBigIntegerField(default=0)),
+                ('score_sq_sum', models.PositiveBigIntegerField(default=0)),
+                ('score_sum_correct', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['section', 'test_id'], name='itemstat_test_idx')],
+                'constraints': [models.UniqueConstraint(fields=('section', 'question_id'), name='itemstat_question_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OptionStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(max_length=20)),
+                ('question_id', models.PositiveIntegerField()),
+                ('choice', models.CharField(max_length=64)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('section', 'question_id', 'choice'), name='optionstat_choice_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScoreStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(max_length=20)),
+                ('raw', models.PositiveSmallIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('mock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_stats', to='mocks.mock')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('mock', 'section', 'raw'), name='scorestat_raw_uniq')],
+            },
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 from mocks.models import Mock
@@ -10,14 +11,109 @@ class Attempt(models.Model):
     ]
 
     mock = models.ForeignKey(Mock, on_delete=models.PROTECT, related_name="attempts")
+    # natija sahifasi va leaderboard uchun; eski attemptlarda bo'sh
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="attempts"
+    )
     status = models.CharField(max_length=20, choices=STATUS, default="in_progress")
     current_section = models.CharField(max_length=20, default="listening")  # flow uchun
 
     started_at = models.DateTimeField(auto_now_add=True)
+    # joriy section tugash vaqti (server tomonda; attempts.sweeper muddati o'tganlarni suradi)
+    section_deadline = models.DateTimeField(null=True, blank=True)
     finished_at = models.DateTimeField(null=True, blank=True)
 
+    # natijalar (attempts.scoring) — result sahifalari qayta hisoblamaydi
+    listening_raw = models.PositiveSmallIntegerField(null=True, blank=True)
+    listening_total = models.PositiveSmallIntegerField(null=True, blank=True)
+    listening_band = models.DecimalField(max_digits=2, decimal_places=1, null=True, blank=True)
+    reading_raw = models.PositiveSmallIntegerField(null=True, blank=True)
+    reading_total = models.PositiveSmallIntegerField(null=True, blank=True)
+    reading_band = models.DecimalField(max_digits=2, decimal_places=1, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # sweeper faqat davom etayotgan attemptlarni deadline bo'yicha o'qiydi —
+            # yakunlanganlar (jadvalning asosiy qismi) indeksga kirmaydi
+            models.Index(
+                fields=["section_deadline", "current_section"],
+                condition=models.Q(status="in_progress"),
+                name="attempt_in_progress_idx",
+            ),
+        ]
+
     def terminate(self):
         if self.status == "in_progress":
             self.status = "terminated"
             self.finished_at = timezone.now()
             self.save(update_fields=["status", "finished_at"])
+
+
+# --- item analysis (attempts.item_stats) ---
+# Baholangan har attempt grade_attempts ichida hisoblagichlarga qo'shiladi; javob
+# jadvallari qayta o'qilmaydi. `manage.py rebuild_item_stats` noldan qayta quradi.
+
+class ItemStat(models.Model):
+    """Savol bo'yicha: difficulty (p-value) va discrimination (point-biserial) uchun yig'indilar."""
+    section = models.CharField(max_length=20)
+    question_id = models.PositiveIntegerField()
+    test_id = models.PositiveIntegerField()
+
+    attempts = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    blank = models.PositiveIntegerField(default=0)
+    # attempt section raw ballari: hammasi, kvadratlari va to'g'ri javob berganlarniki
+    score_sum = models.PositiveBigIntegerField(default=0)
+    score_sq_sum = models.PositiveBigIntegerField(default=0)
+    score_sum_correct = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["section", "question_id"], name="itemstat_question_uniq"),
+        ]
+        indexes = [models.Index(fields=["section", "test_id"], name="itemstat_test_idx")]
+
+    @property
+    def p_value(self):
+        return self.correct / self.attempts if self.attempts else None
+
+    @property
+    def discrimination(self):
+        """Point-biserial: to'g'ri va noto'g'ri javob berganlar o'rtacha balli farqi / std."""
+        n, k = self.attempts, self.correct
+        if not n or not k or k == n:
+            return None
+        mean = self.score_sum / n
+        variance = self.score_sq_sum / n - mean * mean
+        if variance <= 0:
+            return None
+        mean_correct = self.score_sum_correct / k
+        mean_wrong = (self.score_sum - self.score_sum_correct) / (n - k)
+        p = k / n
+        return (mean_correct - mean_wrong) / variance ** 0.5 * (p * (1 - p)) ** 0.5
+
+
+class OptionStat(models.Model):
+    """Variant/qiymat bo'yicha tanlovlar soni (distractor chastotasi); short javoblar kirmaydi."""
+    section = models.CharField(max_length=20)
+    question_id = models.PositiveIntegerField()
+    choice = models.CharField(max_length=64)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["section", "question_id", "choice"], name="optionstat_choice_uniq"),
+        ]
+
+
+class ScoreStat(models.Model):
+    """Mock section bo'yicha raw ball taqsimoti (histogram)."""
+    mock = models.ForeignKey(Mock, on_delete=models.CASCADE, related_name="score_stats")
+    section = models.CharField(max_length=20)
+    raw = models.PositiveSmallIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["mock", "section", "raw"], name="scorestat_raw_uniq"),
+        ]
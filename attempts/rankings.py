@@ -0,0 +1,137 @@
+"""
+Natija sahifasi uchun percentile va mock leaderboard.
+
+Percentile ScoreStat histogrammasidan (mock, section bo'yicha raw ball -> attemptlar soni;
+grade_attempts uni inkremental yuritadi, attempts/item_stats.py). Attemptlar
+saralanmaydi: histogramma (<= 41 qator) cache ga kumulyativ ko'rinishda yoziladi va
+percentile bitta indeks bilan olinadi. Cache RANKING_HISTOGRAM_SECONDS da eskiradi —
+yangi baholanganlar shu vaqt ichida ko'rinadi.
+
+Leaderboard — har user ning eng yaxshi listening + reading raw yig'indisi bo'yicha top
+LEADERBOARD_SIZE. So'rov bo'yicha qurilmaydi: `manage.py refresh_leaderboards` (cron)
+cache ga yozadi; cache bo'sh yoki LEADERBOARD_CACHE_SECONDS o'tgan bo'lsa (cron
+to'xtagan, restart) birinchi so'rov bir marta quradi. Nomzod nomi niqoblanadi
+(mask_name) — login boshqa nomzodlarga ko'rinmaydi.
+"""
+from bisect import bisect_left
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import F, Max
+
+from .models import Attempt, ScoreStat
+
+HISTOGRAM_TIMEOUT = 60
+LEADERBOARD_SIZE = 10
+LEADERBOARD_TIMEOUT = 15 * 60
+RANKED_SECTIONS = ("listening", "reading")
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def _histogram_key(mock_id: int, section: str) -> str:
+    return f"rankings:histogram:{mock_id}:{section}"
+
+
+def _leaderboard_key(mock_id: int) -> str:
+    return f"rankings:leaderboard:{mock_id}"
+
+
+# --- percentile ---
+
+def histogram(mock_id: int, section: str) -> dict:
+    """{"raws": [...], "below": [...], "counts": [...], "total": n} — raws o'sish tartibida."""
+    key = _histogram_key(mock_id, section)
+    hist = cache.get(key)
+    if hist is None:
+        rows = list(
+            ScoreStat.objects.filter(mock_id=mock_id, section=section).order_by("raw").values_list("raw", "count")
+        )
+        below, running = [], 0
+        for _, count in rows:
+            below.append(running)
+            running += count
+        hist = {"raws": [r for r, _ in rows], "below": below, "counts": [c for _, c in rows], "total": running}
+        cache.set(key, hist, _setting("RANKING_HISTOGRAM_SECONDS", HISTOGRAM_TIMEOUT))
+    return hist
+
+
+def percentile_rank(mock_id: int, section: str, raw: int) -> float | None:
+    """
+    Shu mock section ni topshirganlarning necha foizidan yuqori: (pastdagilar + tenglarning
+    yarmi) / hammasi * 100. Histogramma bo'sh bo'lsa None.
+    """
+    hist = histogram(mock_id, section)
+    if not hist["total"]:
+        return None
+    i = bisect_left(hist["raws"], raw)
+    if i < len(hist["raws"]) and hist["raws"][i] == raw:
+        below, equal = hist["below"][i], hist["counts"][i]
+    else:
+        below, equal = (hist["below"][i] if i < len(hist["raws"]) else hist["total"]), 0
+    return round((below + equal / 2) * 100 / hist["total"], 1)
+
+
+# --- leaderboard ---
+
+def mask_name(name: str) -> str:
+    """"alisher" -> "a***r": leaderboard da to'liq login/ism ko'rsatilmaydi."""
+    if len(name) <= 2:
+        return name[:1] + "***"
+    return f"{name[0]}***{name[-1]}"
+
+
+def compute_leaderboard(mock_id: int, size: int = LEADERBOARD_SIZE) -> list:
+    """Bitta GROUP BY so'rov (+ user nomlari): [{"rank", "user_id", "name", "score", "total"}, ...]."""
+    rows = list(
+        Attempt.objects
+        .filter(mock_id=mock_id, user__isnull=False, listening_raw__isnull=False, reading_raw__isnull=False)
+        .values("user_id")
+        .annotate(best=Max(F("listening_raw") + F("reading_raw")),
+                  out_of=Max(F("listening_total") + F("reading_total")))
+        .order_by("-best", "user_id")[:size]
+    )
+    user_model = get_user_model()
+    names = {
+        user.pk: mask_name(user.get_short_name() or user.get_username())
+        for user in user_model.objects.filter(pk__in=[row["user_id"] for row in rows])
+    }
+    return [
+        {"rank": n, "user_id": row["user_id"], "name": names.get(row["user_id"], ""),
+         "score": row["best"], "total": row["out_of"]}
+        for n, row in enumerate(rows, 1)
+    ]
+
+
+def refresh_leaderboard(mock_id: int) -> list:
+    board = compute_leaderboard(mock_id, _setting("LEADERBOARD_SIZE", LEADERBOARD_SIZE))
+    # cron yangilab turadi; u to'xtasa ham eskirgan jadval abadiy qolmaydi
+    cache.set(_leaderboard_key(mock_id), board, _setting("LEADERBOARD_CACHE_SECONDS", LEADERBOARD_TIMEOUT))
+    return board
+
+
+def leaderboard(mock_id: int) -> list:
+    board = cache.get(_leaderboard_key(mock_id))
+    if board is None:
+        board = refresh_leaderboard(mock_id)
+    return board
+
+
+def result_sections(attempt: Attempt) -> list:
+    """Natija sahifasi: baholangan har section uchun raw/total/band va percentile."""
+    sections = []
+    for section in RANKED_SECTIONS:
+        raw = getattr(attempt, f"{section}_raw")
+        if raw is None:
+            continue
+        sections.append({
+            "section": section,
+            "raw": raw,
+            "total": getattr(attempt, f"{section}_total"),
+            "band": getattr(attempt, f"{section}_band"),
+            "percentile": percentile_rank(attempt.mock_id, section, raw),
+        })
+    return sections
@@ -0,0 +1,169 @@
+"""
+Listening/Reading avtomatik baholash.
+
+Answer key formatlari (ListeningQuestion / ReadingQuestion.answer_key):
+    short:       {"values": ["johnson"], "case_sensitive": false, "max_words": 1}
+    mcq_multi:   {"values": ["A", "C"]}
+    boshqalar:   {"value": "B"}   (tfng, yesno, mcq_single, matching, map, heading)
+
+Response formatlari (*AttemptAnswer.response) views._normalize_response dan keladi:
+    short -> {"text": "..."}, mcq_multi -> {"values": [...]}, boshqalar -> {"value": "..."}
+"""
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.db import transaction
+
+from . import item_stats
+from .answer_keys import CompiledQuestion, get_answer_key
+from .models import Attempt
+
+# (min raw score out of 40, band) — yuqoridan pastga
+LISTENING_BANDS = [
+    (39, "9.0"), (37, "8.5"), (35, "8.0"), (32, "7.5"), (30, "7.0"),
+    (26, "6.5"), (23, "6.0"), (18, "5.5"), (16, "5.0"), (13, "4.5"),
+    (10, "4.0"), (8, "3.5"), (6, "3.0"), (4, "2.5"), (2, "2.0"), (1, "1.0"),
+]
+
+# Academic Reading
+READING_BANDS = [
+    (39, "9.0"), (37, "8.5"), (35, "8.0"), (33, "7.5"), (30, "7.0"),
+    (27, "6.5"), (23, "6.0"), (19, "5.5"), (15, "5.0"), (13, "4.5"),
+    (10, "4.0"), (8, "3.5"), (6, "3.0"), (4, "2.5"), (2, "2.0"), (1, "1.0"),
+]
+
+# section -> (test model, question model, option model, answer model, band table)
+SECTIONS = {
+    "listening": (
+        "listening.ListeningTest", "listening.ListeningQuestion", "listening.ListeningOption",
+        "listening.ListeningAttemptAnswer", LISTENING_BANDS,
+    ),
+    "reading": (
+        "reading.ReadingTest", "reading.ReadingQuestion", "reading.ReadingOption",
+        "reading.ReadingAttemptAnswer", READING_BANDS,
+    ),
+}
+
+BATCH_SIZE = 500
+
+
+def band_for(section: str, raw: int, total: int) -> Decimal:
+    """
+    Raw ballni IELTS bandga o'giradi. Jadval 40 savolga mo'ljallangan,
+    shuning uchun boshqa uzunlikdagi testlar 40 ga proporsional keltiriladi.
+    """
+    if total <= 0 or raw <= 0:
+        return Decimal("0.0")
+    scaled = round(raw * 40 / total) if total != 40 else raw
+    for min_raw, band in SECTIONS[section][4]:
+        if scaled >= min_raw:
+            return Decimal(band)
+    return Decimal("0.0")
+
+
+def is_correct(qtype: str, answer_key: dict, response: dict, option_keys=()) -> bool:
+    """Bitta savolni tekshirish (preview/test uchun); batch baholash keshdan foydalanadi."""
+    return CompiledQuestion(None, None, qtype, answer_key, option_keys).check(response)
+
+
+def _answer_keys_by_mock(section: str, mock_ids) -> dict:
+    """mock_id -> CompiledAnswerKey (bitta so'rov; kesh issiq bo'lsa savollar o'qilmaydi)."""
+    test_model = apps.get_model(SECTIONS[section][0])
+    rows = (
+        test_model.objects
+        .filter(section__mock_id__in=mock_ids)
+        .values_list("id", "section__mock_id", "content_version")
+    )
+    return {
+        mock_id: get_answer_key(section, test_id, version)
+        for test_id, mock_id, version in rows
+    }
+
+
+def grade_attempts(section: str, attempt_ids, batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Ko'p attemptni bitta batchda baholaydi va natijani Attempt ga yozadi.
+
+    Har bir batch uchun so'rovlar soni attemptlar soniga bog'liq emas:
+    attempt->mock, testlar (versiya), javoblar va bulk_update. Birinchi marta
+    baholangan attemptlar item statistikasiga qo'shiladi (item_stats.fold, +3 so'rov).
+    Har batch bitta tranzaksiyada: attempt qatorlari select_for_update bilan o'qiladi,
+    natija va statistika birga yoziladi (yarim yozilgan batch qolmaydi).
+    Qaytaradi: {attempt_id: (raw, total, band)}.
+    """
+    answer_model = apps.get_model(SECTIONS[section][3])
+
+    attempt_ids = list(attempt_ids)
+    results = {}
+    for start in range(0, len(attempt_ids), batch_size):
+        chunk = attempt_ids[start:start + batch_size]
+        with transaction.atomic():
+            # qatorlar qulflanadi: "{section}_raw NULL edi" (birinchi baholash) ni parallel
+            # grade (submit + sweeper, ikki regrade) faqat bir marta ko'radi
+            rows = (
+                Attempt.objects
+                .select_for_update()
+                .filter(id__in=chunk)
+                .order_by("id")
+                .values_list("id", "mock_id", f"{section}_raw")
+            )
+            mock_by_attempt = {}
+            first_graded = set()
+            for attempt_id, mock_id, previous_raw in rows:
+                mock_by_attempt[attempt_id] = mock_id
+                if previous_raw is None:
+                    first_graded.add(attempt_id)
+            keys = _answer_keys_by_mock(section, set(mock_by_attempt.values()))
+
+            raw = dict.fromkeys(mock_by_attempt, 0)
+            given = {attempt_id: {} for attempt_id in first_graded}
+            answers = (
+                answer_model.objects
+                .filter(attempt_id__in=mock_by_attempt)
+                .values_list("attempt_id", "question_id", "response")
+            )
+            for attempt_id, qid, response in answers.iterator(chunk_size=2000):
+                key = keys.get(mock_by_attempt[attempt_id])
+                correct = key is not None and key.check(qid, response)
+                if correct:
+                    raw[attempt_id] += 1
+                if attempt_id in given:
+                    given[attempt_id][qid] = (response, correct)
+
+            to_update = []
+            stats = item_stats.Accumulator(section)
+            for attempt_id, mock_id in mock_by_attempt.items():
+                key = keys.get(mock_id)
+                total = key.total if key else 0
+                band = band_for(section, raw[attempt_id], total)
+                results[attempt_id] = (raw[attempt_id], total, band)
+                if key is not None and attempt_id in given:
+                    stats.add(key, mock_id, raw[attempt_id], given[attempt_id])
+                to_update.append(Attempt(id=attempt_id, **{
+                    f"{section}_raw": raw[attempt_id],
+                    f"{section}_total": total,
+                    f"{section}_band": band,
+                }))
+
+            Attempt.objects.bulk_update(
+                to_update,
+                [f"{section}_raw", f"{section}_total", f"{section}_band"],
+                batch_size=batch_size,
+            )
+            item_stats.fold(stats)
+    return results
+
+
+def grade_attempt(attempt: Attempt, section: str):
+    """Bitta attemptni baholaydi va instance maydonlarini ham yangilaydi."""
+    raw, total, band = grade_attempts(section, [attempt.id])[attempt.id]
+    setattr(attempt, f"{section}_raw", raw)
+    setattr(attempt, f"{section}_total", total)
+    setattr(attempt, f"{section}_band", band)
+    return raw, total, band
+
+
+async def agrade_attempt(attempt: Attempt, section: str):
+    """Async view lar uchun: baholash (answer key, javoblar, bulk_update) bitta sync_to_async da."""
+    return await sync_to_async(grade_attempt)(attempt, section)
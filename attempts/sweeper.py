@@ -0,0 +1,121 @@
+"""
+Muddati o'tgan attemptlarni server tomonda yakunlash.
+
+Brauzer yopilsa yoki taymer ishlamasa attempt "in_progress" da qolib ketadi.
+`manage.py sweep_attempts` section_deadline i o'tgan attemptlarni partial indeks
+(attempt_in_progress_idx) bo'yicha batchlab oladi va har batch uchun:
+
+  1. write-behind bufferini flush qiladi va joriy sectionni grade_attempts bilan baholaydi
+     (listening/reading — section bo'yicha bitta batch);
+  2. submit view lari kabi keyingi sectionga o'tkazadi (context.SECTION_ORDER): yangi
+     deadline = eski deadline + section davomiyligi (context.section_duration, nomzod
+     vaqtida o'tgandek). Oxirgi section yoki keyingisining testi yo'q bo'lsa attempt
+     "submitted" bo'ladi;
+  3. hammasini bitta bulk_update bilan yozadi va kanal holatini yangilaydi (ochiq
+     SSE streamlar yangi section/status ni oladi).
+
+Attemptlar birma-bir o'qilmaydi: batch ga so'rovlar soni attemptlar soniga bog'liq emas.
+Tashlab ketilgan attempt keyingi deadline ham o'tgan bo'lsa shu sweepning o'zida
+navbatdagi batchda yana suriladi.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from mocks.models import MockSection
+
+from . import answer_buffer, channel
+from .context import SECTION_ORDER, SECTION_TESTS, TIMED_TESTS, grace_seconds, section_duration
+from .models import Attempt
+from .scoring import BATCH_SIZE, SECTIONS, grade_attempts
+
+
+def _section_plans(mock_ids) -> dict:
+    """mock_id -> {section: (test_id, duration_seconds | None)} (bitta so'rov)."""
+    test_durations = [f"{SECTION_TESTS[s]}__duration_seconds" for s in sorted(TIMED_TESTS)]
+    test_ids = [f"{SECTION_TESTS[s]}__id" for s in SECTION_ORDER]
+    rows = (
+        MockSection.objects
+        .filter(mock_id__in=mock_ids, section__in=SECTION_ORDER)
+        .values("mock_id", "section", "duration_seconds", *test_durations, *test_ids)
+    )
+    plans = defaultdict(dict)
+    for row in rows:
+        section = row["section"]
+        plans[row["mock_id"]][section] = (row[f"{SECTION_TESTS[section]}__id"], section_duration(section, row))
+    return plans
+
+
+def _next_section(plan: dict, current: str):
+    """
+    advance_section bilan bir xil: SECTION_ORDER dagi keyingi section, (name, duration).
+    Oxirgi section yoki keyingisining testi yo'q bo'lsa None (attempt yakunlanadi).
+    """
+    index = SECTION_ORDER.index(current) + 1 if current in SECTION_ORDER else len(SECTION_ORDER)
+    if index >= len(SECTION_ORDER):
+        return None
+    name = SECTION_ORDER[index]
+    test_id, duration = plan.get(name, (None, None))
+    return None if test_id is None else (name, duration)
+
+
+def _sweep_batch(rows, now, stats: Counter) -> None:
+    ids_by_section = defaultdict(list)
+    for attempt_id, _, section, _ in rows:
+        ids_by_section[section].append(attempt_id)
+    for section, ids in ids_by_section.items():
+        if section in SECTIONS:
+            if answer_buffer.is_enabled():
+                answer_buffer.flush(section, ids)
+            grade_attempts(section, ids)
+            stats["graded"] += len(ids)
+
+    plans = _section_plans({mock_id for _, mock_id, _, _ in rows})
+    updates = []
+    for attempt_id, mock_id, section, deadline in rows:
+        nxt = _next_section(plans.get(mock_id, {}), section)
+        if nxt is None:
+            updates.append(Attempt(
+                id=attempt_id, status="submitted", current_section=section,
+                section_deadline=None, finished_at=now,
+            ))
+            stats["submitted"] += 1
+        else:
+            name, duration = nxt
+            updates.append(Attempt(
+                id=attempt_id, status="in_progress", current_section=name,
+                section_deadline=deadline + timedelta(seconds=duration) if duration else None, finished_at=None,
+            ))
+            stats["advanced"] += 1
+    Attempt.objects.bulk_update(updates, ["status", "current_section", "section_deadline", "finished_at"])
+    channel.publish_attempts(updates)
+
+
+def sweep(now=None, batch_size: int = BATCH_SIZE) -> Counter:
+    """
+    Muddati o'tgan hamma attemptlarni suradi: {"advanced": n, "submitted": n, "graded": n, "batches": n}.
+    Deadline dan keyin DEADLINE_GRACE_SECONDS kutiladi — ochiq tabdagi klient o'zi submit
+    qilishga ulgursin. Har batch alohida tranzaksiyada; PostgreSQL da band qatorlar
+    (skip_locked) keyingi sweep ga qoladi. Submit view lari o'tishni shartli UPDATE bilan
+    qiladi (context.advance_section): sweeper qulflagan qatorda u kutadi va holat
+    o'zgargani uchun yutqazadi — attempt ikki marta surilmaydi va baholanmaydi.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=grace_seconds())
+    stats = Counter()
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Attempt.objects
+                .select_for_update(skip_locked=True)
+                .filter(status="in_progress", section_deadline__lte=cutoff)
+                .order_by("section_deadline")
+                .values_list("id", "mock_id", "current_section", "section_deadline")[:batch_size]
+            )
+            if not rows:
+                break
+            _sweep_batch(rows, now, stats)
+            stats["batches"] += 1
+    return stats
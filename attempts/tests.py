@@ -1,3 +1,1051 @@
-from django.test import TestCase
+import importlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock as mocklib
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, resolve
+from django.utils import timezone
+
+from attempts import answer_buffer, answer_keys, channel, context, item_stats, loadtest, rankings, sweeper
+from attempts import answers as answers_module
+from attempts.models import Attempt, ItemStat, OptionStat, ScoreStat
+from config.instrumentation import capture_requests
+from attempts.scoring import band_for, grade_attempts, is_correct
+from listening.models import ListeningAttemptAnswer, ListeningOption, ListeningQuestion, ListeningTest
+from mocks.models import Mock, MockAccess, MockSection
+from reading.models import ReadingAttemptAnswer, ReadingPassage, ReadingQuestion, ReadingTest
+from writing.models import WritingTest
+
+
+def make_mock(slug="mock-1", listening_questions=4, reading_questions=4, writing_test=False):
+    """Kichik mock: listening + reading testlari va short/mcq savollar (writing testi ixtiyoriy)."""
+    mock = Mock.objects.create(title=slug, slug=slug, is_free=True)
+    ls = MockSection.objects.create(mock=mock, section="listening", order=1, duration_seconds=1800)
+    rs = MockSection.objects.create(mock=mock, section="reading", order=2, duration_seconds=3600)
+    ws = MockSection.objects.create(mock=mock, section="writing", order=3, duration_seconds=3600)
+    if writing_test:
+        WritingTest.objects.create(section=ws)
+
+    lt = ListeningTest.objects.create(section=ls, audio="listening_audio/test.mp3")
+    for i in range(1, listening_questions + 1):
+        ListeningQuestion.objects.create(
+            test=lt, order=i, qtype="short", prompt=f"Q{i}",
+            answer_key={"values": [f"answer {i}"], "case_sensitive": False, "max_words": 2},
+        )
+
+    rt = ReadingTest.objects.create(section=rs)
+    passage = ReadingPassage.objects.create(test=rt, order=1, content="<p>text</p>")
+    for i in range(1, reading_questions + 1):
+        ReadingQuestion.objects.create(
+            test=rt, passage=passage, order=i, qtype="mcq_single", prompt=f"Q{i}",
+            answer_key={"value": "B"},
+        )
+    return mock
+
+
+class IsCorrectTests(TestCase):
+    def test_short_answer_normalization_and_word_limit(self):
+        key = {"values": ["10:30", "ten thirty"], "case_sensitive": False, "max_words": 2}
+        self.assertTrue(is_correct("short", key, {"text": "  Ten   THIRTY "}))
+        self.assertTrue(is_correct("short", key, {"text": "10:30"}))
+        self.assertFalse(is_correct("short", key, {"text": "ten thirty am"}))
+        self.assertFalse(is_correct("short", key, {"text": ""}))
+
+    def test_short_answer_case_sensitive(self):
+        key = {"values": ["NASA"], "case_sensitive": True}
+        self.assertTrue(is_correct("short", key, {"text": "NASA"}))
+        self.assertFalse(is_correct("short", key, {"text": "nasa"}))
+
+    def test_single_value_types(self):
+        for qtype in ("tfng", "yesno", "mcq_single", "matching", "map", "heading"):
+            self.assertTrue(is_correct(qtype, {"value": "Not Given"}, {"value": "not given"}), qtype)
+            self.assertFalse(is_correct(qtype, {"value": "B"}, {"value": "C"}), qtype)
+            self.assertFalse(is_correct(qtype, {}, {"value": ""}), qtype)
+
+    def test_mcq_multi_requires_exact_set(self):
+        key = {"values": ["A", "C"]}
+        self.assertTrue(is_correct("mcq_multi", key, {"values": ["C", "A"]}))
+        self.assertFalse(is_correct("mcq_multi", key, {"values": ["A"]}))
+        self.assertFalse(is_correct("mcq_multi", key, {"values": ["A", "B", "C"]}))
+        self.assertFalse(is_correct("mcq_multi", key, {"values": ["A", "C", "Z"]}, option_keys="ABCD"))
+
+
+class ItemStatsTests(TestCase):
+    def setUp(self):
+        answer_keys.clear_cache()
+        self.mock = make_mock()
+        self.q1, self.q2, self.q3, _ = ReadingQuestion.objects.filter(test__section__mock=self.mock).order_by("order")
+        # (Q1, Q2) javoblari; kalit "B" -> raw 2, 1, 0, 0
+        self.attempts = []
+        for first, second in (("B", "B"), ("B", "C"), ("C", None), ("", None)):
+            attempt = Attempt.objects.create(mock=self.mock, current_section="reading")
+            ReadingAttemptAnswer.objects.create(attempt=attempt, question=self.q1, response={"value": first})
+            if second:
+                ReadingAttemptAnswer.objects.create(attempt=attempt, question=self.q2, response={"value": second})
+            self.attempts.append(attempt.id)
+
+    def snapshot(self):
+        return (
+            sorted(ItemStat.objects.values_list(
+                "question_id", "attempts", "correct", "blank", "score_sum", "score_sq_sum", "score_sum_correct")),
+            sorted(OptionStat.objects.values_list("question_id", "choice", "count")),
+            sorted(ScoreStat.objects.values_list("mock_id", "section", "raw", "count")),
+        )
+
+    def test_difficulty_discrimination_and_distractors(self):
+        grade_attempts("reading", self.attempts)
+
+        report = {row["question_id"]: row for row in item_stats.test_report("reading", self.q1.test_id)}
+        self.assertEqual(len(report), 4)
+        q1 = report[self.q1.id]
+        self.assertEqual((q1["attempts"], q1["p_value"], q1["blank_rate"]), (4, 0.5, 0.25))
+        # ballar [2, 1, 0, 0]: to'g'rilar o'rtachasi 1.5, noto'g'rilar 0, dispersiya 0.6875
+        self.assertAlmostEqual(q1["discrimination"], 1.5 / 0.6875 ** 0.5 * 0.5)
+        self.assertEqual(q1["choices"], {"b": 2, "c": 1})
+        self.assertEqual(report[self.q2.id]["choices"], {"b": 1, "c": 1})
+        self.assertEqual(report[self.q3.id]["p_value"], 0)
+        self.assertIsNone(report[self.q3.id]["discrimination"])
+        self.assertEqual(item_stats.score_distribution(self.mock.id, "reading"), {0: 2, 1: 1, 2: 1})
+
+    def test_regrade_does_not_count_twice(self):
+        grade_attempts("reading", self.attempts[:2])
+        grade_attempts("reading", self.attempts)
+        self.assertEqual(ItemStat.objects.get(question_id=self.q1.id).attempts, 4)
+        self.assertEqual(sum(ScoreStat.objects.values_list("count", flat=True)), 4)
+
+    def test_incremental_matches_rebuild(self):
+        grade_attempts("reading", self.attempts[:1])
+        grade_attempts("reading", self.attempts[1:])
+        incremental = self.snapshot()
+
+        out = StringIO()
+        call_command("rebuild_item_stats", "--section", "reading", "--batch-size", "3", stdout=out)
+        self.assertIn("reading: 4 attempts, 4 questions", out.getvalue())
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_rebuild_query_count_does_not_grow_with_attempts(self):
+        def queries_for(count):
+            Attempt.objects.exclude(id__in=self.attempts[:count]).delete()
+            grade_attempts("reading", self.attempts[:count])
+            answer_keys.clear_cache()
+            with CaptureQueriesContext(connection) as ctx:
+                item_stats.rebuild("reading")
+            return len(ctx)
+
+        self.assertEqual(queries_for(4), queries_for(1))
+
+
+class BandTests(TestCase):
+    def test_listening_and_reading_tables(self):
+        self.assertEqual(band_for("listening", 40, 40), Decimal("9.0"))
+        self.assertEqual(band_for("listening", 30, 40), Decimal("7.0"))
+        self.assertEqual(band_for("reading", 30, 40), Decimal("7.0"))
+        self.assertEqual(band_for("reading", 26, 40), Decimal("6.0"))
+        self.assertEqual(band_for("reading", 0, 40), Decimal("0.0"))
+
+    def test_short_tests_are_scaled_to_40(self):
+        # 30 savollik listening: 30/30 -> 40/40
+        self.assertEqual(band_for("listening", 30, 30), Decimal("9.0"))
+        self.assertEqual(band_for("listening", 15, 30), Decimal("5.5"))
+
+
+class GradeAttemptsTests(TestCase):
+    def setUp(self):
+        answer_keys.clear_cache()
+        self.mock = make_mock(writing_test=True)
+
+    def _answer_listening(self, attempt, correct):
+        for q in ListeningQuestion.objects.filter(test__section__mock=self.mock)[:correct]:
+            ListeningAttemptAnswer.objects.create(
+                attempt=attempt, question=q, response={"text": f"Answer {q.order}"},
+            )
+
+    def test_batch_grading_persists_scores(self):
+        attempts = [Attempt.objects.create(mock=self.mock) for _ in range(3)]
+        for n, attempt in enumerate(attempts):
+            self._answer_listening(attempt, n + 1)
+
+        results = grade_attempts("listening", [a.id for a in attempts])
+
+        self.assertEqual([results[a.id][0] for a in attempts], [1, 2, 3])
+        attempt = Attempt.objects.get(id=attempts[2].id)
+        self.assertEqual((attempt.listening_raw, attempt.listening_total), (3, 4))
+        self.assertEqual(attempt.listening_band, band_for("listening", 3, 4))
+
+    def test_query_count_does_not_grow_with_attempts(self):
+        attempts = [Attempt.objects.create(mock=self.mock) for _ in range(20)]
+        for attempt in attempts:
+            self._answer_listening(attempt, 2)
+
+        grade_attempts("listening", [attempts[0].id])  # answer key keshga tushadi
+        # savepoint, attempt->mock (FOR UPDATE), testlar, javoblar, bulk_update +
+        # ItemStat, ScoreStat upsert (OptionStat — tanlovli javob yo'q), release
+        with self.assertNumQueries(8):
+            grade_attempts("listening", [a.id for a in attempts])
+        # qayta baholash statistikaga qo'shilmaydi
+        with self.assertNumQueries(6):
+            grade_attempts("listening", [a.id for a in attempts])
+
+    def test_reading_submit_grades_attempt(self):
+        user = get_user_model().objects.create_user("candidate", password="pass12345")
+        self.client.force_login(user)
+        attempt = Attempt.objects.create(mock=self.mock, current_section="reading")
+        session = self.client.session
+        session["active_attempt_id"] = attempt.id
+        session.save()
+
+        question = ReadingQuestion.objects.get(test__section__mock=self.mock, order=1)
+        ReadingAttemptAnswer.objects.create(attempt=attempt, question=question, response={"value": "B"})
+
+        res = self.client.post("/reading/submit/")
+        self.assertEqual(res.status_code, 200)
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.current_section, "writing")
+        self.assertEqual((attempt.reading_raw, attempt.reading_total), (1, 4))
+
+    def test_reading_submit_finishes_mock_without_writing_test(self):
+        mock = make_mock("mock-2")
+        user = get_user_model().objects.create_user("candidate", password="pass12345")
+        self.client.force_login(user)
+        attempt = Attempt.objects.create(mock=mock, user=user, current_section="reading")
+        session = self.client.session
+        session["active_attempt_id"] = attempt.id
+        session.save()
+
+        res = self.client.post("/reading/submit/")
+        self.assertEqual(res.json()["redirect"], f"/attempts/{attempt.id}/result/")
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.status, "submitted")
+        self.assertIsNotNone(attempt.finished_at)
+        self.assertEqual(attempt.reading_raw, 0)
+
+
+class AnswerKeyCacheTests(TestCase):
+    def setUp(self):
+        answer_keys.clear_cache()
+        self.mock = make_mock()
+        self.test = ListeningTest.objects.get(section__mock=self.mock)
+
+    def test_compiled_key_is_reused_until_content_changes(self):
+        key = answer_keys.answer_key_for_test("listening", self.test)
+        self.assertEqual(key.total, 4)
+        self.assertIs(answer_keys.answer_key_for_test("listening", self.test), key)
+
+        question = ListeningQuestion.objects.get(test=self.test, order=1)
+        self.assertFalse(key.check(question.id, {"text": "new answer"}))
+        question.answer_key = {"values": ["new answer"]}
+        question.save()
+
+        self.test.refresh_from_db()
+        fresh = answer_keys.answer_key_for_test("listening", self.test)
+        self.assertIsNot(fresh, key)
+        self.assertTrue(fresh.check(question.id, {"text": "New  Answer"}))
+
+    def test_option_change_bumps_version(self):
+        question = ListeningQuestion.objects.create(
+            test=self.test, order=10, qtype="mcq_multi", prompt="Pick two",
+            answer_key={"values": ["A", "C"]},
+        )
+        self.test.refresh_from_db()
+        version = self.test.content_version
+        ListeningOption.objects.create(question=question, key="A", text="one")
+        self.test.refresh_from_db()
+        self.assertEqual(self.test.content_version, version + 1)
+
+        key = answer_keys.answer_key_for_test("listening", self.test)
+        self.assertTrue(key.check(question.id, {"values": ["c", "a"]}))
+
+
+class AnswerBufferTests(TestCase):
+    def setUp(self):
+        answer_keys.clear_cache()
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        settings_override = override_settings(
+            ANSWER_WRITE_BEHIND=True,
+            ANSWER_BUFFER_CACHE="answers",
+            ANSWER_BUFFER_FLUSH_SECONDS=3600,
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                "answers": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": self.cache_dir,
+                },
+                "channel": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            },
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.mock = make_mock()
+        self.user = get_user_model().objects.create_user("candidate", password="pass12345")
+        self.client.force_login(self.user)
+        self.attempt = Attempt.objects.create(mock=self.mock)
+        session = self.client.session
+        session["active_attempt_id"] = self.attempt.id
+        session.save()
+        self.questions = list(ListeningQuestion.objects.filter(test__section__mock=self.mock))
+
+    def save(self, *answers):
+        return self.client.post(
+            "/listening/save-answers/",
+            {"answers": [{"question_id": q.id, "value": v, "client_seq": 1} for q, v in answers]},
+            content_type="application/json",
+        )
+
+    def test_answers_are_buffered_until_submit(self):
+        q1, q2 = self.questions[:2]
+        self.save((q1, "answer 1"), (q2, "wrong"))
+        self.save((q2, "answer 2"))
+        self.assertFalse(ListeningAttemptAnswer.objects.exists())
+        self.assertEqual(answer_buffer.buffer_metrics()["depth"], 3)  # javob yozuvlari
+
+        res = self.client.post("/listening/submit/")
+        self.assertEqual(res.status_code, 200)
+
+        self.assertEqual(ListeningAttemptAnswer.objects.filter(attempt=self.attempt).count(), 2)
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.listening_raw, 2)
+        metrics = answer_buffer.buffer_metrics()
+        self.assertEqual(metrics["depth"], 0)
+        self.assertEqual(metrics["flushes"], 1)
+        self.assertGreater(metrics["max_flush_ms"], 0)
+
+    def test_terminate_flushes_buffer(self):
+        self.save((self.questions[0], "answer 1"))
+        self.client.post("/listening/terminate/")
+        self.assertEqual(ListeningAttemptAnswer.objects.filter(attempt=self.attempt).count(), 1)
+
+    def test_buffer_survives_process_restart(self):
+        self.save((self.questions[0], "answer 1"))
+        # "crash": process ichidagi cache obyektlari yo'qoladi, file backend diskda qoladi
+        del caches["answers"]
+
+        call_command("flush_answer_buffer", stdout=StringIO())
+
+        answer = ListeningAttemptAnswer.objects.get(attempt=self.attempt)
+        self.assertEqual(answer.response, {"text": "answer 1"})
+
+    def test_failed_db_write_keeps_buffer(self):
+        self.save((self.questions[0], "answer 1"))
+        with mocklib.patch("attempts.answers.write_answers", side_effect=RuntimeError("db down")):
+            with self.assertRaises(RuntimeError):
+                answer_buffer.flush("listening", [self.attempt.id])
+
+        self.assertEqual(answer_buffer.flush("listening", [self.attempt.id]), 1)
+        self.assertEqual(ListeningAttemptAnswer.objects.count(), 1)
+        # qayta flush idempotent: bufer bo'sh
+        self.assertEqual(answer_buffer.flush("listening", [self.attempt.id]), 0)
+
+    def test_answers_written_during_flush_are_not_dropped(self):
+        q1, q2 = self.questions[:2]
+        self.save((q1, "answer 1"))
+        original = answers_module.write_answers
+
+        def write_then_race(section, by_attempt):
+            written = original(section, by_attempt)
+            answer_buffer.buffer_answers("listening", self.attempt.id, {q2.id: {"text": "answer 2"}})
+            return written
+
+        with mocklib.patch("attempts.answers.write_answers", side_effect=write_then_race):
+            answer_buffer.flush("listening", [self.attempt.id])
+
+        # flush paytida kelgan javob yangi avlodda qoldi
+        self.assertEqual(answer_buffer.peek("listening", self.attempt.id), {q2.id: {"text": "answer 2"}})
+        self.assertEqual(answer_buffer.flush("listening", [self.attempt.id]), 1)
+        self.assertEqual(ListeningAttemptAnswer.objects.count(), 2)
+        self.assertEqual(answer_buffer.buffer_metrics()["depth"], 0)
+
+
+    def test_save_racing_flush_is_rewritten_to_new_generation(self):
+        q1, q2 = self.questions[:2]
+        self.save((q1, "answer 1"))
+        original = answer_buffer._incr
+        raced = []
+
+        def incr_then_flush(cache, key, *args, **kwargs):
+            value = original(cache, key, *args, **kwargs)
+            if key.endswith(":n") and not raced:
+                # save batch raqamini oldi, lekin hali yozmadi — flush eski avlodni o'qiydi
+                raced.append(key)
+                answer_buffer.flush("listening", [self.attempt.id])
+            return value
+
+        with mocklib.patch.object(answer_buffer, "_incr", side_effect=incr_then_flush):
+            answer_buffer.buffer_answers("listening", self.attempt.id, {q2.id: {"text": "answer 2"}})
+
+        self.assertEqual(ListeningAttemptAnswer.objects.count(), 1)
+        self.assertEqual(answer_buffer.flush("listening", [self.attempt.id]), 1)
+        self.assertEqual(
+            dict(ListeningAttemptAnswer.objects.values_list("question_id", "response")),
+            {q1.id: {"text": "answer 1"}, q2.id: {"text": "answer 2"}},
+        )
+
+class AttemptContextTests(TestCase):
+    def setUp(self):
+        answer_keys.clear_cache()
+        self.mock = make_mock()
+        self.user = get_user_model().objects.create_user("candidate", password="pass12345")
+        self.client.force_login(self.user)
+        self.question = ListeningQuestion.objects.filter(test__section__mock=self.mock).first()
+
+    def save(self):
+        return self.client.post(
+            "/listening/save-answers/",
+            {"answers": [{"question_id": self.question.id, "value": "x", "client_seq": 1}]},
+            content_type="application/json",
+        )
+
+    def test_start_stores_context(self):
+        self.client.get(f"/mocks/{self.mock.slug}/start/")
+        ctx = self.client.session[context.SESSION_KEY]
+        attempt = Attempt.objects.get(mock=self.mock)
+        self.assertEqual(ctx["attempt_id"], attempt.id)
+        self.assertEqual(ctx["current_section"], "listening")
+        self.assertEqual(ctx["test_id"], ListeningTest.objects.get(section__mock=self.mock).id)
+        self.assertIsNotNone(ctx["deadline"])
+
+    def test_transitions_refresh_context(self):
+        self.client.get(f"/mocks/{self.mock.slug}/start/")
+        self.assertEqual(self.save().status_code, 200)
+
+        self.client.post("/listening/submit/")
+        ctx = self.client.session[context.SESSION_KEY]
+        self.assertEqual(ctx["current_section"], "reading")
+        self.assertEqual(ctx["test_id"], ReadingTest.objects.get(section__mock=self.mock).id)
+        self.assertEqual(self.save().status_code, 403)
+
+        self.client.post("/reading/terminate/")
+        self.assertEqual(self.client.session[context.SESSION_KEY]["status"], "terminated")
+
+    def test_legacy_session_builds_context_once(self):
+        attempt = Attempt.objects.create(mock=self.mock)
+        session = self.client.session
+        session["active_attempt_id"] = attempt.id
+        session.save()
+
+        self.assertEqual(self.save().status_code, 200)
+        self.assertEqual(self.client.session[context.SESSION_KEY]["attempt_id"], attempt.id)
+
+
+class LoadTestHarnessTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        caches["channel"].clear()
+        answer_keys.clear_cache()
+        self.mock = make_mock(listening_questions=5, reading_questions=4, writing_test=True)
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def test_percentile_nearest_rank(self):
+        samples = list(range(1, 101))
+        self.assertEqual(loadtest.percentile(samples, 50), 50)
+        self.assertEqual(loadtest.percentile(samples, 95), 95)
+        self.assertEqual(loadtest.percentile([7], 99), 7)
+        self.assertIsNone(loadtest.percentile([], 50))
+
+    def test_command_runs_full_exam_and_writes_json(self):
+        path = os.path.join(self.tmp, "run.json")
+        args = ["loadtest", "--mock", self.mock.slug, "--candidates", "2", "--concurrency", "1",
+                "--think", "0", "--batch", "2"]
+        call_command(*args, "--output", path, "--keep", stdout=StringIO())
+
+        with open(path) as f:
+            result = json.load(f)
+        self.assertEqual(result["candidates"], {"total": 2, "completed": 2})
+        self.assertEqual(result["errors"], 0)
+        endpoints = result["endpoints"]
+        self.assertEqual(list(endpoints), loadtest.ENDPOINTS)
+        # 5 listening javobi 2 talik batchlarda -> nomzod boshiga 3 so'rov
+        self.assertEqual(endpoints["listening_save_answers"]["requests"], 6)
+        self.assertEqual(endpoints["reading_save_answers"]["requests"], 4)
+        self.assertIsNotNone(endpoints["listening_save_answers"]["queries_avg"])
+        self.assertEqual(Attempt.objects.filter(mock=self.mock, current_section="writing").count(), 2)
+
+        # --keep siz: run yaratgan foydalanuvchi va attemptlar o'chiriladi; oldingi run bilan solishtiriladi
+        out = StringIO()
+        call_command(*args, "--compare", path, stdout=out)
+        self.assertIn("Compared with previous run", out.getvalue())
+        self.assertIn("throughput_rps", out.getvalue())
+        self.assertFalse(get_user_model().objects.filter(username__startswith=loadtest.USER_PREFIX).exists())
+        # sintetik userlarning attemptlari (--keep bilan qolganlari ham) o'chiriladi
+        self.assertFalse(Attempt.objects.filter(mock=self.mock).exists())
+
+    def test_cleanup_keeps_real_candidates_attempts(self):
+        real = get_user_model().objects.create_user("candidate", password="pass12345")
+        original = loadtest.run_candidate
+
+        def run_candidate_then_real_start(transport, plan, recorder, rng):
+            ok = original(transport, plan, recorder, rng)
+            # run paytida haqiqiy nomzod (yoki boshqa tester) shu mockni boshladi
+            Attempt.objects.create(mock=self.mock, user=real)
+            Attempt.objects.create(mock=self.mock)
+            return ok
+
+        with mocklib.patch.object(loadtest, "run_candidate", side_effect=run_candidate_then_real_start):
+            loadtest.run(self.mock, 1, 1, loadtest.ClientTransport, think=0)
+        self.assertEqual(Attempt.objects.filter(mock=self.mock).count(), 3)
+
+        loadtest.cleanup(self.mock)
+        self.assertEqual(
+            sorted(Attempt.objects.filter(mock=self.mock).values_list("user_id", flat=True), key=str),
+            sorted([real.id, None], key=str),
+        )
+
+    def test_capacity_reports_highest_held_level(self):
+        def fake_run(mock, candidates, concurrency, make_transport, **options):
+            p95 = {1: 40.0, 2: 120.0, 4: 900.0}[concurrency]
+            return {
+                "errors": 0, "throughput_rps": 10.0 * concurrency,
+                "candidates": {"total": candidates, "completed": candidates},
+                "endpoints": {name: {"p95_ms": p95} for name in loadtest.SAVE_ENDPOINTS},
+            }
+
+        with mocklib.patch.object(loadtest, "run", side_effect=fake_run):
+            result = loadtest.capacity(self.mock, [1, 2, 4], None, slo_ms=500)
+        self.assertEqual([row["held"] for row in result["levels"]], [True, True, False])
+        self.assertEqual(result["held"], 2)
+
+    def test_capacity_command(self):
+        path = os.path.join(self.tmp, "capacity.json")
+        out = StringIO()
+        call_command("loadtest", "--mock", self.mock.slug, "--levels", "1", "--think", "0",
+                     "--slo-ms", "10000", "--label", "wsgi", "--output", path, stdout=out)
+        self.assertIn("Held 1 concurrent candidates.", out.getvalue())
+        with open(path) as f:
+            result = json.load(f)
+        self.assertEqual(result["config"]["label"], "wsgi")
+        self.assertEqual(result["levels"][0]["completed"], 1)
+
+
+class HotQueryIndexTests(TestCase):
+    """Autosave/grading/sweep/access so'rovlari indeks bo'yicha ishlashi (EXPLAIN)."""
+
+    def assertUsesIndex(self, queryset, index=None):
+        """SEARCH ... USING INDEX; partial indeks nomi berilsa uni to'liq o'qish (SCAN) ham yetarli."""
+        plan = queryset.explain()
+        table = queryset.model._meta.db_table
+        self.assertNotRegex(plan, rf"SCAN {table}\b(?! USING)", plan)
+        access = "(SEARCH|SCAN)" if index else "SEARCH"
+        self.assertRegex(plan, rf"{access} {table} USING (COVERING )?(INDEX|INTEGER PRIMARY KEY)", plan)
+        if index:
+            self.assertIn(index, plan)
+
+    def test_hot_queries_use_indexes(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("plan matnlari SQLite uchun")
+        now = timezone.now()
+        for answer_model, question_model in (
+            (ListeningAttemptAnswer, ListeningQuestion), (ReadingAttemptAnswer, ReadingQuestion),
+        ):
+            with self.subTest(answer_model.__name__):
+                # upsert konflikti va grading / load_answers
+                self.assertUsesIndex(answer_model.objects.filter(attempt_id=1, question_id=2))
+                self.assertUsesIndex(answer_model.objects.filter(attempt_id=1).values_list("question_id", "response"))
+                self.assertUsesIndex(answer_model.objects.filter(attempt_id__in=[1, 2, 3]))
+                # save validatsiyasi: savol testga tegishlimi
+                self.assertUsesIndex(question_model.objects.filter(test_id=1, id=2))
+
+        # sweeper: muddati o'tgan attemptlar
+        self.assertUsesIndex(
+            Attempt.objects.filter(status="in_progress", section_deadline__lte=now).order_by("section_deadline"),
+            "attempt_in_progress_idx",
+        )
+        self.assertUsesIndex(MockAccess.objects.filter(user_id=1, mock_id=2).active())
+        self.assertUsesIndex(MockAccess.objects.filter(user_id=1))
+
+
+class MockAccessExpiryTests(TestCase):
+    def test_expired_access_is_not_active(self):
+        user = get_user_model().objects.create_user("buyer", password="x")
+        mocks = [Mock.objects.create(title=f"Paid {i}", slug=f"paid-{i}") for i in range(3)]
+        MockAccess.objects.create(user=user, mock=mocks[0])
+        MockAccess.objects.create(user=user, mock=mocks[1], expires_at=timezone.now() + timedelta(days=1))
+        MockAccess.objects.create(user=user, mock=mocks[2], expires_at=timezone.now() - timedelta(days=1))
+
+        active = set(MockAccess.objects.filter(user=user).active().values_list("mock__slug", flat=True))
+        self.assertEqual(active, {"paid-0", "paid-1"})
+
+        self.client.force_login(user)
+        self.assertRedirects(self.client.get("/mocks/paid-2/start/"), "/mocks/paid-2/", fetch_redirect_response=False)
+
+
+class DeadlineTests(TestCase):
+    def setUp(self):
+        answer_keys.clear_cache()
+        self.mock = make_mock()
+        self.user = get_user_model().objects.create_user("candidate", password="pass12345")
+        self.client.force_login(self.user)
+
+    def start(self):
+        self.client.get(f"/mocks/{self.mock.slug}/start/")
+        return Attempt.objects.get(mock=self.mock)
+
+    def expire(self, attempt, seconds):
+        attempt.section_deadline = timezone.now() - timedelta(seconds=seconds)
+        attempt.save(update_fields=["section_deadline"])
+        session = self.client.session
+        session[context.SESSION_KEY]["deadline"] = attempt.section_deadline.timestamp()
+        session.save()
+
+    def test_start_and_submit_set_deadline(self):
+        before = timezone.now()
+        attempt = self.start()
+        self.assertAlmostEqual(
+            (attempt.section_deadline - before).total_seconds(), 1800, delta=5
+        )
+        response = self.client.get("/listening/")
+        self.assertLessEqual(response.context["total_seconds"], 1800)
+        self.assertGreater(response.context["total_seconds"], 1790)
+
+        self.client.post("/listening/submit/")
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.current_section, "reading")
+        self.assertAlmostEqual((attempt.section_deadline - timezone.now()).total_seconds(), 3600, delta=5)
+
+    def test_save_rejected_after_deadline_and_grace(self):
+        attempt = self.start()
+        question = ListeningQuestion.objects.filter(test__section__mock=self.mock).first()
+        body = {"answers": [{"question_id": question.id, "value": "x", "client_seq": 1}]}
+
+        self.expire(attempt, 5)  # grace ichida
+        response = self.client.post("/listening/save-answers/", body, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+
+        self.expire(attempt, 60)
+        response = self.client.post("/listening/save-answers/", body, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()["error"], "time is up")
+
+    def test_concurrent_submits_advance_once(self):
+        attempt = self.start()
+        # ikki so'rov attemptni bir vaqtda o'qidi (ikkalasida ham listening, in_progress)
+        first, second = Attempt.objects.get(id=attempt.id), Attempt.objects.get(id=attempt.id)
+        self.assertTrue(context.advance_section(first, "listening", "reading"))
+        self.assertFalse(context.advance_section(second, "listening", "reading"))
+        self.assertEqual((second.current_section, second.section_deadline), ("reading", first.section_deadline))
+        self.assertEqual(context.section_url(second), "/reading/")
+
+    def test_page_follows_sweeper(self):
+        attempt = self.start()
+        self.expire(attempt, 60)
+        sweeper.sweep()
+        response = self.client.get("/listening/")
+        self.assertRedirects(response, "/reading/", fetch_redirect_response=False)
+        self.assertEqual(self.client.session[context.SESSION_KEY]["current_section"], "reading")
+
+
+class SweeperTests(TestCase):
+    def setUp(self):
+        answer_keys.clear_cache()
+        self.mock = make_mock(writing_test=True)
+        self.questions = list(ListeningQuestion.objects.filter(test__section__mock=self.mock).order_by("order"))
+
+    def expired_attempt(self, seconds, section="listening"):
+        return Attempt.objects.create(
+            mock=self.mock, current_section=section,
+            section_deadline=timezone.now() - timedelta(seconds=seconds),
+        )
+
+    def test_grades_and_advances_expired_attempt(self):
+        attempt = self.expired_attempt(60)
+        deadline = attempt.section_deadline
+        ListeningAttemptAnswer.objects.create(attempt=attempt, question=self.questions[0], response={"text": "answer 1"})
+        fresh = Attempt.objects.create(
+            mock=self.mock, current_section="listening", section_deadline=timezone.now() + timedelta(minutes=5)
+        )
+        in_grace = self.expired_attempt(5)
+
+        stats = sweeper.sweep()
+
+        attempt.refresh_from_db()
+        self.assertEqual((attempt.status, attempt.current_section), ("in_progress", "reading"))
+        self.assertEqual(attempt.section_deadline, deadline + timedelta(seconds=3600))
+        self.assertEqual(attempt.listening_raw, 1)
+        self.assertEqual(stats["advanced"], 1)
+        for untouched in (fresh, in_grace):
+            untouched.refresh_from_db()
+            self.assertEqual(untouched.current_section, "listening")
+            self.assertIsNone(untouched.listening_raw)
+
+    def test_abandoned_attempt_is_submitted(self):
+        # listening + reading + writing (1800 + 3600 + 3600) allaqachon o'tgan
+        attempt = self.expired_attempt(3 * 3600)
+        stats = sweeper.sweep()
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.status, "submitted")
+        self.assertEqual(attempt.current_section, "writing")
+        self.assertIsNone(attempt.section_deadline)
+        self.assertIsNotNone(attempt.finished_at)
+        self.assertEqual((attempt.listening_raw, attempt.reading_raw), (0, 0))
+        self.assertEqual(stats["submitted"], 1)
+        self.assertEqual(sweeper.sweep()["batches"], 0)
+
+    def test_reading_advances_to_writing_with_unset_duration(self):
+        MockSection.objects.filter(mock=self.mock, section="writing").update(duration_seconds=0)
+        attempt = self.expired_attempt(60, section="reading")
+        deadline = attempt.section_deadline
+
+        sweeper.sweep()
+
+        attempt.refresh_from_db()
+        self.assertEqual((attempt.status, attempt.current_section), ("in_progress", "writing"))
+        self.assertEqual(
+            attempt.section_deadline, deadline + timedelta(seconds=context.DEFAULT_SECTION_SECONDS["writing"])
+        )
+        self.assertEqual(attempt.reading_raw, 0)
+
+    def test_next_section_without_test_finishes_attempt(self):
+        attempt = Attempt.objects.create(
+            mock=make_mock("mock-2"), current_section="reading",
+            section_deadline=timezone.now() - timedelta(seconds=60),
+        )
+        sweeper.sweep()
+        attempt.refresh_from_db()
+        self.assertEqual((attempt.status, attempt.current_section), ("submitted", "reading"))
+
+    def test_query_count_does_not_grow_with_attempts(self):
+        def queries_for(count):
+            answer_keys.clear_cache()
+            Attempt.objects.all().delete()
+            for _ in range(count):
+                self.expired_attempt(60)
+            with CaptureQueriesContext(connection) as ctx:
+                stats = sweeper.sweep()
+            self.assertEqual(stats["advanced"], count)
+            return len(ctx)
+
+        self.assertEqual(queries_for(2), queries_for(8))
+
+    def test_command(self):
+        self.expired_attempt(60)
+        out = StringIO()
+        call_command("sweep_attempts", stdout=out)
+        self.assertIn("1 advanced", out.getvalue())
+
+
+def reload_urls():
+    for name in ("listening.urls", "reading.urls", "writing.urls", "config.urls"):
+        importlib.reload(sys.modules[name])
+    clear_url_caches()
+
+
+class AsyncViewTests(TestCase):
+    """ASYNC_VIEWS=True: autosave/submit/terminate async view lar orqali."""
+
+    def setUp(self):
+        answer_keys.clear_cache()
+        self.addCleanup(reload_urls)
+        self.enterContext(override_settings(ASYNC_VIEWS=True))
+        reload_urls()
+        self.mock = make_mock(writing_test=True)
+        self.user = get_user_model().objects.create_user("candidate", password="pass12345")
+        self.listening = list(ListeningQuestion.objects.filter(test__section__mock=self.mock).order_by("order"))
+        self.reading = list(ReadingQuestion.objects.filter(test__section__mock=self.mock).order_by("order"))
+
+    def batch(self, questions, value):
+        return {"answers": [{"question_id": q.id, "value": value, "client_seq": n} for n, q in enumerate(questions, 1)]}
+
+    def test_async_views_are_routed(self):
+        for path in ("/listening/save-answers/", "/listening/submit/", "/reading/terminate/"):
+            self.assertTrue(resolve(path).func.__name__.endswith("_async"), path)
+
+    async def test_full_section_flow(self):
+        client = self.async_client
+        await client.aforce_login(self.user)
+        await client.get(f"/mocks/{self.mock.slug}/start/")
+
+        with capture_requests() as records:
+            response = await client.post(
+                "/listening/save-answers/", self.batch(self.listening[:2], "answer 1"), content_type="application/json"
+            )
+        self.assertEqual(response.json(), {"ok": True, "saved": 2, "rejected": [], "ack": 2})
+        self.assertGreater(records[0]["queries"], 0)
+        self.assertEqual(await ListeningAttemptAnswer.objects.acount(), 2)
+
+        response = await client.post("/listening/submit/")
+        self.assertEqual(response.json()["redirect"], "/reading/")
+        attempt = await Attempt.objects.aget(mock=self.mock)
+        self.assertEqual((attempt.current_section, attempt.listening_raw), ("reading", 1))
+        self.assertIsNotNone(attempt.section_deadline)
+
+        # listening endi yopiq, reading ochiq
+        response = await client.post(
+            "/listening/save-answers/", self.batch(self.listening[:1], "x"), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 403)
+        response = await client.post(
+            "/reading/save-answers/", self.batch(self.reading, "B"), content_type="application/json"
+        )
+        self.assertEqual(response.json()["saved"], len(self.reading))
+
+        response = await client.post("/reading/submit/")
+        self.assertEqual(response.json()["redirect"], "/writing/")
+        attempt = await Attempt.objects.aget(id=attempt.id)
+        self.assertEqual((attempt.current_section, attempt.reading_raw), ("writing", len(self.reading)))
+
+        response = await client.post("/reading/terminate/")
+        attempt = await Attempt.objects.aget(id=attempt.id)
+        self.assertEqual(attempt.status, "terminated")
+        session = await client.asession()
+        self.assertEqual((await session.aget(context.SESSION_KEY))["status"], "terminated")
+
+    async def test_requires_login_and_context(self):
+        response = await self.async_client.post("/listening/submit/")
+        self.assertEqual(response.status_code, 302)
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(
+            "/listening/save-answers/", self.batch(self.listening, "x"), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class ExamChannelTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        caches["channel"].clear()
+        answer_keys.clear_cache()
+        self.mock = make_mock()
+        self.user = get_user_model().objects.create_user("candidate", password="pass12345")
+        self.client.force_login(self.user)
+        self.client.get(f"/mocks/{self.mock.slug}/start/")
+        self.attempt = Attempt.objects.get(mock=self.mock)
+        self.token = self.client.get("/listening/").context["channel_token"]
+        self.question = ListeningQuestion.objects.filter(test__section__mock=self.mock).first()
+        # token bilan so'rov: sessiya cookie va CSRF yo'q
+        self.anonymous = Client(enforce_csrf_checks=True)
+
+    def channel_save(self, answers, token=None, section="listening"):
+        return self.anonymous.post(
+            f"/{section}/channel/save-answers/", {"answers": answers}, content_type="application/json",
+            HTTP_X_ATTEMPT_TOKEN=token or self.token,
+        )
+
+    def events(self, response):
+        body = b"".join(response.streaming_content).decode()
+        return [
+            (block.split("\n")[0].removeprefix("event: "), json.loads(block.split("\n")[1].removeprefix("data: ")))
+            for block in body.strip().split("\n\n") if block.startswith("event:")
+        ]
+
+    def test_token_save_without_session_or_csrf(self):
+        self.channel_save([{"question_id": self.question.id, "value": "x", "client_seq": 1}])
+        with capture_requests() as records:
+            response = self.channel_save([{"question_id": self.question.id, "value": "answer 1", "client_seq": 3}])
+        self.assertEqual(response.json(), {"ok": True, "saved": 1, "rejected": [], "ack": 3})
+        self.assertEqual(records[0]["queries"], 1)  # kanal holati va answer key keshda: faqat upsert
+        self.assertEqual(ListeningAttemptAnswer.objects.get(attempt=self.attempt).response, {"text": "answer 1"})
+
+        self.assertEqual(self.channel_save([], token="forged").status_code, 403)
+        self.assertEqual(self.channel_save([], section="reading").status_code, 403)
+
+    def test_empty_batch_is_heartbeat(self):
+        self.assertEqual(channel.last_seen([self.attempt.id]), {})
+        self.assertEqual(self.channel_save([]).json()["saved"], 0)
+        self.assertIn(self.attempt.id, channel.last_seen([self.attempt.id]))
+        self.assertFalse(ListeningAttemptAnswer.objects.exists())
+
+    def test_section_change_returns_conflict(self):
+        self.client.post("/listening/submit/")
+        response = self.channel_save([{"question_id": self.question.id, "value": "x", "client_seq": 1}])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["state"]["section"], "reading")
+
+    def test_restart_terminates_previous_attempt_on_channel(self):
+        self.client.get(f"/mocks/{self.mock.slug}/start/")
+        self.assertEqual(channel.load_state(self.attempt.id)["status"], "terminated")
+        response = self.channel_save([{"question_id": self.question.id, "value": "x", "client_seq": 1}])
+        self.assertEqual(response.status_code, 409)
+
+    def test_session_save_checks_channel_state(self):
+        # boshqa tabda submit: bu sessiyadagi kontekst hali listening
+        other = Client()
+        other.force_login(self.user)
+        session = other.session
+        for key in (context.SESSION_KEY, "active_attempt_id"):
+            session[key] = self.client.session[key]
+        session.save()
+        self.assertTrue(other.post("/listening/submit/").json()["ok"])
+
+        response = self.client.post(
+            "/listening/save-answers/",
+            {"answers": [{"question_id": self.question.id, "value": "x", "client_seq": 1}]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["state"]["section"], "reading")
+        self.assertFalse(ListeningAttemptAnswer.objects.exists())
+
+    def test_expired_deadline_rejected(self):
+        self.attempt.section_deadline = timezone.now() - timedelta(minutes=5)
+        self.attempt.save(update_fields=["section_deadline"])
+        channel.publish_attempts([self.attempt])
+        response = self.channel_save([{"question_id": self.question.id, "value": "x", "client_seq": 1}])
+        self.assertEqual(response.status_code, 403)
+
+    def test_snapshot_stream(self):
+        response = self.client.get("/attempts/channel/")
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = self.events(response)
+        self.assertEqual([name for name, _ in events], ["state", "tick"])
+        self.assertEqual(events[0][1]["section"], "listening")
+        self.assertAlmostEqual(events[1][1]["remaining"], 1800, delta=5)
+
+        # sweeper boshqa jarayonda surgan: kanal DB dan yangilanadi
+        Attempt.objects.filter(id=self.attempt.id).update(section_deadline=timezone.now() - timedelta(minutes=5))
+        sweeper.sweep()
+        events = self.events(self.client.get("/attempts/channel/"))
+        self.assertEqual(events[0][1]["section"], "reading")
+
+        self.assertEqual(Client().get("/attempts/channel/").status_code, 204)
+
+    def test_proctor_terminate_reaches_candidate(self):
+        admin_user = get_user_model().objects.create_superuser("proctor", password="x")
+        proctor = Client()
+        proctor.force_login(admin_user)
+        proctor.post("/admin/attempts/attempt/", {
+            "action": "terminate_attempts", "_selected_action": [self.attempt.id],
+        })
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.status, "terminated")
+
+        events = self.events(self.client.get("/attempts/channel/"))
+        self.assertEqual(events[0][1]["status"], "terminated")
+        response = self.channel_save([{"question_id": self.question.id, "value": "x", "client_seq": 1}])
+        self.assertEqual(response.status_code, 409)
+        # sessiyadagi kontekst eskirgan — sahifa kanal holatiga qarab yo'naltiradi
+        self.assertRedirects(
+            self.client.get("/listening/"), f"/mocks/{self.mock.slug}/", fetch_redirect_response=False
+        )
+
+    @override_settings(ASYNC_VIEWS=True, CHANNEL_STREAM_SECONDS=0.3, CHANNEL_POLL_SECONDS=0.02,
+                       CHANNEL_TICK_SECONDS=0.1)
+    async def test_async_stream_pushes_changes(self):
+        client = self.async_client
+        await client.aforce_login(self.user)
+        session = await client.asession()
+        await session.aupdate(dict(self.client.session))
+        await session.asave()
+        client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+        response = await client.get("/attempts/channel/")
+        names = []
+        async for chunk in response.streaming_content:
+            text = chunk.decode()
+            if text.startswith("event:"):
+                names.append(text.split("\n")[0].removeprefix("event: "))
+                if names.count("tick") == 2:
+                    # stream ochiq turganda proktor yakunlaydi
+                    await Attempt.objects.filter(id=self.attempt.id).aupdate(status="terminated")
+                    self.attempt.status = "terminated"
+                    await channel.apublish(context.AttemptContext(
+                        attempt_id=self.attempt.id, status="terminated", current_section="listening",
+                        mock_slug=self.mock.slug, test_id=None, deadline=None,
+                    ))
+        self.assertEqual(names[:2], ["state", "tick"])
+        self.assertEqual(names[-2:], ["state", "tick"])
+        self.assertGreaterEqual(names.count("tick"), 3)
+
+
+    @override_settings(CHANNEL_POLL_SECONDS=0.02, CHANNEL_TICK_SECONDS=0.1)
+    async def test_expired_deadline_is_announced_once(self):
+        # deadline o'tgan, sweeper hali ishlamagan: DB dan qayta o'qish holatni o'zgartirmaydi
+        await Attempt.objects.filter(id=self.attempt.id).aupdate(
+            section_deadline=timezone.now() - timedelta(minutes=5))
+        await channel.aload_state(self.attempt.id, refresh=True)
+        names = []
+        async for chunk in channel.stream_events(self.attempt.id, 0.5):
+            if chunk.startswith("event:"):
+                names.append(chunk.split("\n")[0].removeprefix("event: "))
+        self.assertEqual(names.count("state"), 1)
+        self.assertEqual(names.count("time_up"), 1)
+
+class RankingTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        caches["channel"].clear()
+        answer_keys.clear_cache()
+        self.mock = make_mock()
+        self.questions = list(ReadingQuestion.objects.filter(test__section__mock=self.mock).order_by("order"))
+        self.users = [get_user_model().objects.create_user(f"user{i}", password="pass12345") for i in range(3)]
+
+    def graded(self, user, reading, listening=0):
+        """reading ta to'g'ri reading javobi bilan baholangan attempt (listening raw qo'lda)."""
+        attempt = Attempt.objects.create(mock=self.mock, user=user, status="submitted")
+        for question in self.questions[:reading]:
+            ReadingAttemptAnswer.objects.create(attempt=attempt, question=question, response={"value": "B"})
+        grade_attempts("reading", [attempt.id])
+        Attempt.objects.filter(id=attempt.id).update(listening_raw=listening, listening_total=4)
+        return attempt
+
+    def test_percentile_rank_from_histogram(self):
+        for raw in (0, 1, 1, 3):
+            self.graded(None, raw)
+        self.assertEqual(rankings.percentile_rank(self.mock.id, "reading", 1), 50.0)  # (1 + 2/2) / 4
+        self.assertEqual(rankings.percentile_rank(self.mock.id, "reading", 3), 87.5)
+        self.assertEqual(rankings.percentile_rank(self.mock.id, "reading", 2), 75.0)
+        self.assertEqual(rankings.percentile_rank(self.mock.id, "reading", 4), 100.0)
+        self.assertIsNone(rankings.percentile_rank(self.mock.id, "listening", 1))
+        # histogramma keshda: attemptlar soniga qaramay so'rovsiz
+        with self.assertNumQueries(0):
+            rankings.percentile_rank(self.mock.id, "reading", 0)
+
+    def test_leaderboard_keeps_best_attempt_per_user_until_refresh(self):
+        self.graded(self.users[0], 2, listening=1)
+        self.graded(self.users[0], 4, listening=3)
+        self.graded(self.users[1], 3, listening=3)
+        self.graded(self.users[2], 1)
+        board = rankings.leaderboard(self.mock.id)
+        self.assertEqual([(row["name"], row["score"], row["total"]) for row in board],
+                         [("u***0", 7, 8), ("u***1", 6, 8), ("u***2", 1, 8)])
+
+        self.graded(self.users[2], 4, listening=4)
+        self.assertEqual(rankings.leaderboard(self.mock.id)[0]["name"], "u***0")  # keshdan
+        out = StringIO()
+        call_command("refresh_leaderboards", stdout=out)
+        self.assertIn("refreshed 1 leaderboards", out.getvalue())
+        self.assertEqual(rankings.leaderboard(self.mock.id)[0]["name"], "u***2")
+
+    def test_names_are_masked(self):
+        self.assertEqual(rankings.mask_name("alisher"), "a***r")
+        self.assertEqual(rankings.mask_name("al"), "a***")
+        self.assertEqual(rankings.mask_name(""), "***")
+
+    def test_result_page(self):
+        attempt = self.graded(self.users[0], 3, listening=2)
+        self.graded(self.users[1], 1)
+        self.client.force_login(self.users[0])
+        with capture_requests() as records:
+            res = self.client.get(f"/attempts/{attempt.id}/result/")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(records[0]["view"], "attempt_result")
+        reading = next(row for row in res.context["sections"] if row["section"] == "reading")
+        self.assertEqual((reading["raw"], reading["total"], reading["percentile"]), (3, 4, 75.0))
+        self.assertContains(res, "u***0")
+        self.assertNotContains(res, "user1")
+        # issiq keshda: faqat user va attempt
+        with capture_requests() as records:
+            self.client.get(f"/attempts/{attempt.id}/result/")
+        self.assertEqual(records[0]["queries"], 2)
+
+        self.client.force_login(self.users[1])
+        self.assertEqual(self.client.get(f"/attempts/{attempt.id}/result/").status_code, 404)
+
+    def test_mock_start_records_user(self):
+        self.client.force_login(self.users[0])
+        self.client.get(f"/mocks/{self.mock.slug}/start/")
+        self.assertEqual(Attempt.objects.get(mock=self.mock).user, self.users[0])
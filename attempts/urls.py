@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("channel/", views.attempt_channel, name="attempt_channel"),
+    path("<int:attempt_id>/result/", views.attempt_result, name="attempt_result"),
+]
@@ -1,3 +1,46 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render
+from django.views.decorators.http import require_safe
 
-# Create your views here.
+from . import channel, rankings
+from .context import aget_context
+from .models import Attempt
+
+
+@require_safe
+async def attempt_channel(request):
+    """
+    Exam kanali (SSE): state/tick/time_up eventlari, attempts/channel.py.
+    ASGI da stream CHANNEL_STREAM_SECONDS ochiq turadi; WSGI da bitta snapshot
+    yuboriladi va EventSource CHANNEL_RETRY_SECONDS dan keyin qayta ulanadi.
+    Faol attempt bo'lmasa 204 — EventSource qayta ulanmaydi.
+    """
+    ctx = await aget_context(request)
+    if ctx is None or ctx.status != "in_progress":
+        return HttpResponse(status=204)
+
+    if settings.ASYNC_VIEWS:
+        events = channel.stream_events(ctx.attempt_id, getattr(settings, "CHANNEL_STREAM_SECONDS", 300))
+    else:
+        events = await channel.snapshot_events(ctx.attempt_id)
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@login_required
+@require_safe
+def attempt_result(request, attempt_id):
+    """
+    Attempt natijasi: section ballari, percentile (ScoreStat histogrammasi) va mock
+    leaderboard i — ikkalasi ham cache dan, attemptlar saralanmaydi (attempts/rankings.py).
+    """
+    attempt = get_object_or_404(Attempt.objects.select_related("mock"), id=attempt_id, user=request.user)
+    return render(request, "attempts/result.html", {
+        "attempt": attempt,
+        "sections": rankings.result_sections(attempt),
+        "leaderboard": rankings.leaderboard(attempt.mock_id),
+    })
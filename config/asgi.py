@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# ASGI profili: autosave/submit/terminate async view lar bilan (README: ASGI deployment)
+os.environ.setdefault('ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -0,0 +1,96 @@
+"""
+DATABASES["default"] muhit o'zgaruvchilaridan (settings.py: database_config(os.environ)).
+
+DB_ENGINE=sqlite (default) — bitta serverli o'rnatish uchun:
+    DB_NAME                  fayl yo'li (default: BASE_DIR/db.sqlite3)
+    SQLITE_BUSY_TIMEOUT      sekund, lock bo'shashini kutish (default 20)
+    SQLITE_SYNCHRONOUS       NORMAL (default) | FULL | OFF
+    SQLITE_JOURNAL_MODE      WAL (default) | DELETE (eski rejim, load test solishtiruvi uchun)
+  journal_mode=WAL: o'quvchilar yozuvchini kutmaydi; tranzaksiyalar BEGIN IMMEDIATE —
+  yozish lock i boshidanoq olinadi, shuning uchun parallel autosave lar busy timeout
+  ichida navbat kutadi, "database is locked" bilan yiqilmaydi.
+
+DB_ENGINE=postgres:
+    DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+    DB_POOL=1                psycopg 3 connection pool (DB_POOL_MIN/DB_POOL_MAX);
+                             pool bilan CONN_MAX_AGE ishlatilmaydi
+    DB_CONN_MAX_AGE          pool siz doimiy ulanish umri, sekund (default 60)
+    DB_STATEMENT_TIMEOUT_MS  server tomonda so'rov limiti (default 5000; 0 — o'chiq)
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+SQLITE_SYNCHRONOUS = {"OFF", "NORMAL", "FULL"}
+SQLITE_JOURNAL_MODES = {"WAL", "DELETE"}
+
+
+def _int(env, name: str, default: int) -> int:
+    try:
+        return int(env.get(name, default))
+    except ValueError:
+        raise ImproperlyConfigured(f"{name} must be an integer")
+
+
+def _choice(env, name: str, default: str, allowed: set) -> str:
+    value = env.get(name, default).upper()
+    if value not in allowed:
+        raise ImproperlyConfigured(f"{name} must be one of {sorted(allowed)}")
+    return value
+
+
+def _sqlite(env, base_dir) -> dict:
+    synchronous = _choice(env, "SQLITE_SYNCHRONOUS", "NORMAL", SQLITE_SYNCHRONOUS)
+    journal_mode = _choice(env, "SQLITE_JOURNAL_MODE", "WAL", SQLITE_JOURNAL_MODES)
+    return {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": env.get("DB_NAME") or base_dir / "db.sqlite3",
+        "OPTIONS": {
+            "timeout": _int(env, "SQLITE_BUSY_TIMEOUT", 20),
+            "transaction_mode": "IMMEDIATE",
+            "init_command": f"PRAGMA journal_mode={journal_mode}; PRAGMA synchronous={synchronous}",
+        },
+    }
+
+
+def _postgres(env) -> dict:
+    options = {}
+    timeout = _int(env, "DB_STATEMENT_TIMEOUT_MS", 5000)
+    if timeout:
+        options["options"] = f"-c statement_timeout={timeout}"
+
+    config = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": env.get("DB_NAME", "ieltszone"),
+        "USER": env.get("DB_USER", ""),
+        "PASSWORD": env.get("DB_PASSWORD", ""),
+        "HOST": env.get("DB_HOST", ""),
+        "PORT": env.get("DB_PORT", ""),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": options,
+    }
+    if env.get("DB_POOL", "0") == "1":
+        options["pool"] = {"min_size": _int(env, "DB_POOL_MIN", 2), "max_size": _int(env, "DB_POOL_MAX", 10)}
+        config["CONN_MAX_AGE"] = 0
+    else:
+        config["CONN_MAX_AGE"] = _int(env, "DB_CONN_MAX_AGE", 60)
+    return config
+
+
+def database_config(env, base_dir) -> dict:
+    engine = env.get("DB_ENGINE", "sqlite").lower()
+    if engine == "sqlite":
+        return _sqlite(env, base_dir)
+    if engine in ("postgres", "postgresql"):
+        return _postgres(env)
+    raise ImproperlyConfigured(f"DB_ENGINE must be 'sqlite' or 'postgres', got {engine!r}")
+
+
+def describe(connection) -> str:
+    """Load test hisobotlari uchun qisqa tavsif: "sqlite (journal=wal, synchronous=1)"."""
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            journal = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+            synchronous = cursor.execute("PRAGMA synchronous").fetchone()[0]
+        return f"sqlite (journal={journal}, synchronous={synchronous})"
+    settings_dict = connection.settings_dict
+    mode = "pool" if settings_dict["OPTIONS"].get("pool") else f"conn_max_age={settings_dict['CONN_MAX_AGE']}"
+    return f"{connection.vendor} ({mode})"
@@ -0,0 +1,257 @@
+"""
+Har so'rov uchun o'lchovlar: wall time, DB so'rovlar soni va vaqti, template render vaqti.
+
+RequestStatsMiddleware (MIDDLEWARE boshida) har bir view (url name bo'yicha:
+listening_save_answers, reading_page, mock_detail, ...) uchun:
+  - "ielts.requests" loggeriga bitta JSON qator yozadi;
+  - jarayon ichidagi agregatga qo'shadi — /_stats/requests/ (DEBUG yoki staff) orqali ko'rinadi;
+  - settings.VIEW_BUDGETS dagi limitlar bilan solishtiradi.
+
+Budget: {"mock_detail": {"queries": 3, "ms": 150}, ...}. Oshib ketsa warning log;
+settings.VIEW_BUDGETS_STRICT=True (test runner yoki VIEW_BUDGETS_STRICT=1) bo'lsa so'rovlar soni oshganda
+BudgetExceeded ko'tariladi va test yiqiladi. Vaqt limiti faqat log qilinadi — test
+muhitida millisekundlar barqaror emas.
+
+DB so'rovlari connection.execute_wrapper bilan sanaladi (DEBUG shart emas),
+template vaqti Django template backend ining render() i orqali (include lar
+tashqi render ichida hisoblanadi).
+
+Middleware sync va async: ASGI da async view lar thread ga o'tkazilmaydi. Async ORM
+so'rovlari sync_to_async thread ida bajariladi — hisoblagich ContextVar orqali o'sha
+yerga yetib boradi, wrapper esa har ulanishga bir marta o'rnatiladi (_count_queries).
+"""
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import Http404, JsonResponse
+from django.template.backends.django import Template as DjangoTemplate
+
+logger = logging.getLogger("ielts.requests")
+
+SAMPLES_PER_VIEW = 500
+
+_current = ContextVar("request_stats", default=None)
+_captures = []
+
+
+class BudgetExceeded(AssertionError):
+    pass
+
+
+class RequestStats:
+    """Bitta so'rov davomidagi hisoblagichlar; execute_wrapper sifatida ham ishlaydi."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.rendering = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_ms += (time.perf_counter() - started) * 1000
+
+
+def _count_queries(execute, sql, params, many, context):
+    """Har ulanishdagi doimiy wrapper: joriy so'rovning RequestStats iga yozadi."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def _install_wrapper(connection=connection, **kwargs) -> None:
+    if _count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_queries)
+
+
+# yangi ulanishlar (ASGI da so'rov thread lari) — signal orqali
+connection_created.connect(_install_wrapper)
+
+
+def _timed_render(self, context=None, request=None):
+    stats = _current.get()
+    if stats is None or stats.rendering:
+        return _original_render(self, context, request)
+    stats.rendering = True
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context, request)
+    finally:
+        stats.rendering = False
+        stats.template_ms += (time.perf_counter() - started) * 1000
+
+
+if getattr(DjangoTemplate.render, "__wrapped__", None) is None:
+    _original_render = DjangoTemplate.render
+    _timed_render.__wrapped__ = _original_render
+    DjangoTemplate.render = _timed_render
+else:
+    _original_render = DjangoTemplate.render.__wrapped__
+
+
+# --- agregat ---
+
+class ViewStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.over_budget = 0
+        self.queries_total = 0
+        self.queries_max = 0
+        self.db_ms_total = 0.0
+        self.template_ms_total = 0.0
+        self.wall_ms = deque(maxlen=SAMPLES_PER_VIEW)
+
+    def add(self, record: dict) -> None:
+        self.count += 1
+        self.errors += record["status"] >= 500
+        self.over_budget += bool(record.get("over_budget"))
+        self.queries_total += record["queries"]
+        self.queries_max = max(self.queries_max, record["queries"])
+        self.db_ms_total += record["db_ms"]
+        self.template_ms_total += record["template_ms"]
+        self.wall_ms.append(record["wall_ms"])
+
+    def as_dict(self) -> dict:
+        ordered = sorted(self.wall_ms)
+
+        def pct(p):
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))], 2)
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "over_budget": self.over_budget,
+            "wall_p50_ms": pct(50),
+            "wall_p95_ms": pct(95),
+            "queries_avg": round(self.queries_total / self.count, 2),
+            "queries_max": self.queries_max,
+            "db_ms_avg": round(self.db_ms_total / self.count, 2),
+            "template_ms_avg": round(self.template_ms_total / self.count, 2),
+        }
+
+
+_views = {}
+_lock = threading.Lock()
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {name: stats.as_dict() for name, stats in sorted(_views.items())}
+
+
+def reset() -> None:
+    with _lock:
+        _views.clear()
+
+
+def budget_violations(record: dict) -> list:
+    budget = getattr(settings, "VIEW_BUDGETS", {}).get(record["view"])
+    if not budget:
+        return []
+    violations = []
+    if "queries" in budget and record["queries"] > budget["queries"]:
+        violations.append(f"queries {record['queries']} > {budget['queries']}")
+    if "ms" in budget and record["wall_ms"] > budget["ms"]:
+        violations.append(f"wall {record['wall_ms']}ms > {budget['ms']}ms")
+    return violations
+
+
+@contextmanager
+def capture_requests():
+    """Test helper: blok ichidagi so'rovlar yozuvlari (view, wall_ms, queries, db_ms, template_ms, ...)."""
+    records = []
+    _captures.append(records)
+    try:
+        yield records
+    finally:
+        _captures.remove(records)
+
+
+class RequestStatsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        _install_wrapper(connection)
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, started)
+
+    async def __acall__(self, request):
+        # async ORM shu thread da ishlaydi (thread_sensitive); ulanish oldin yaratilgan bo'lsa
+        # signal ishlamagan — wrapper ni u yerda ham tekshiramiz
+        await sync_to_async(_install_wrapper)()
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, started)
+
+    def finish(self, request, response, stats, started):
+        wall_ms = (time.perf_counter() - started) * 1000
+
+        match = request.resolver_match
+        if match is None or not match.url_name:
+            return response
+
+        record = {
+            "view": match.url_name,
+            "method": request.method,
+            "status": response.status_code,
+            "wall_ms": round(wall_ms, 2),
+            "queries": stats.queries,
+            "db_ms": round(stats.db_ms, 2),
+            "template_ms": round(stats.template_ms, 2),
+        }
+        violations = budget_violations(record)
+        if violations:
+            record["over_budget"] = violations
+
+        with _lock:
+            _views.setdefault(record["view"], ViewStats()).add(record)
+        for records in _captures:
+            records.append(record)
+        logger.info(json.dumps(record))
+
+        if violations:
+            logger.warning("%s over budget: %s", record["view"], "; ".join(violations))
+            if getattr(settings, "VIEW_BUDGETS_STRICT", False) and any(v.startswith("queries") for v in violations):
+                raise BudgetExceeded(f"{record['view']} over budget: {'; '.join(violations)}")
+        return response
+
+
+def request_stats(request):
+    """Jarayon ichidagi view statistikasi (faqat DEBUG yoki staff)."""
+    if not (settings.DEBUG or request.user.is_staff):
+        raise Http404
+    return JsonResponse({"views": snapshot(), "budgets": getattr(settings, "VIEW_BUDGETS", {})})
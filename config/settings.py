@@ -1,4 +1,8 @@
+import os
 from pathlib import Path
+
+from config.database import database_config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -38,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'config.instrumentation.RequestStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,14 +75,68 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
+# DB_ENGINE=sqlite (WAL, default) yoki postgres (pool/persistent) — config/database.py
 
 DATABASES = {
+    'default': database_config(os.environ, BASE_DIR),
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # write-behind answer buffer: process restartdan keyin ham saqlanadi
+    'answers': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'var' / 'answer_buffer',
+    },
+    # imtihon kanali holati (attempts/channel.py): hamma worker jarayonlari bitta holatni
+    # ko'rishi kerak — sweeper/boshqa worker dagi submit streamlarga darhol yetib boradi
+    'channel': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'var' / 'channel',
+    },
 }
 
+# Sessiya cache dan o'qiladi (DB faqat yozishda): autosave yo'lidagi attempt konteksti
+# (attempts/context.py) har so'rovda DB ga murojaat qilmasligi uchun.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Autosave javoblarini bufferlab yozish (attempts/answer_buffer.py)
+ANSWER_WRITE_BEHIND = False
+ANSWER_BUFFER_CACHE = 'answers'
+ANSWER_BUFFER_FLUSH_SECONDS = 10
+
+# Section deadline dan keyin autosave qabul qilinadigan va sweeper kutadigan vaqt
+# (attempts/context.py, `manage.py sweep_attempts`)
+DEADLINE_GRACE_SECONDS = 30
+
+# Autosave/submit/terminate endpointlarining async variantlari (listening/reading urls.py).
+# config/asgi.py o'zi yoqadi; WSGI da sync view lar qoladi.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '0') == '1'
+
+# Exam kanali (attempts/channel.py): SSE holat/taymer + token bilan autosave.
+# Holat cache i bir nechta jarayonda umumiy bo'lishi kerak (sweeper alohida jarayon).
+ATTEMPT_CHANNEL_CACHE = 'channel'
+CHANNEL_STREAM_SECONDS = 300  # ASGI: bitta SSE ulanish umri
+CHANNEL_POLL_SECONDS = 1      # holat cache ini tekshirish oralig'i
+CHANNEL_TICK_SECONDS = 10     # server taymer eventi
+CHANNEL_RETRY_SECONDS = 15    # WSGI: snapshot lar orasidagi qayta ulanish
+
+# Writing esse autosave (writing/essays.py): patch qo'llangandan keyingi maksimal uzunlik
+WRITING_MAX_ESSAY_CHARS = 20000
+
+# Natija sahifasi (attempts/rankings.py): percentile histogrammasi keshi va leaderboard
+# hajmi; leaderboard `manage.py refresh_leaderboards` (cron) bilan yangilanadi,
+# LEADERBOARD_CACHE_SECONDS — cron to'xtaganda keshning eng uzoq umri
+RANKING_HISTOGRAM_SECONDS = 60
+LEADERBOARD_SIZE = 10
+LEADERBOARD_CACHE_SECONDS = 900
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -115,6 +174,69 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
+# `manage.py build_assets`: hashlangan nomlar + .gz/.br (config/storage.py)
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'config.storage.HashedStaticFilesStorage',
+    },
+}
+
+# Uploaded files (listening audio, rasmlar)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Listening audio listening/audio.py orqali beriladi (Range/206, access check).
+# Production da fayl uzatishni web serverga topshirish mumkin:
+#   nginx:  AUDIO_SENDFILE_HEADER = 'X-Accel-Redirect', AUDIO_SENDFILE_PREFIX = '/protected-media/'
+#   apache: AUDIO_SENDFILE_HEADER = 'X-Sendfile', AUDIO_SENDFILE_PREFIX = str(MEDIA_ROOT) + '/'
+AUDIO_SENDFILE_HEADER = None
+AUDIO_SENDFILE_PREFIX = '/protected-media/'
+AUDIO_CACHE_SECONDS = 60 * 60 * 6
+
+# Audio ingestion (`manage.py process_audio`, listening/ingest.py): ffmpeg/ffprobe PATH dan olinadi
+AUDIO_COMPACT_BITRATE = '64k'
+AUDIO_SEGMENT_SECONDS = 10
+
+# Listening map/diagramma rasmlari uchun srcset enliklari (listening/images.py)
+IMAGE_VARIANT_WIDTHS = (480, 768, 1200)
+
+# Har view uchun so'rov budjeti (config/instrumentation.py). "queries" — DB so'rovlar soni
+# (sovuq kesh holati ham kiradi), "ms" — wall time (faqat warning log). Test suite da
+# so'rovlar budjeti oshsa test yiqiladi. Submit ichidagi baholash item statistikasiga
+# 3 tagacha upsert qo'shadi (attempts/item_stats.py), batch tranzaksiyasi esa (test
+# ichida savepoint) yana so'rov.
+VIEW_BUDGETS = {
+    'mock_list': {'queries': 2, 'ms': 200},
+    'mock_detail': {'queries': 3, 'ms': 200},
+    'mock_start': {'queries': 8, 'ms': 300},
+    'listening_page': {'queries': 12, 'ms': 500},
+    'listening_save_answer': {'queries': 9, 'ms': 150},
+    'listening_save_answers': {'queries': 9, 'ms': 150},
+    'listening_submit': {'queries': 17, 'ms': 500},
+    'listening_audio': {'queries': 6, 'ms': 200},
+    'reading_page': {'queries': 12, 'ms': 500},
+    'reading_save_answer': {'queries': 9, 'ms': 150},
+    'reading_save_answers': {'queries': 9, 'ms': 150},
+    'reading_submit': {'queries': 18, 'ms': 500},
+    'writing_page': {'queries': 6, 'ms': 300},
+    # birinchi saqlash: task uchun INSERT savepoint bilan (3 so'rov); keyingilari bitta UPDATE
+    'writing_save': {'queries': 8, 'ms': 150},
+    'writing_channel_save': {'queries': 8, 'ms': 100},
+    'writing_submit': {'queries': 8, 'ms': 300},
+    'listening_channel_save_answers': {'queries': 6, 'ms': 100},
+    'reading_channel_save_answers': {'queries': 6, 'ms': 100},
+    'attempt_channel': {'queries': 3},
+    'attempt_result': {'queries': 6, 'ms': 300},
+}
+# Strict rejim: so'rovlar budjeti oshsa BudgetExceeded. Test runner (config/test_runner.py)
+# o'zi yoqadi; CI/staging da VIEW_BUDGETS_STRICT=1 bilan ham yoqish mumkin
+VIEW_BUDGETS_STRICT = os.environ.get('VIEW_BUDGETS_STRICT', '0') == '1'
+TEST_RUNNER = 'config.test_runner.StrictBudgetRunner'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
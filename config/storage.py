@@ -0,0 +1,16 @@
+"""
+Static fayllar uchun storage: content-hash nomlar (ManifestStaticFilesStorage).
+
+`manage.py build_assets` collectstatic ni ishga tushiradi va hashlangan fayllarning
+.gz/.br variantlarini yozadi. Manifest (STATIC_ROOT/staticfiles.json) hali
+qurilmagan bo'lsa (dev, testlar) {% static %} hashsiz nomni qaytaradi; manifest bor
+bo'lsa unda yo'q fayl xato beradi (manifest_strict).
+"""
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+
+class HashedStaticFilesStorage(ManifestStaticFilesStorage):
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
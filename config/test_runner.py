@@ -0,0 +1,18 @@
+"""
+Test runner: VIEW_BUDGETS_STRICT ni yoqadi — test suite da so'rovlar budjeti oshsa
+BudgetExceeded (config/instrumentation.py). Argumentlarga qarab emas, aniq yoqiladi:
+`manage.py test` ning qaysi chaqiruvi bo'lmasin (IDE, parallel, --settings) bir xil ishlaydi.
+"""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class StrictBudgetRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._budgets_strict = settings.VIEW_BUDGETS_STRICT
+        settings.VIEW_BUDGETS_STRICT = True
+
+    def teardown_test_environment(self, **kwargs):
+        settings.VIEW_BUDGETS_STRICT = self._budgets_strict
+        super().teardown_test_environment(**kwargs)
@@ -3,6 +3,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from config.instrumentation import request_stats
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('home.urls')),
@@ -10,6 +12,9 @@ urlpatterns = [
     path('accounts/', include('accounts.urls')),
     path('listening/', include('listening.urls')),
     path("reading/", include("reading.urls")),
+    path("writing/", include("writing.urls")),
+    path("attempts/", include("attempts.urls")),
+    path("_stats/requests/", request_stats, name="request_stats"),
 
 ]
 
@@ -0,0 +1,59 @@
+import gzip
+import json
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+try:
+    import brotli
+except ImportError:  # ixtiyoriy: o'rnatilmagan bo'lsa faqat .gz yoziladi
+    brotli = None
+
+COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".txt", ".html", ".map", ".m3u8")
+
+
+class Command(BaseCommand):
+    help = "Collect static files under content-hashed names and write precompressed .gz/.br variants."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-size", type=int, default=256,
+                            help="Do not compress files smaller than this many bytes")
+
+    def handle(self, *args, **opts):
+        call_command("collectstatic", interactive=False, verbosity=0)
+
+        root = settings.STATIC_ROOT
+        with open(os.path.join(root, staticfiles_storage.manifest_name)) as f:
+            paths = sorted(set(json.load(f)["paths"].values()))
+
+        written = {"gz": 0, "br": 0}
+        original_total = compressed_total = 0
+        for name in paths:
+            if not name.endswith(COMPRESSIBLE):
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) < opts["min_size"]:
+                continue
+
+            variants = {"gz": gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants["br"] = brotli.compress(data, quality=11)
+            for ext, compressed in variants.items():
+                if len(compressed) >= len(data):
+                    continue
+                with open(f"{path}.{ext}", "wb") as f:
+                    f.write(compressed)
+                written[ext] += 1
+            original_total += len(data)
+            compressed_total += len(variants["gz"])
+
+        self.stdout.write(
+            f"{len(paths)} hashed files; {written['gz']} .gz, {written['br']} .br"
+            f"{'' if brotli else ' (brotli not installed)'}; "
+            f"gzip {original_total} -> {compressed_total} bytes"
+        )
@@ -50,5 +50,6 @@ class ListeningQuestionGroupAdmin(admin.ModelAdmin):
 
 @admin.register(ListeningTest)
 class ListeningTestAdmin(admin.ModelAdmin):
-    list_display = ("section", "title", "duration_seconds")
-    list_filter = ("section__mock",)
+    list_display = ("section", "title", "duration_seconds", "audio_status")
+    list_filter = ("section__mock", "audio_status")
+    readonly_fields = ("audio_status", "audio_bitrate", "audio_compact", "audio_playlist", "audio_error")
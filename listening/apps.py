@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ListeningConfig(AppConfig):
     name = 'listening'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,140 @@
+"""
+Listening audio uzatish (HTTP Range bilan).
+
+30 daqiqalik audio xotiraga to'liq o'qilmaydi: fayl bo'laklab FileResponse orqali
+beriladi (gunicorn kabi serverlarda wsgi.file_wrapper -> sendfile), yoki
+settings.AUDIO_SENDFILE_HEADER berilgan bo'lsa uzatish web serverga topshiriladi
+(nginx X-Accel-Redirect / apache X-Sendfile — ular Range ni o'zi bajaradi).
+
+Brauzer seek/preload uchun Range so'raydi:
+  - bitta diapazon -> 206 + Content-Range;
+  - qondirib bo'lmaydigan diapazon -> 416;
+  - ko'p diapazonli yoki tushunarsiz Range -> e'tiborsiz, to'liq fayl (200).
+
+Javob attemptga bog'liq (access check), shuning uchun Cache-Control private.
+"""
+import mimetypes
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_etags, quote_etag
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str, size: int):
+    """
+    (start, end) — end ham kiradi. None: Range e'tiborsiz qoldiriladi (to'liq fayl).
+    ValueError: diapazon fayldan tashqarida (416).
+    """
+    match = RANGE_RE.match((header or "").strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+
+    if not start:
+        # bytes=-500 -> oxirgi 500 bayt
+        suffix = int(end)
+        if suffix == 0 or size == 0:
+            raise ValueError("unsatisfiable range")
+        return max(size - suffix, 0), size - 1
+
+    start = int(start)
+    if end and int(end) < start:
+        return None
+    if start >= size:
+        raise ValueError("unsatisfiable range")
+    end = min(int(end), size - 1) if end else size - 1
+    return start, end
+
+
+class RangeFile:
+    """
+    Faylning [start, start+length) bo'lagi. read() diapazon oxirida to'xtaydi;
+    fileno() sendfile uchun — server joriy offset va Content-Length bo'yicha yuboradi.
+    """
+
+    def __init__(self, file, start: int, length: int):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def _file_stat(storage, name: str):
+    size = storage.size(name)
+    try:
+        mtime = storage.get_modified_time(name).timestamp()
+    except NotImplementedError:
+        mtime = 0
+    return size, int(mtime)
+
+
+def _cache_headers(response, etag: str, mtime: int) -> None:
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    if mtime:
+        response["Last-Modified"] = http_date(mtime)
+    response["Cache-Control"] = f"private, max-age={settings.AUDIO_CACHE_SECONDS}"
+
+
+def serve_audio(request, storage, name: str):
+    """storage dagi `name` faylini Range/ETag qo'llab-quvvatlagan holda qaytaradi."""
+    try:
+        size, mtime = _file_stat(storage, name)
+    except FileNotFoundError:
+        raise Http404
+    etag = quote_etag(f"{size:x}-{mtime:x}")
+    content_type = mimetypes.guess_type(name)[0] or "audio/mpeg"
+
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+        _cache_headers(response, etag, mtime)
+        return response
+
+    sendfile_header = getattr(settings, "AUDIO_SENDFILE_HEADER", None)
+    if sendfile_header:
+        response = HttpResponse(content_type=content_type)
+        response[sendfile_header] = f"{settings.AUDIO_SENDFILE_PREFIX}{name}"
+        _cache_headers(response, etag, mtime)
+        return response
+
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    # If-Range mos kelmasa (fayl o'zgargan) to'liq fayl beriladi
+    if range_header and (not if_range or if_range in (etag, http_date(mtime))):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            _cache_headers(response, etag, mtime)
+            return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+    response = FileResponse(RangeFile(storage.open(name, "rb"), start, length), content_type=content_type)
+    response["Content-Length"] = str(length)
+    if byte_range:
+        response.status_code = 206
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    _cache_headers(response, etag, mtime)
+    return response
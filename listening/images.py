@@ -0,0 +1,95 @@
+"""
+ListeningQuestionGroup.image (map/diagramma) uchun responsive variantlar.
+
+Yuklangan rasm bir nechta enlikda (settings.IMAGE_VARIANT_WIDTHS, originaldan katta
+emas) original formatda (JPEG -> jpg, qolganlari -> png) va WebP da saqlanadi.
+Fayllar kontent bo'yicha adreslanadi: listening_images/v/<sha256[:16]>/<width>.<ext> —
+bir xil rasm qayta yuklansa qayta kodlanmaydi, nomi o'zgarmas bo'lgani uchun
+brauzer/CDN da uzoq keshlanadi.
+
+Natija group.image_variants ga yoziladi:
+    {"source": image.name, "width": W, "height": H,
+     "fallback": [[480, name], ...], "webp": [[480, name], ...]}
+"""
+import hashlib
+import io
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+DEFAULT_WIDTHS = (480, 768, 1200)
+WEBP_OPTIONS = {"format": "WEBP", "quality": 80, "method": 6}
+
+
+def _widths(original_width: int) -> list:
+    widths = getattr(settings, "IMAGE_VARIANT_WIDTHS", DEFAULT_WIDTHS)
+    largest = min(original_width, max(widths))
+    return sorted({w for w in widths if w < largest} | {largest})
+
+
+def _digest(f) -> str:
+    h = hashlib.sha256()
+    for chunk in f.chunks():
+        h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def _save(storage, name: str, image, options: dict) -> None:
+    if storage.exists(name):
+        return
+    buf = io.BytesIO()
+    image.save(buf, **options)
+    storage.save(name, ContentFile(buf.getvalue()))
+
+
+def build_variants(field_file) -> dict:
+    storage = field_file.storage
+    with field_file.open("rb") as f:
+        digest = _digest(f)
+        f.seek(0)
+        image = Image.open(f)
+        image.load()
+
+    if image.format == "JPEG":
+        ext, options = "jpg", {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True}
+        image = ImageOps.exif_transpose(image).convert("RGB")
+    else:
+        ext, options = "png", {"format": "PNG", "optimize": True}
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    prefix = f"listening_images/v/{digest}/"
+    variants = {"source": field_file.name, "width": image.width, "height": image.height, "fallback": [], "webp": []}
+    for width in _widths(image.width):
+        resized = image
+        if width != image.width:
+            resized = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        _save(storage, f"{prefix}{width}.{ext}", resized, options)
+        _save(storage, f"{prefix}{width}.webp", resized, WEBP_OPTIONS)
+        variants["fallback"].append([width, f"{prefix}{width}.{ext}"])
+        variants["webp"].append([width, f"{prefix}{width}.webp"])
+    return variants
+
+
+def image_payload(field_file, variants: dict) -> dict:
+    """Template uchun: src (eng katta variant), srcset lar va o'lchamlar."""
+    if not field_file:
+        return {"image_url": ""}
+    if not variants or variants.get("source") != field_file.name:
+        # variantlar hali qurilmagan — original
+        return {"image_url": field_file.url}
+
+    url = field_file.storage.url
+
+    def srcset(kind):
+        return ", ".join(f"{url(name)} {width}w" for width, name in variants[kind])
+
+    largest = variants["fallback"][-1][0]
+    return {
+        "image_url": url(variants["fallback"][-1][1]),
+        "image_srcset": srcset("fallback"),
+        "image_webp_srcset": srcset("webp"),
+        "image_width": largest,
+        "image_height": round(variants["height"] * largest / variants["width"]),
+    }
@@ -0,0 +1,232 @@
+"""
+Listening audio ingestion.
+
+Admin audio yuklaganda (signals.audio_changed) test audio_status="pending" bo'ladi;
+ishlov admin requestida emas, `manage.py process_audio` workerida bajariladi:
+
+  1. probe: haqiqiy davomiylik va bitrate -> duration_seconds, audio_bitrate;
+  2. compact variant: loudness normalizatsiya (EBU R128, loudnorm) + mono, past bitrate mp3;
+  3. segmentlar: compact variant AUDIO_SEGMENT_SECONDS lik bo'laklarga bo'linadi va
+     index (HLS .m3u8) yoziladi — klient birinchi segmentdan keyin eshitishni boshlaydi.
+
+Hammasi lokal ishlaydi. ffprobe/ffmpeg bo'lmasa probe stdlib bilan (WAV — wave,
+MP3 — frame header bo'yicha CBR taxmini) qilinadi, variant va segmentlar o'tkazib
+yuboriladi va original fayl beriladi.
+"""
+import json
+import logging
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import wave
+
+from django.conf import settings
+from django.core.files import File
+
+from .models import ListeningTest
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "seg_"
+
+# MPEG Layer III bitrate jadvali (kbps): MPEG-1 va MPEG-2/2.5
+_MP3_BITRATES = {
+    3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    0: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+
+class IngestError(Exception):
+    pass
+
+
+def _tool(name: str):
+    return shutil.which(getattr(settings, f"{name.upper()}_BIN", name))
+
+
+def _run(args):
+    result = subprocess.run(args, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise IngestError(f"{os.path.basename(args[0])}: {result.stderr.strip()[-500:]}")
+    return result.stdout
+
+
+# --- probe ---
+
+def _probe_ffprobe(ffprobe: str, path: str) -> dict:
+    out = _run([ffprobe, "-v", "error", "-show_entries", "format=duration,bit_rate", "-of", "json", path])
+    fmt = json.loads(out).get("format", {})
+    bit_rate = fmt.get("bit_rate")
+    return {
+        "duration": float(fmt["duration"]),
+        "bitrate": round(int(bit_rate) / 1000) if bit_rate else None,
+    }
+
+
+def _probe_wav(path: str) -> dict:
+    with wave.open(path, "rb") as w:
+        rate = w.getframerate()
+        return {
+            "duration": w.getnframes() / rate,
+            "bitrate": round(rate * w.getnchannels() * w.getsampwidth() * 8 / 1000),
+        }
+
+
+def _probe_mp3(path: str) -> dict:
+    """Birinchi frame header bo'yicha (CBR). VBR faylda davomiylik taxminiy bo'ladi."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        head = f.read(64 * 1024)
+
+    base = 0
+    if head[:3] == b"ID3" and len(head) >= 10:
+        # ID3v2 teg: o'lchami syncsafe (7 bitli) baytlarda
+        tag_size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+        base = 10 + tag_size + (10 if head[5] & 0x10 else 0)
+        with open(path, "rb") as f:
+            f.seek(base)
+            head = f.read(64 * 1024)
+
+    for i in range(len(head) - 3):
+        b1, b2 = head[i + 1], head[i + 2]
+        if head[i] != 0xFF or (b1 & 0xE0) != 0xE0:
+            continue
+        version, layer, index = (b1 >> 3) & 3, (b1 >> 1) & 3, (b2 >> 4) & 0xF
+        if layer != 1 or version == 1 or index in (0, 15):
+            continue
+        bitrate = _MP3_BITRATES[version][index]
+        return {"duration": (size - base - i) * 8 / (bitrate * 1000), "bitrate": bitrate}
+    raise IngestError("audio formatini aniqlab bo'lmadi (ffprobe o'rnatilmagan)")
+
+
+def probe(path: str) -> dict:
+    """{"duration": sekund (float), "bitrate": kbps yoki None}"""
+    ffprobe = _tool("ffprobe")
+    if ffprobe:
+        return _probe_ffprobe(ffprobe, path)
+    try:
+        return _probe_wav(path)
+    except (wave.Error, EOFError):
+        return _probe_mp3(path)
+
+
+# --- variant + segmentlar ---
+
+def transcode(ffmpeg: str, src: str, out_dir: str):
+    """(compact_path, playlist_path, [segment_path, ...]) — out_dir ichida."""
+    compact = os.path.join(out_dir, "compact.mp3")
+    _run([
+        ffmpeg, "-nostdin", "-y", "-i", src, "-vn",
+        "-af", "loudnorm=I=-16:TP=-1.5:LRA=11", "-ac", "1", "-ar", "44100",
+        "-c:a", "libmp3lame", "-b:a", getattr(settings, "AUDIO_COMPACT_BITRATE", "64k"),
+        compact,
+    ])
+
+    hls_dir = os.path.join(out_dir, "hls")
+    os.makedirs(hls_dir)
+    playlist = os.path.join(hls_dir, "index.m3u8")
+    _run([
+        ffmpeg, "-nostdin", "-y", "-i", compact, "-c", "copy",
+        "-f", "hls", "-hls_time", str(getattr(settings, "AUDIO_SEGMENT_SECONDS", 10)),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_filename", os.path.join(hls_dir, f"{SEGMENT_PREFIX}%04d.ts"),
+        playlist,
+    ])
+    segments = sorted(
+        os.path.join(hls_dir, name) for name in os.listdir(hls_dir) if name.startswith(SEGMENT_PREFIX)
+    )
+    return compact, playlist, segments
+
+
+def _clear_derived(storage, prefix: str) -> None:
+    for sub in ("", "hls/"):
+        try:
+            _, files = storage.listdir(prefix + sub)
+        except FileNotFoundError:
+            continue
+        for name in files:
+            storage.delete(prefix + sub + name)
+
+
+def _store(storage, path: str, name: str) -> str:
+    with open(path, "rb") as f:
+        saved = storage.save(name, File(f))
+    if saved != name:
+        raise IngestError(f"{name} saqlanmadi ({saved})")
+    return saved
+
+
+def ingest(test: ListeningTest) -> bool:
+    """
+    Bitta testni qayta ishlaydi (audio_status="processing" holatida chaqiriladi).
+    Natija faqat shu vaqt ichida yangi audio yuklanmagan bo'lsa yoziladi — aks holda
+    test yana "pending" va keyingi aylanishda qayta ishlanadi. True: natija yozildi.
+    """
+    storage = test.audio.storage
+    source = test.audio.name
+    prefix = f"listening_audio/derived/{test.id}/"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "source" + os.path.splitext(source)[1].lower())
+        with storage.open(source, "rb") as f, open(src, "wb") as out:
+            shutil.copyfileobj(f, out)
+
+        info = probe(src)
+        fields = {
+            "audio_source": source,
+            "duration_seconds": max(1, math.ceil(info["duration"])),
+            "audio_bitrate": info["bitrate"],
+            "audio_compact": "",
+            "audio_playlist": "",
+        }
+
+        ffmpeg = _tool("ffmpeg")
+        if ffmpeg:
+            compact, playlist, segments = transcode(ffmpeg, src, tmp)
+            _clear_derived(storage, prefix)
+            for segment in segments:
+                _store(storage, segment, prefix + "hls/" + os.path.basename(segment))
+            fields["audio_playlist"] = _store(storage, playlist, prefix + "hls/index.m3u8")
+            fields["audio_compact"] = _store(storage, compact, prefix + "compact.mp3")
+        else:
+            logger.warning("ffmpeg topilmadi: test %s uchun variant/segmentlar yaratilmadi", test.id)
+
+    return bool(
+        ListeningTest.objects
+        .filter(id=test.id, audio_status="processing")
+        .update(audio_status="ready", audio_error="", **fields)
+    )
+
+
+def process_pending(test_ids=None, force=False) -> list:
+    """
+    Navbatdagi testlarni qayta ishlaydi: [(test_id, status), ...].
+    Har bir test avval atomar "processing" ga o'tkaziladi — bir nechta worker bitta
+    testni ikki marta olmaydi.
+    """
+    qs = ListeningTest.objects.exclude(audio="")
+    if test_ids:
+        qs = qs.filter(id__in=test_ids)
+    if not force:
+        qs = qs.filter(audio_status="pending")
+
+    results = []
+    for test in qs.order_by("id"):
+        claimed = ListeningTest.objects.filter(id=test.id, audio_status=test.audio_status).update(
+            audio_status="processing"
+        )
+        if not claimed:
+            continue
+        try:
+            ok = ingest(test)
+            results.append((test.id, "ready" if ok else "pending"))
+        except (IngestError, OSError) as exc:
+            logger.exception("audio ingestion failed for test %s", test.id)
+            ListeningTest.objects.filter(id=test.id, audio_status="processing").update(
+                audio_status="failed", audio_error=str(exc)
+            )
+            results.append((test.id, "failed"))
+    return results
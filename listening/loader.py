@@ -0,0 +1,118 @@
+"""
+Listening test kontentini bulk yuklash (seed_listening, import_bundle).
+
+spec:
+    {"groups": [{"order": 1, "part": 1, "group_type": "notes", "title": "...",
+                 "instructions": "...", "data": {}}, ...],
+     "questions": [{"order": 1, "part": 1, "qtype": "short", "group": 1, "prompt": "...",
+                    "instructions": "", "data": {}, "answer_key": {},
+                    "options": [["A", "..."], ...]}, ...]}
+
+question["group"] — group order raqami. Group rasmlari (image) o'zgartirilmaydi.
+Har model bitta bulk upsert: test uchun 3 ta yozish so'rovi.
+"""
+from django.db import transaction
+
+from mocks.loader import bulk_upsert
+
+from .models import ListeningOption, ListeningQuestion, ListeningQuestionGroup
+
+GROUP_FIELDS = ["part", "group_type", "title", "instructions", "data"]
+QUESTION_FIELDS = ["part", "qtype", "group", "prompt", "instructions", "data", "answer_key"]
+
+
+def load_test(test, spec: dict, replace: bool = False, prune: bool = False) -> int:
+    """
+    Bitta tranzaksiyada upsert qiladi, yozilgan qatorlar sonini qaytaradi.
+    replace=True: avval testning eski group/savol/variantlari o'chiriladi.
+    prune=True: spec da yo'q group/savol/variantlar o'chiriladi (qolgan savollarning
+    nomzod javoblari saqlanadi — replace dan farqi).
+    Keshlarni yangilash chaqiruvchida (mocks.loader.finish_load).
+    """
+    with transaction.atomic():
+        if replace:
+            ListeningQuestion.objects.filter(test=test).delete()
+            ListeningQuestionGroup.objects.filter(test=test).delete()
+
+        groups = bulk_upsert(
+            ListeningQuestionGroup,
+            [
+                ListeningQuestionGroup(
+                    test=test,
+                    order=g["order"],
+                    part=g.get("part", 1),
+                    group_type=g.get("group_type", "none"),
+                    title=g.get("title", ""),
+                    instructions=g.get("instructions", ""),
+                    data=g.get("data") or {},
+                )
+                for g in spec.get("groups", [])
+            ],
+            unique_fields=["test", "order"],
+            update_fields=GROUP_FIELDS,
+        )
+        group_ids = {g.order: g.pk for g in groups}
+
+        questions = bulk_upsert(
+            ListeningQuestion,
+            [
+                ListeningQuestion(
+                    test=test,
+                    order=q["order"],
+                    part=q.get("part", 1),
+                    qtype=q["qtype"],
+                    group_id=group_ids.get(q.get("group")),
+                    prompt=q.get("prompt", ""),
+                    instructions=q.get("instructions", ""),
+                    data=q.get("data") or {},
+                    answer_key=q.get("answer_key") or {},
+                )
+                for q in spec.get("questions", [])
+            ],
+            unique_fields=["test", "order"],
+            update_fields=QUESTION_FIELDS,
+        )
+        question_ids = {q.order: q.pk for q in questions}
+
+        options = bulk_upsert(
+            ListeningOption,
+            [
+                ListeningOption(question_id=question_ids[q["order"]], key=key, text=text)
+                for q in spec.get("questions", [])
+                for key, text in q.get("options", ())
+            ],
+            unique_fields=["question", "key"],
+            update_fields=["text"],
+        )
+
+        if prune:
+            ListeningOption.objects.filter(question__test=test).exclude(id__in=[o.pk for o in options]).delete()
+            ListeningQuestion.objects.filter(test=test).exclude(id__in=question_ids.values()).delete()
+            ListeningQuestionGroup.objects.filter(test=test).exclude(id__in=group_ids.values()).delete()
+
+    return len(groups) + len(questions) + len(options)
+
+
+def dump_test(test) -> dict:
+    """load_test ning teskarisi: testning group/savol/variantlari spec ko'rinishida."""
+    groups = list(ListeningQuestionGroup.objects.filter(test=test).order_by("order"))
+    group_orders = {g.id: g.order for g in groups}
+    options = {}
+    for question_id, key, text in (
+        ListeningOption.objects.filter(question__test=test).order_by("key").values_list("question_id", "key", "text")
+    ):
+        options.setdefault(question_id, []).append([key, text])
+
+    return {
+        "groups": [
+            {"order": g.order, "part": g.part, "group_type": g.group_type, "title": g.title,
+             "instructions": g.instructions, "data": g.data}
+            for g in groups
+        ],
+        "questions": [
+            {"order": q.order, "part": q.part, "qtype": q.qtype, "group": group_orders.get(q.group_id),
+             "prompt": q.prompt, "instructions": q.instructions, "data": q.data,
+             "answer_key": q.answer_key, "options": options.get(q.id, [])}
+            for q in ListeningQuestion.objects.filter(test=test).order_by("order")
+        ],
+    }
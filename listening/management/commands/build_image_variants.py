@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from listening.images import build_variants
+from listening.models import ListeningQuestionGroup, ListeningTest
+
+
+class Command(BaseCommand):
+    help = "Build responsive image variants (widths + WebP) for listening group images."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rebuild even if variants are up to date")
+
+    def handle(self, *args, **opts):
+        built = 0
+        tests = set()
+        for group in ListeningQuestionGroup.objects.exclude(image="").exclude(image__isnull=True):
+            if not opts["force"] and group.image_variants.get("source") == group.image.name:
+                continue
+            variants = build_variants(group.image)
+            ListeningQuestionGroup.objects.filter(id=group.id).update(image_variants=variants)
+            tests.add(group.test_id)
+            built += 1
+            self.stdout.write(f"group {group.id}: {len(variants['webp'])} widths")
+
+        # payload keshi yangilansin
+        ListeningTest.objects.filter(id__in=tests).update(content_version=F("content_version") + 1)
+        self.stdout.write(f"built variants for {built} images")
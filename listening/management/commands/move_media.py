@@ -0,0 +1,82 @@
+import os
+import shutil
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+
+
+def _file_fields():
+    for model in apps.get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, models.FileField):
+                yield model, field
+
+
+def _upload_dirs() -> list:
+    """FileField upload_to larining yuqori papkalari (derived/variant fayllar ham shu ichida)."""
+    dirs = set()
+    for _, field in _file_fields():
+        if isinstance(field.upload_to, str) and field.upload_to.strip("/"):
+            dirs.add(Path(field.upload_to.strip("/")).parts[0])
+    return sorted(dirs)
+
+
+class Command(BaseCommand):
+    help = (
+        "Move uploads stored before MEDIA_ROOT was set (relative to the working directory, "
+        "i.e. BASE_DIR) into MEDIA_ROOT. File names in the database do not change."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", default=str(settings.BASE_DIR),
+                            help="Old upload root (default: BASE_DIR)")
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be moved")
+
+    def handle(self, *args, **opts):
+        source = Path(opts["source"]).resolve()
+        target = Path(settings.MEDIA_ROOT).resolve()
+        if source == target:
+            raise CommandError("source and MEDIA_ROOT are the same directory")
+        dry_run = opts["dry_run"]
+
+        moved = skipped = 0
+        for upload_dir in _upload_dirs():
+            root = source / upload_dir
+            if not root.is_dir():
+                continue
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    src = Path(dirpath) / filename
+                    dest = target / src.relative_to(source)
+                    if dest.exists():
+                        # avvalgi (yarim) ishga tushirishda ko'chirilgan yoki yangi yuklangan
+                        self.stderr.write(f"exists, skipped: {dest}")
+                        skipped += 1
+                        continue
+                    if not dry_run:
+                        dest.parent.mkdir(parents=True, exist_ok=True)
+                        shutil.move(src, dest)
+                    moved += 1
+            if not dry_run:
+                # bo'sh qolgan eski papkalar
+                for dirpath, _, _ in sorted(os.walk(root), key=lambda item: -len(item[0])):
+                    if not os.listdir(dirpath):
+                        os.rmdir(dirpath)
+
+        missing = 0
+        for model, field in _file_fields():
+            names = (
+                model._default_manager
+                .exclude(**{field.name: ""}).exclude(**{f"{field.name}__isnull": True})
+                .values_list(field.name, flat=True)
+            )
+            for name in names.iterator():
+                if not (target / name).exists() and not (dry_run and (source / name).exists()):
+                    self.stderr.write(f"missing: {model._meta.label}.{field.name} {name}")
+                    missing += 1
+
+        verb = "would move" if dry_run else "moved"
+        self.stdout.write(f"{verb} {moved} files to {target} ({skipped} skipped, {missing} referenced files missing)")
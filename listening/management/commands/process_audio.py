@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from listening.ingest import process_pending
+
+
+class Command(BaseCommand):
+    help = "Probe uploaded listening audio, write duration back and build compact/segmented variants."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--test", type=int, action="append", dest="tests", metavar="ID",
+                            help="Only these tests (re-processed even if already ready)")
+        parser.add_argument("--loop", type=float, metavar="SECONDS",
+                            help="Keep running and pick up new uploads every SECONDS")
+
+    def handle(self, *args, **opts):
+        while True:
+            for test_id, status in process_pending(opts["tests"], force=bool(opts["tests"])):
+                self.stdout.write(f"test {test_id}: {status}")
+            if not opts["loop"]:
+                break
+            time.sleep(opts["loop"])
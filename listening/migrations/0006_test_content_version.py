@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listening', '0005_listeningattemptanswer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listeningtest',
+            name='content_version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
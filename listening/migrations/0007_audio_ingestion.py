@@ -0,0 +1,43 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listening', '0006_test_content_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listeningtest',
+            name='audio_bitrate',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='listeningtest',
+            name='audio_compact',
+            field=models.FileField(blank=True, editable=False, upload_to='listening_audio/derived/'),
+        ),
+        migrations.AddField(
+            model_name='listeningtest',
+            name='audio_error',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='listeningtest',
+            name='audio_playlist',
+            field=models.FileField(blank=True, editable=False, upload_to='listening_audio/derived/'),
+        ),
+        migrations.AddField(
+            model_name='listeningtest',
+            name='audio_source',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='listeningtest',
+            name='audio_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', editable=False, max_length=12),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listening', '0007_audio_ingestion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listeningquestiongroup',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attempts', '0003_in_progress_index'),
+        ('listening', '0008_group_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='listeningattemptanswer',
+            name='attempt',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='listening_answers', to='attempts.attempt'),
+        ),
+    ]
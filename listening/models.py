@@ -16,6 +16,22 @@ class ListeningTest(models.Model):
     title = models.CharField(max_length=120, blank=True)
     audio = models.FileField(upload_to="listening_audio/")
     duration_seconds = models.PositiveIntegerField(default=1800)  # 30 min
+    # kontent (group/savol/variant) o'zgarganda oshadi (signals.py) — keshlar shu bo'yicha yangilanadi
+    content_version = models.PositiveIntegerField(default=1, editable=False)
+
+    # audio ingestion (listening/ingest.py, `manage.py process_audio`)
+    AUDIO_STATUS = [
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("ready", "Ready"),
+        ("failed", "Failed"),
+    ]
+    audio_status = models.CharField(max_length=12, choices=AUDIO_STATUS, default="pending", editable=False)
+    audio_source = models.CharField(max_length=255, blank=True, editable=False)  # qayta ishlangan audio.name
+    audio_bitrate = models.PositiveIntegerField(null=True, blank=True, editable=False)  # kbps
+    audio_compact = models.FileField(upload_to="listening_audio/derived/", blank=True, editable=False)
+    audio_playlist = models.FileField(upload_to="listening_audio/derived/", blank=True, editable=False)
+    audio_error = models.TextField(blank=True, editable=False)
 
     def __str__(self):
         return f"Listening — {self.section.mock.title}"
@@ -45,6 +61,8 @@ class ListeningQuestionGroup(models.Model):
 
     # ✅ map/diagram uchun bitta rasm (ixtiyoriy)
     image = models.ImageField(upload_to="listening_images/", null=True, blank=True)
+    # responsive variantlar (listening/images.py) — signals.py yuklanganda quradi
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     # group config: labels, max_words default, etc.
     data = models.JSONField(default=dict, blank=True)
@@ -142,7 +160,9 @@ class ListeningOption(models.Model):
 from attempts.models import Attempt
 
 class ListeningAttemptAnswer(models.Model):
-    attempt = models.ForeignKey(Attempt, on_delete=models.CASCADE, related_name="listening_answers")
+    # alohida attempt indeksi kerak emas: (attempt, question) unique indeksi attempt bo'yicha
+    # qidiruvni ham qoplaydi, autosave upsert har yozishda bitta indeksni kam yangilaydi
+    attempt = models.ForeignKey(Attempt, on_delete=models.CASCADE, related_name="listening_answers", db_index=False)
     question = models.ForeignKey("ListeningQuestion", on_delete=models.CASCADE, related_name="attempt_answers")
     response = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,62 @@
+"""
+Listening sahifasi uchun oldindan serializatsiya qilingan test kontenti.
+
+Imtihon paytida kontent o'zgarmaydi, shuning uchun group -> savol -> variant
+daraxti bir marta yig'iladi va cache ga JSON qilib qo'yiladi. Kalit
+test.content_version ni o'z ichiga oladi: admin saqlasa versiya oshadi
+(signals.py) va keyingi so'rov yangi payload quradi.
+"""
+import json
+
+from django.core.cache import cache
+
+from .images import image_payload
+from .models import ListeningQuestionGroup
+
+PAYLOAD_TIMEOUT = 60 * 60 * 24
+
+
+def payload_key(test) -> str:
+    return f"listening:payload:{test.id}:v{test.content_version}"
+
+
+def build_payload(test) -> list:
+    groups = (
+        ListeningQuestionGroup.objects
+        .filter(test=test)
+        .prefetch_related("questions__options")
+        .order_by("order")
+    )
+    return [
+        {
+            "id": g.id,
+            "part": g.part,
+            "order": g.order,
+            "title": g.title,
+            "group_type": g.group_type,
+            "instructions": g.instructions,
+            **image_payload(g.image, g.image_variants),
+            "questions": [
+                {
+                    "id": q.id,
+                    "order": q.order,
+                    "part": q.part,
+                    "qtype": q.qtype,
+                    "prompt": q.prompt,
+                    "instructions": q.instructions,
+                    "options": [{"key": o.key, "text": o.text} for o in q.options.all()],
+                }
+                for q in g.questions.all()
+            ],
+        }
+        for g in groups
+    ]
+
+
+def get_payload(test) -> list:
+    key = payload_key(test)
+    raw = cache.get(key)
+    if raw is None:
+        raw = json.dumps(build_payload(test), separators=(",", ":"))
+        cache.set(key, raw, PAYLOAD_TIMEOUT)
+    return json.loads(raw)
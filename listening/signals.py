@@ -0,0 +1,47 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .images import build_variants
+from .models import ListeningOption, ListeningQuestion, ListeningQuestionGroup, ListeningTest
+
+
+def bump_content_version(**filters):
+    """Test kontenti o'zgardi — keshlangan answer key va payloadlar eskiradi."""
+    ListeningTest.objects.filter(**filters).update(content_version=F("content_version") + 1)
+
+
+@receiver(post_save, sender=ListeningTest)
+def audio_changed(sender, instance, **kwargs):
+    """Yangi audio yuklandi — ingestion navbatiga qo'yamiz (ishlov `manage.py process_audio` da)."""
+    if instance.audio.name != instance.audio_source and instance.audio_status != "pending":
+        ListeningTest.objects.filter(id=instance.id).update(audio_status="pending", audio_error="")
+
+
+@receiver(post_save, sender=ListeningQuestionGroup)
+def group_image_changed(sender, instance, **kwargs):
+    """
+    Yangi rasm — variantlar (bir nechta enlik + WebP) shu yerda quriladi.
+    group_changed dan oldin ulangan: versiya oshganda variantlar allaqachon yozilgan bo'ladi.
+    """
+    source = instance.image.name if instance.image else ""
+    if instance.image_variants.get("source", "") == source:
+        return
+    variants = build_variants(instance.image) if source else {}
+    ListeningQuestionGroup.objects.filter(id=instance.id).update(image_variants=variants)
+    instance.image_variants = variants
+
+
+@receiver([post_save, post_delete], sender=ListeningQuestionGroup)
+def group_changed(sender, instance, **kwargs):
+    bump_content_version(id=instance.test_id)
+
+
+@receiver([post_save, post_delete], sender=ListeningQuestion)
+def question_changed(sender, instance, **kwargs):
+    bump_content_version(id=instance.test_id)
+
+
+@receiver([post_save, post_delete], sender=ListeningOption)
+def option_changed(sender, instance, **kwargs):
+    bump_content_version(questions__id=instance.question_id)
@@ -1,3 +1,433 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+import wave
+from io import BytesIO, StringIO
+from unittest import mock as mocklib, skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from attempts import answer_keys
+from attempts.models import Attempt
+from attempts.tests import make_mock
+from listening import ingest
+from listening.loader import load_test
+from listening.management.commands import seed_listening
+from listening.payload import get_payload
+from listening.models import ListeningAttemptAnswer, ListeningQuestion, ListeningQuestionGroup, ListeningTest
+
+
+class ListeningSaveAnswersTests(TestCase):
+    def setUp(self):
+        answer_keys.clear_cache()
+        self.mock = make_mock()
+        self.other_mock = make_mock(slug="mock-2")
+        self.user = get_user_model().objects.create_user("candidate", password="pass12345")
+        self.client.force_login(self.user)
+        self.attempt = Attempt.objects.create(mock=self.mock)
+        session = self.client.session
+        session["active_attempt_id"] = self.attempt.id
+        session.save()
+        self.questions = list(ListeningQuestion.objects.filter(test__section__mock=self.mock))
+
+    def post_batch(self, answers):
+        return self.client.post(
+            "/listening/save-answers/", json.dumps({"answers": answers}), content_type="application/json",
+        )
+
+    def test_batch_upserts_latest_value_per_question(self):
+        q1, q2 = self.questions[:2]
+        res = self.post_batch([
+            {"question_id": q1.id, "value": "ans", "client_seq": 1},
+            {"question_id": q1.id, "value": "answer 1", "client_seq": 3},
+            {"question_id": q2.id, "value": "x", "client_seq": 2},
+        ])
+        self.assertEqual(res.json(), {"ok": True, "saved": 2, "rejected": [], "ack": 3})
+
+        self.post_batch([{"question_id": q2.id, "value": "answer 2", "client_seq": 4}])
+        saved = dict(
+            ListeningAttemptAnswer.objects.filter(attempt=self.attempt).values_list("question_id", "response")
+        )
+        self.assertEqual(saved, {q1.id: {"text": "answer 1"}, q2.id: {"text": "answer 2"}})
+
+    def test_questions_of_other_tests_are_rejected(self):
+        foreign = ListeningQuestion.objects.filter(test__section__mock=self.other_mock).first()
+        res = self.post_batch([{"question_id": foreign.id, "value": "x", "client_seq": 1}])
+        self.assertEqual(res.json()["rejected"], [foreign.id])
+        self.assertFalse(ListeningAttemptAnswer.objects.exists())
+
+    def test_invalid_body_is_400(self):
+        res = self.client.post("/listening/save-answers/", "nope", content_type="application/json")
+        self.assertEqual(res.status_code, 400)
+        res = self.post_batch([{"value": "no id"}])
+        self.assertEqual(res.status_code, 400)
+
+    def test_query_count_is_constant_for_batch(self):
+        answers = [{"question_id": q.id, "value": "a", "client_seq": i} for i, q in enumerate(self.questions)]
+        self.post_batch(answers[:1])  # answer key keshga tushadi
+        # attempt/test sessiyadagi kontekstdan (cached_db) — faqat bulk upsert
+        with self.assertNumQueries(1):
+            self.post_batch(answers)
+
+
+class ListeningPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.mock = make_mock()
+        self.test = ListeningTest.objects.get(section__mock=self.mock)
+        group = ListeningQuestionGroup.objects.create(test=self.test, order=1, title="Part 1 — Form")
+        ListeningQuestion.objects.filter(test=self.test).update(group=group)
+
+        user = get_user_model().objects.create_user("candidate", password="pass12345")
+        self.client.force_login(user)
+        attempt = Attempt.objects.create(mock=self.mock)
+        session = self.client.session
+        session["active_attempt_id"] = attempt.id
+        session.save()
+
+    def test_hot_cache_renders_without_content_queries(self):
+        res = self.client.get("/listening/")
+        self.assertContains(res, "Part 1 — Form")
+        # user, test, saqlangan javoblar — attempt/group/savol/variant so'rovlari yo'q
+        with self.assertNumQueries(3):
+            res = self.client.get("/listening/")
+        self.assertContains(res, "Q4")
+
+    def test_hot_fragment_skips_payload(self):
+        self.client.get("/listening/")
+        with mocklib.patch("listening.views.get_payload") as get_payload:
+            res = self.client.get("/listening/")
+        get_payload.assert_not_called()
+        self.assertContains(res, "Part 1 — Form")
+
+    def test_saved_answers_are_rendered_per_attempt(self):
+        self.client.get("/listening/")  # fragment keshlanadi
+        question = ListeningQuestion.objects.get(test=self.test, order=2)
+        ListeningAttemptAnswer.objects.create(
+            attempt_id=self.client.session["active_attempt_id"], question=question, response={"text": "library"},
+        )
+        res = self.client.get("/listening/")
+        self.assertEqual(res.context["saved_answers"], {question.id: {"text": "library"}})
+        self.assertContains(res, '"library"')
+
+    def test_admin_edit_invalidates_payload(self):
+        self.client.get("/listening/")
+        group = ListeningQuestionGroup.objects.get(test=self.test)
+        group.title = "Renamed group"
+        group.save()
+        self.assertContains(self.client.get("/listening/"), "Renamed group")
+
+
+class ListeningAudioTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.data = bytes(range(256)) * 40  # 10240 bayt
+        os.makedirs(os.path.join(self.media, "listening_audio"))
+        with open(os.path.join(self.media, "listening_audio", "test.mp3"), "wb") as f:
+            f.write(self.data)
+
+        self.mock = make_mock()
+        self.test = ListeningTest.objects.get(section__mock=self.mock)
+        self.client.force_login(get_user_model().objects.create_user("candidate", password="pass12345"))
+        attempt = Attempt.objects.create(mock=self.mock)
+        session = self.client.session
+        session["active_attempt_id"] = attempt.id
+        session.save()
+        self.url = f"/listening/audio/{self.test.id}/"
+
+    def test_full_file_is_streamed(self):
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.streaming)
+        self.assertEqual(b"".join(res.streaming_content), self.data)
+        self.assertEqual(res["Content-Length"], str(len(self.data)))
+        self.assertEqual(res["Accept-Ranges"], "bytes")
+        self.assertEqual(res["Content-Type"], "audio/mpeg")
+        self.assertIn("private", res["Cache-Control"])
+
+    def test_range_requests_get_206(self):
+        res = self.client.get(self.url, HTTP_RANGE="bytes=100-199")
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(res["Content-Range"], f"bytes 100-199/{len(self.data)}")
+        self.assertEqual(b"".join(res.streaming_content), self.data[100:200])
+
+        res = self.client.get(self.url, HTTP_RANGE="bytes=10000-")
+        self.assertEqual(b"".join(res.streaming_content), self.data[10000:])
+
+        res = self.client.get(self.url, HTTP_RANGE="bytes=-40")
+        self.assertEqual(res["Content-Range"], f"bytes 10200-10239/{len(self.data)}")
+        self.assertEqual(b"".join(res.streaming_content), self.data[-40:])
+
+    def test_unsatisfiable_and_multi_ranges(self):
+        res = self.client.get(self.url, HTTP_RANGE="bytes=20000-")
+        self.assertEqual(res.status_code, 416)
+        self.assertEqual(res["Content-Range"], f"bytes */{len(self.data)}")
+
+        res = self.client.get(self.url, HTTP_RANGE="bytes=0-10,20-30")
+        self.assertEqual(res.status_code, 200)
+
+    def test_conditional_requests(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # eski If-Range -> to'liq fayl
+        res = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(res.status_code, 200)
+        res = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag)
+        self.assertEqual(res.status_code, 206)
+
+    def test_access_is_tied_to_attempt(self):
+        other = ListeningTest.objects.get(section__mock=make_mock(slug="mock-2"))
+        self.assertEqual(self.client.get(f"/listening/audio/{other.id}/").status_code, 403)
+
+        self.client.post("/listening/terminate/")
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    @override_settings(AUDIO_SENDFILE_HEADER="X-Accel-Redirect")
+    def test_sendfile_header_delegates_to_web_server(self):
+        res = self.client.get(self.url)
+        self.assertEqual(res["X-Accel-Redirect"], "/protected-media/listening_audio/test.mp3")
+        self.assertEqual(res.content, b"")
+
+
+def write_wav_fixture(path, seconds=3, rate=8000):
+    """8 kHz mono 8-bit WAV (64 kbps) — stdlib bilan probe qilinadigan fixture."""
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(1)
+        w.setframerate(rate)
+        w.writeframes(bytes((i * 7) % 256 for i in range(rate * seconds)))
+
+
+class AudioIngestTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        os.makedirs(os.path.join(self.media, "listening_audio"))
+        write_wav_fixture(os.path.join(self.media, "listening_audio", "part1.wav"))
+        self.mock = make_mock()
+        self.test = ListeningTest.objects.get(section__mock=self.mock)
+        self.test.audio = "listening_audio/part1.wav"
+        self.test.save()
+
+    def test_probe_writes_duration_back_without_ffmpeg(self):
+        with mocklib.patch("listening.ingest._tool", return_value=None), self.assertLogs("listening.ingest", "WARNING"):
+            self.assertEqual(ingest.process_pending(), [(self.test.id, "ready")])
+        self.test.refresh_from_db()
+        self.assertEqual(self.test.duration_seconds, 3)
+        self.assertEqual(self.test.audio_bitrate, 64)
+        self.assertEqual(self.test.audio_source, "listening_audio/part1.wav")
+        self.assertFalse(self.test.audio_compact)
+
+        # qayta ishlangan test navbatga qaytmaydi, yangi audio esa qaytadi
+        self.assertEqual(ingest.process_pending(), [])
+        self.test.audio = "listening_audio/part2.wav"
+        self.test.save()
+        self.test.refresh_from_db()
+        self.assertEqual(self.test.audio_status, "pending")
+
+    def test_mp3_header_probe(self):
+        path = os.path.join(self.media, "sample.mp3")
+        frame = b"\xff\xfb\x90\x00" + b"\x00" * 413  # MPEG-1 Layer III, 128 kbps
+        with open(path, "wb") as f:
+            f.write(b"ID3\x03\x00\x00\x00\x00\x00\x0a" + b"\x00" * 10 + frame * 100)
+        info = ingest._probe_mp3(path)
+        self.assertEqual(info["bitrate"], 128)
+        self.assertAlmostEqual(info["duration"], 417 * 100 * 8 / 128000)
+
+    def test_unreadable_audio_is_marked_failed(self):
+        with open(os.path.join(self.media, "listening_audio", "part1.wav"), "wb") as f:
+            f.write(b"not audio at all")
+        with mocklib.patch("listening.ingest._tool", return_value=None), self.assertLogs("listening.ingest", "ERROR"):
+            self.assertEqual(ingest.process_pending(), [(self.test.id, "failed")])
+        self.test.refresh_from_db()
+        self.assertEqual(self.test.audio_status, "failed")
+        self.assertTrue(self.test.audio_error)
+
+    def test_command_reprocesses_requested_tests(self):
+        with mocklib.patch("listening.ingest._tool", return_value=None), self.assertLogs("listening.ingest", "WARNING"):
+            ingest.process_pending()
+            out = StringIO()
+            call_command("process_audio", "--test", str(self.test.id), stdout=out)
+        self.assertIn(f"test {self.test.id}: ready", out.getvalue())
+
+    @skipUnless(shutil.which("ffmpeg") and shutil.which("ffprobe"), "ffmpeg o'rnatilmagan")
+    def test_ffmpeg_builds_compact_variant_and_segments(self):
+        write_wav_fixture(os.path.join(self.media, "listening_audio", "part1.wav"), seconds=25)
+        with override_settings(AUDIO_SEGMENT_SECONDS=10):
+            ingest.process_pending()
+        self.test.refresh_from_db()
+        self.assertEqual(self.test.audio_status, "ready", self.test.audio_error)
+        self.assertEqual(self.test.duration_seconds, 25)
+        self.assertTrue(self.test.audio_compact.storage.exists(self.test.audio_compact.name))
+        with self.test.audio_playlist.open("r") as f:
+            self.assertGreaterEqual(f.read().count(ingest.SEGMENT_PREFIX), 3)
+
+    def test_playlist_points_to_access_checked_segments(self):
+        hls = os.path.join(self.media, "listening_audio", "derived", str(self.test.id), "hls")
+        os.makedirs(hls)
+        with open(os.path.join(hls, "index.m3u8"), "w") as f:
+            f.write("#EXTM3U\n#EXTINF:10.0,\nseg_0000.ts\n#EXT-X-ENDLIST\n")
+        with open(os.path.join(hls, "seg_0000.ts"), "wb") as f:
+            f.write(b"segment-bytes")
+        ListeningTest.objects.filter(id=self.test.id).update(
+            audio_playlist=f"listening_audio/derived/{self.test.id}/hls/index.m3u8"
+        )
+
+        self.client.force_login(get_user_model().objects.create_user("candidate", password="pass12345"))
+        attempt = Attempt.objects.create(mock=self.mock)
+        session = self.client.session
+        session["active_attempt_id"] = attempt.id
+        session.save()
+
+        segment_url = f"/listening/audio/{self.test.id}/hls/seg_0000.ts"
+        res = self.client.get(f"/listening/audio/{self.test.id}/index.m3u8")
+        self.assertContains(res, segment_url)
+        res = self.client.get(segment_url)
+        self.assertEqual(b"".join(res.streaming_content), b"segment-bytes")
+        self.assertEqual(self.client.get(f"/listening/audio/{self.test.id}/hls/index.m3u8").status_code, 404)
+
+
+class GroupImageVariantTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.mock = make_mock()
+        self.test = ListeningTest.objects.get(section__mock=self.mock)
+
+    def upload(self, size=(1600, 900), fmt="PNG", name="map.png", order=1):
+        buf = BytesIO()
+        Image.new("RGB", size, (30, 120, 200)).save(buf, format=fmt)
+        return ListeningQuestionGroup.objects.create(
+            test=self.test, order=order, group_type="map", image=SimpleUploadedFile(name, buf.getvalue()),
+        )
+
+    def test_upload_builds_content_addressed_widths_and_webp(self):
+        group = self.upload()
+        group.refresh_from_db()
+        variants = group.image_variants
+        self.assertEqual(variants["source"], group.image.name)
+        self.assertEqual([w for w, _ in variants["webp"]], [480, 768, 1200])
+        self.assertTrue(all(name.endswith(".png") for _, name in variants["fallback"]))
+        _, name = variants["webp"][0]
+        self.assertRegex(name, r"^listening_images/v/[0-9a-f]{16}/480\.webp$")
+        with Image.open(os.path.join(self.media, name)) as img:
+            self.assertEqual((img.format, img.size), ("WEBP", (480, 270)))
+
+        # bir xil kontent — bir xil manzil
+        other = self.upload(name="copy.png", order=2)
+        other.refresh_from_db()
+        self.assertEqual(other.image_variants["webp"], variants["webp"])
+
+    def test_small_image_is_not_upscaled(self):
+        group = self.upload(size=(600, 400), fmt="JPEG", name="photo.jpg")
+        group.refresh_from_db()
+        self.assertEqual([w for w, _ in group.image_variants["fallback"]], [480, 600])
+        self.assertTrue(group.image_variants["fallback"][0][1].endswith(".jpg"))
+
+    def test_payload_exposes_srcset(self):
+        self.upload()
+        group = get_payload(ListeningTest.objects.get(id=self.test.id))[0]
+        self.assertIn("480w", group["image_webp_srcset"])
+        self.assertIn("1200w", group["image_srcset"])
+        self.assertTrue(group["image_url"].endswith("/1200.png"))
+        self.assertEqual((group["image_width"], group["image_height"]), (1200, 675))
+
+    def test_backfill_command(self):
+        group = self.upload()
+        ListeningQuestionGroup.objects.filter(id=group.id).update(image_variants={})
+        out = StringIO()
+        call_command("build_image_variants", stdout=out)
+        self.assertIn("built variants for 1 images", out.getvalue())
+        group.refresh_from_db()
+        self.assertEqual(len(group.image_variants["webp"]), 3)
+
+
+class SeedListeningTests(TestCase):
+    def setUp(self):
+        self.tests = [ListeningTest.objects.get(section__mock=make_mock(slug=f"seed-{i}", listening_questions=0))
+                      for i in range(2)]
+
+    def test_bulk_load_is_a_few_queries_per_test(self):
+        spec = seed_listening.sample_spec()
+        # savepoint + group/savol/variant upsert + release
+        with self.assertNumQueries(5):
+            rows = load_test(self.tests[0], spec)
+        self.assertEqual(rows, 5 + 30 + 30)
+
+        # qayta yuklash idempotent — mavjud qatorlar yangilanadi
+        spec["questions"][0]["prompt"] = "Updated prompt"
+        load_test(self.tests[0], spec)
+        self.assertEqual(ListeningQuestion.objects.filter(test=self.tests[0]).count(), 30)
+        question = ListeningQuestion.objects.get(test=self.tests[0], order=1)
+        self.assertEqual(question.prompt, "Updated prompt")
+        self.assertEqual(question.group.order, 1)
+
+    def test_command_seeds_many_tests_and_bumps_version(self):
+        versions = {t.id: t.content_version for t in self.tests}
+        out = StringIO()
+        call_command("seed_listening", "--all", stdout=out)
+        self.assertIn("2 tests, 130 rows", out.getvalue())
+        self.assertIn("rows/s", out.getvalue())
+        for test in ListeningTest.objects.filter(id__in=versions):
+            self.assertEqual(test.questions.count(), 30)
+            self.assertGreater(test.content_version, versions[test.id])
+        self.assertEqual(ListeningQuestion.objects.get(test=self.tests[1], order=16).options.count(), 3)
+
+
+class MoveMediaTests(TestCase):
+    def setUp(self):
+        self.old_root = tempfile.mkdtemp()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.old_root, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media))
+        # MEDIA_ROOT qo'yilishidan oldingi yuklash: fayl ishchi papkada (BASE_DIR)
+        self.test = ListeningTest.objects.get(section__mock=make_mock(listening_questions=0))
+        for name in (self.test.audio.name, "listening_audio/derived/1/compact.mp3"):
+            os.makedirs(os.path.join(self.old_root, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(self.old_root, name), "wb") as f:
+                f.write(b"ID3")
+
+    def move(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command("move_media", "--source", self.old_root, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_dry_run_moves_nothing(self):
+        out, err = self.move("--dry-run")
+        self.assertIn("would move 2 files", out)
+        self.assertEqual(err, "")
+        self.assertFalse(os.path.exists(os.path.join(self.media, self.test.audio.name)))
+
+    def test_moves_uploads_into_media_root(self):
+        out, _ = self.move()
+        self.assertIn("moved 2 files", out)
+        self.assertIn("0 referenced files missing", out)
+        self.test.refresh_from_db()
+        with self.test.audio.open("rb") as f:
+            self.assertEqual(f.read(), b"ID3")
+        self.assertTrue(os.path.exists(os.path.join(self.media, "listening_audio/derived/1/compact.mp3")))
+        self.assertFalse(os.path.exists(os.path.join(self.old_root, "listening_audio")))
+
+        # qayta ishga tushirish xavfsiz
+        self.assertIn("moved 0 files", self.move()[0])
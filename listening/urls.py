@@ -1,9 +1,27 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# ASYNC_VIEWS (ASGI profili): autosave/kanal/submit/terminate async variantlari
+if settings.ASYNC_VIEWS:
+    save_answers, channel_save, submit, terminate = (
+        views.listening_save_answers_async, views.listening_channel_save_answers_async,
+        views.listening_submit_async, views.listening_terminate_async,
+    )
+else:
+    save_answers, channel_save, submit, terminate = (
+        views.listening_save_answers, views.listening_channel_save_answers,
+        views.listening_submit, views.listening_terminate,
+    )
+
 urlpatterns = [
     path("", views.listening_page, name="listening_page"),
+    path("audio/<int:test_id>/", views.listening_audio, name="listening_audio"),
+    path("audio/<int:test_id>/index.m3u8", views.listening_audio_playlist, name="listening_audio_playlist"),
+    path("audio/<int:test_id>/hls/<str:name>", views.listening_audio_segment, name="listening_audio_segment"),
     path("save-answer/", views.listening_save_answer, name="listening_save_answer"),
-    path("submit/", views.listening_submit, name="listening_submit"),
-    path("terminate/", views.listening_terminate, name="listening_terminate"),
+    path("save-answers/", save_answers, name="listening_save_answers"),
+    path("channel/save-answers/", channel_save, name="listening_channel_save_answers"),
+    path("submit/", submit, name="listening_submit"),
+    path("terminate/", terminate, name="listening_terminate"),
 ]
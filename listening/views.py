@@ -1,34 +1,45 @@
+import posixpath
+import re
+
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, HttpResponseForbidden
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 from django.utils import timezone
-from django.views.decorators.http import require_http_methods, require_POST
-
-from attempts.models import Attempt
-from mocks.models import MockSection
-from listening.models import (
-    ListeningTest,
-    ListeningQuestionGroup,
-    ListeningQuestion,
-    ListeningAttemptAnswer,
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods, require_POST, require_safe
+
+from attempts import answer_buffer
+from attempts.channel import channel_token_required, issue_token
+from attempts.answer_keys import aanswer_key_for_test_id, answer_key_for_test_id
+from attempts.answers import astore_answers, load_answers, parse_answer_batch, store_answers
+from attempts.context import (
+    aadvance_section, advance_section, astore_context, attempt_required, get_context, refresh_context, section_url,
+    store_context,
 )
+from attempts.models import Attempt
+from attempts.scoring import agrade_attempt, grade_attempt
+from listening.audio import serve_audio
+from listening.ingest import SEGMENT_PREFIX
+from listening.models import ListeningTest
+from listening.payload import PAYLOAD_TIMEOUT, get_payload
+
+
+SEGMENT_RE = re.compile(rf"^{SEGMENT_PREFIX}\d+\.ts$")
 
 
 def _get_active_attempt(request) -> Attempt | None:
+    """Holat o'zgartiriladigan joylar uchun: attempt DB dan yangidan o'qiladi."""
     attempt_id = request.session.get("active_attempt_id")
     if not attempt_id:
         return None
     return Attempt.objects.select_related("mock").filter(id=attempt_id).first()
 
 
-def _get_listening_test_for_attempt(attempt: Attempt) -> ListeningTest:
-    section = get_object_or_404(MockSection, mock=attempt.mock, section="listening")
-    return get_object_or_404(ListeningTest, section=section)
-
-
 def _ensure_attempt_ok(request) -> Attempt | None:
     """
-    Listening page va API lar uchun umumiy guard:
+    Submit uchun guard (sessiyadagi kontekstga emas, DB ga qaraydi):
     - attempt bo'lishi shart
     - status in_progress bo'lishi shart
     - current_section listening bo'lishi shart
@@ -46,40 +57,93 @@ def _ensure_attempt_ok(request) -> Attempt | None:
 @login_required
 @require_http_methods(["GET"])
 def listening_page(request):
-    attempt = _get_active_attempt(request)
-    if not attempt:
+    ctx = get_context(request)
+    if not ctx:
         return redirect("mock_list")
+    # sweeper, proktor yoki boshqa tab attempt holatini o'zgartirgan bo'lishi mumkin
+    ctx = refresh_context(request, ctx)
 
     # attempt tugagan bo'lsa qayta kirishni bloklaymiz (audio bug fix)
-    if attempt.status != "in_progress":
-        return redirect("mock_detail", slug=attempt.mock.slug)
+    if ctx.status != "in_progress":
+        return redirect("mock_detail", slug=ctx.mock_slug)
 
     # section boshqa bo'lsa instructionsga qaytaramiz
-    if attempt.current_section != "listening":
-        return redirect(f"/{attempt.current_section}/")
-
-    test = _get_listening_test_for_attempt(attempt)
+    if ctx.current_section != "listening":
+        return redirect(f"/{ctx.current_section}/")
 
-    groups = (
-        ListeningQuestionGroup.objects
-        .filter(test=test)
-        .prefetch_related("questions__options")
-        .order_by("order")
-    )
+    test = get_object_or_404(ListeningTest, id=ctx.test_id)
 
     return render(
         request,
         "listening/test.html",
         {
-            "attempt": attempt,
             "test": test,
-            "groups": groups,
-            "total_seconds": test.duration_seconds,
+            # fragment keshi issiq bo'lsa payload umuman o'qilmaydi
+            "groups": SimpleLazyObject(lambda: get_payload(test)),
+            "fragment_timeout": PAYLOAD_TIMEOUT,
+            "saved_answers": load_answers("listening", ctx.attempt_id),
+            # qolgan vaqt server deadline bo'yicha (sahifa yangilansa taymer qaytadan boshlanmaydi)
+            "total_seconds": ctx.remaining_seconds(test.duration_seconds),
+            "channel_token": issue_token(ctx),
         }
     )
 
 
-def _normalize_response(q: ListeningQuestion, raw_value: str) -> dict:
+def _audio_test(request, test_id, *fields):
+    if request.attempt_ctx.test_id != test_id:
+        return None
+    row = ListeningTest.objects.filter(id=test_id).values_list(*fields).first()
+    if row is None:
+        raise Http404
+    return row
+
+
+@attempt_required("listening")
+@require_safe
+def listening_audio(request, test_id):
+    """
+    Audio faqat shu testni ishlayotgan attemptga beriladi; ingestion tayyor bo'lsa
+    compact variant, aks holda original. Range/206 va keshlash headerlari listening/audio.py da.
+    """
+    row = _audio_test(request, test_id, "audio", "audio_compact")
+    if row is None:
+        return HttpResponseForbidden()
+    audio, compact = row
+    return serve_audio(request, ListeningTest._meta.get_field("audio").storage, compact or audio)
+
+
+@attempt_required("listening")
+@require_safe
+def listening_audio_playlist(request, test_id):
+    """HLS index: segment nomlari access-checked segment URL lariga almashtiriladi."""
+    row = _audio_test(request, test_id, "audio_playlist")
+    if row is None:
+        return HttpResponseForbidden()
+    if not row[0]:
+        raise Http404
+    with ListeningTest._meta.get_field("audio_playlist").storage.open(row[0], "r") as f:
+        lines = [
+            line if not line or line.startswith("#") else reverse("listening_audio_segment", args=[test_id, line])
+            for line in f.read().splitlines()
+        ]
+    response = HttpResponse("\n".join(lines) + "\n", content_type="application/vnd.apple.mpegurl")
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@attempt_required("listening")
+@require_safe
+def listening_audio_segment(request, test_id, name):
+    row = _audio_test(request, test_id, "audio_playlist")
+    if row is None:
+        return HttpResponseForbidden()
+    if not row[0] or not SEGMENT_RE.match(name):
+        raise Http404
+    storage = ListeningTest._meta.get_field("audio_playlist").storage
+    return serve_audio(request, storage, f"{posixpath.dirname(row[0])}/{name}")
+
+
+def _normalize_response(q, raw_value: str) -> dict:
     """
     Frontend save-answer endpointdan keladigan value ni qtype bo'yicha JSONga aylantiramiz.
     HTML template'da:
@@ -101,14 +165,10 @@ def _normalize_response(q: ListeningQuestion, raw_value: str) -> dict:
     return {"value": raw_value}
 
 
-@login_required
+@attempt_required("listening")
 @require_POST
 def listening_save_answer(request):
-    attempt = _ensure_attempt_ok(request)
-    if not attempt:
-        return HttpResponseForbidden()
-
-    test = _get_listening_test_for_attempt(attempt)
+    ctx = request.attempt_ctx
 
     qid = request.POST.get("question_id")
     value = request.POST.get("value", "")
@@ -117,19 +177,99 @@ def listening_save_answer(request):
         return JsonResponse({"ok": False, "error": "question_id required"}, status=400)
 
     # Savol shu testga tegishli bo'lishi shart (xavfsizlik)
-    question = get_object_or_404(ListeningQuestion, id=qid, test=test)
+    try:
+        question = answer_key_for_test_id("listening", ctx.test_id).questions[int(qid)]
+    except (KeyError, ValueError):
+        raise Http404
 
     response = _normalize_response(question, value)
 
-    ListeningAttemptAnswer.objects.update_or_create(
-        attempt=attempt,
-        question=question,
-        defaults={"response": response},
-    )
+    store_answers("listening", ctx.attempt_id, {question.qid: response})
 
     return JsonResponse({"ok": True})
 
 
+@attempt_required("listening")
+@require_POST
+def listening_save_answers(request):
+    """
+    Debounce qilingan batch autosave: attempt/test sessiyadagi kontekstdan olinadi,
+    savollar keshlangan answer key bo'yicha tekshiriladi va hammasi bitta bulk upsert
+    bilan yoziladi (yozishdan oldin DB o'qilmaydi).
+    """
+    return _save_batch(request)
+
+
+@attempt_required("listening")
+@require_POST
+async def listening_save_answers_async(request):
+    """listening_save_answers ning async varianti (ASYNC_VIEWS): worker thread band qilinmaydi."""
+    return await _asave_batch(request)
+
+
+@csrf_exempt
+@channel_token_required("listening")
+@require_POST
+def listening_channel_save_answers(request):
+    """
+    Exam kanali orqali autosave (attempts/channel.py): attempt X-Attempt-Token dan,
+    sessiya, user va CSRF o'qilmaydi. Bo'sh batch — heartbeat.
+    """
+    return _save_batch(request)
+
+
+@csrf_exempt
+@channel_token_required("listening")
+@require_POST
+async def listening_channel_save_answers_async(request):
+    return await _asave_batch(request)
+
+
+def _save_batch(request):
+    ctx = request.attempt_ctx
+
+    latest = parse_answer_batch(request.body)
+    if latest is None:
+        return JsonResponse({"ok": False, "error": "invalid batch"}, status=400)
+
+    key = answer_key_for_test_id("listening", ctx.test_id)
+    answers, rejected = _validate_batch(key, latest)
+    if answers:
+        store_answers("listening", ctx.attempt_id, answers)
+    return _batch_saved(latest, answers, rejected)
+
+
+async def _asave_batch(request):
+    ctx = request.attempt_ctx
+
+    latest = parse_answer_batch(request.body)
+    if latest is None:
+        return JsonResponse({"ok": False, "error": "invalid batch"}, status=400)
+
+    key = await aanswer_key_for_test_id("listening", ctx.test_id)
+    answers, rejected = _validate_batch(key, latest)
+    if answers:
+        await astore_answers("listening", ctx.attempt_id, answers)
+    return _batch_saved(latest, answers, rejected)
+
+
+def _validate_batch(key, latest):
+    """Savollar keshlangan answer key bo'yicha tekshiriladi: ({qid: response}, [rad etilgan qid])."""
+    answers, rejected = {}, []
+    for qid, (seq, value) in latest.items():
+        q = key.questions.get(qid)
+        if q is None:
+            rejected.append(qid)
+            continue
+        answers[qid] = _normalize_response(q, value)
+    return answers, rejected
+
+
+def _batch_saved(latest, answers, rejected):
+    ack = max((seq for seq, _ in latest.values()), default=0)
+    return JsonResponse({"ok": True, "saved": len(answers), "rejected": rejected, "ack": ack})
+
+
 @login_required
 @require_POST
 def listening_submit(request):
@@ -143,14 +283,17 @@ def listening_submit(request):
         # Agar attempt yo'q yoki tugagan bo'lsa mock detailga qaytaramiz
         attempt0 = _get_active_attempt(request)
         if attempt0:
+            store_context(request, attempt0)
             return JsonResponse({"ok": False, "redirect": f"/mocks/{attempt0.mock.slug}/"}, status=400)
         return JsonResponse({"ok": False, "redirect": "/mocks/"}, status=400)
 
-    # Listening tugadi -> readingga o'tamiz
-    attempt.current_section = "reading"
-    attempt.save(update_fields=["current_section"])
+    # Listening tugadi -> readingga o'tamiz; o'tishni yutgan so'rov baholaydi
+    if advance_section(attempt, "listening", "reading"):
+        answer_buffer.flush_attempt(attempt.id, ["listening"])
+        grade_attempt(attempt, "listening")
+    store_context(request, attempt)
 
-    return JsonResponse({"ok": True, "redirect": "/reading/"})
+    return JsonResponse({"ok": True, "redirect": section_url(attempt)})
 
 
 @login_required
@@ -165,9 +308,55 @@ def listening_terminate(request):
     if not attempt:
         return JsonResponse({"ok": False, "redirect": "/mocks/"}, status=400)
 
+    answer_buffer.flush_attempt(attempt.id)
     if attempt.status == "in_progress":
         attempt.status = "terminated"
         attempt.finished_at = timezone.now()
         attempt.save(update_fields=["status", "finished_at"])
+    store_context(request, attempt)
+
+    return JsonResponse({"ok": True, "redirect": f"/mocks/{attempt.mock.slug}/"})
+
+
+async def _aget_active_attempt(request) -> Attempt | None:
+    attempt_id = await request.session.aget("active_attempt_id")
+    if not attempt_id:
+        return None
+    return await Attempt.objects.select_related("mock").filter(id=attempt_id).afirst()
+
+
+@login_required
+@require_POST
+async def listening_submit_async(request):
+    """listening_submit ning async varianti (ASYNC_VIEWS)."""
+    attempt = await _aget_active_attempt(request)
+    if not attempt or attempt.status != "in_progress" or attempt.current_section != "listening":
+        if attempt:
+            await astore_context(request, attempt)
+            return JsonResponse({"ok": False, "redirect": f"/mocks/{attempt.mock.slug}/"}, status=400)
+        return JsonResponse({"ok": False, "redirect": "/mocks/"}, status=400)
+
+    if await aadvance_section(attempt, "listening", "reading"):
+        await answer_buffer.aflush_attempt(attempt.id, ["listening"])
+        await agrade_attempt(attempt, "listening")
+    await astore_context(request, attempt)
+
+    return JsonResponse({"ok": True, "redirect": section_url(attempt)})
+
+
+@login_required
+@require_POST
+async def listening_terminate_async(request):
+    """listening_terminate ning async varianti (ASYNC_VIEWS)."""
+    attempt = await _aget_active_attempt(request)
+    if not attempt:
+        return JsonResponse({"ok": False, "redirect": "/mocks/"}, status=400)
+
+    await answer_buffer.aflush_attempt(attempt.id)
+    if attempt.status == "in_progress":
+        attempt.status = "terminated"
+        attempt.finished_at = timezone.now()
+        await attempt.asave(update_fields=["status", "finished_at"])
+    await astore_context(request, attempt)
 
     return JsonResponse({"ok": True, "redirect": f"/mocks/{attempt.mock.slug}/"})
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class MocksConfig(AppConfig):
     name = 'mocks'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,221 @@
+"""
+Mock bundle: mocklarni staging <-> production o'rtasida ko'chirish formati.
+
+Fayl JSON Lines (.jsonl, ixtiyoriy .gz): birinchi qator header, keyin har qatorda
+bitta mock — export ham, import ham qatorma-qator ishlaydi, yuzlab mocklik katalog
+xotirada to'liq turmaydi.
+
+    {"format": "ieltszone-bundle", "version": 1}
+    {"slug": "...", "title": "...", ..., "sections": [
+        {"section": "listening", "order": 1, "duration_seconds": 1800,
+         "hash": "<sha256>", "test": {"title": "...", ...}}, ...]}
+
+section["test"] — listening/reading uchun loader spec (listening.loader, reading.loader)
++ test maydonlari, writing uchun tasks, speaking uchun parts. section["hash"] —
+test ning kanonik JSON sha256 i; import bazadagi testni xuddi shu ko'rinishga
+keltirib hash ni solishtiradi va o'zgarmagan testni o'tkazib yuboradi.
+
+Import idempotent: mock slug, section nomi, savol/group/passage order, task/part
+raqami bo'yicha upsert qilinadi. Media fayllar (audio, rasmlar) bundle ga kirmaydi —
+faqat audio fayl nomi ko'chadi, fayllarning o'zi alohida nusxalanadi.
+"""
+import hashlib
+import json
+
+from django.db import transaction
+
+from listening import loader as listening_loader
+from listening.models import ListeningTest
+from reading import loader as reading_loader
+from reading.models import ReadingTest
+from speaking.models import SpeakingPart, SpeakingTest
+from writing.models import WritingTask, WritingTest
+
+from .catalog import invalidate_catalog
+from .loader import bulk_upsert, finish_load
+from .models import Mock, MockSection
+
+BUNDLE_FORMAT = "ieltszone-bundle"
+BUNDLE_VERSION = 1
+
+MOCK_FIELDS = ["title", "description", "is_active", "is_free", "price_uzs", "estimated_minutes"]
+
+
+class BundleError(Exception):
+    pass
+
+
+def content_hash(data) -> str:
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+# --- section testlari: dump (baza -> dict) va load (dict -> baza) ---
+
+def _dump_listening(test):
+    return {"title": test.title, "duration_seconds": test.duration_seconds, "audio": test.audio.name or "",
+            **listening_loader.dump_test(test)}
+
+
+def _dump_reading(test):
+    return {"title": test.title, "duration_seconds": test.duration_seconds, **reading_loader.dump_test(test)}
+
+
+def _dump_writing(test):
+    return {
+        "title": test.title,
+        "tasks": [
+            {"task_number": t.task_number, "prompt": t.prompt, "min_words": t.min_words}
+            for t in test.tasks.order_by("task_number")
+        ],
+    }
+
+
+def _dump_speaking(test):
+    return {
+        "title": test.title,
+        "parts": [
+            {"part_number": p.part_number, "prompt": p.prompt, "time_limit_seconds": p.time_limit_seconds}
+            for p in test.parts.order_by("part_number", "id")
+        ],
+    }
+
+
+def _save_fields(test, data, fields, changed=False):
+    for name in fields:
+        if name in data and getattr(test, name) != data[name]:
+            setattr(test, name, data[name])
+            changed = True
+    if test.pk is None or changed:
+        test.save()
+
+
+def _load_listening(test, data):
+    # audio faqat nomi o'zgarganda yoziladi — aks holda ingestion qayta boshlanib ketadi
+    audio_changed = data.get("audio", "") != (test.audio.name or "")
+    if audio_changed:
+        test.audio = data.get("audio", "")
+    _save_fields(test, data, ["title", "duration_seconds"], changed=audio_changed)
+    listening_loader.load_test(test, data, prune=True)
+    finish_load(ListeningTest, [test.id])
+
+
+def _load_reading(test, data):
+    _save_fields(test, data, ["title", "duration_seconds"])
+    reading_loader.load_test(test, data, prune=True)
+    finish_load(ReadingTest, [test.id])
+
+
+def _load_writing(test, data):
+    _save_fields(test, data, ["title"])
+    tasks = bulk_upsert(
+        WritingTask,
+        [WritingTask(test=test, task_number=t["task_number"], prompt=t.get("prompt", ""),
+                     min_words=t.get("min_words", 150)) for t in data.get("tasks", [])],
+        unique_fields=["test", "task_number"],
+        update_fields=["prompt", "min_words"],
+    )
+    WritingTask.objects.filter(test=test).exclude(id__in=[t.pk for t in tasks]).delete()
+
+
+def _load_speaking(test, data):
+    # SpeakingPart da unique kalit yo'q — qismlar qaytadan yoziladi (ularga javob bog'lanmagan)
+    _save_fields(test, data, ["title"])
+    SpeakingPart.objects.filter(test=test).delete()
+    SpeakingPart.objects.bulk_create([
+        SpeakingPart(test=test, part_number=p["part_number"], prompt=p.get("prompt", ""),
+                     time_limit_seconds=p.get("time_limit_seconds", 0))
+        for p in data.get("parts", [])
+    ])
+
+
+# section -> (test modeli, dump, load)
+SECTION_CODECS = {
+    "listening": (ListeningTest, _dump_listening, _load_listening),
+    "reading": (ReadingTest, _dump_reading, _load_reading),
+    "writing": (WritingTest, _dump_writing, _load_writing),
+    "speaking": (SpeakingTest, _dump_speaking, _load_speaking),
+}
+
+
+# --- export ---
+
+def export_mock(mock: Mock) -> dict:
+    sections = []
+    for section in mock.sections.order_by("order"):
+        model, dump, _ = SECTION_CODECS[section.section]
+        test = model.objects.filter(section=section).first()
+        data = dump(test) if test else None
+        sections.append({
+            "section": section.section,
+            "order": section.order,
+            "duration_seconds": section.duration_seconds,
+            "hash": content_hash(data) if data is not None else "",
+            "test": data,
+        })
+    return {"slug": mock.slug, **{name: getattr(mock, name) for name in MOCK_FIELDS}, "sections": sections}
+
+
+def iter_bundle(mocks):
+    """Bundle qatorlarini (yangi qator bilan) birma-bir beradi."""
+    yield json.dumps({"format": BUNDLE_FORMAT, "version": BUNDLE_VERSION}) + "\n"
+    for mock in mocks.order_by("id").iterator():
+        yield json.dumps(export_mock(mock), ensure_ascii=False) + "\n"
+
+
+# --- import ---
+
+def import_mock(data: dict) -> list:
+    """
+    Bitta mockni bitta tranzaksiyada upsert qiladi.
+    [(section, "created" | "updated" | "unchanged"), ...] qaytaradi.
+    """
+    results = []
+    with transaction.atomic():
+        mock, _ = Mock.objects.update_or_create(
+            slug=data["slug"], defaults={name: data[name] for name in MOCK_FIELDS if name in data}
+        )
+        for entry in data.get("sections", []):
+            name = entry["section"]
+            if name not in SECTION_CODECS:
+                raise BundleError(f"{mock.slug}: noma'lum section {name!r}")
+            section, _ = MockSection.objects.update_or_create(
+                mock=mock, section=name,
+                defaults={"order": entry["order"], "duration_seconds": entry.get("duration_seconds", 0)},
+            )
+            test_data = entry.get("test")
+            if test_data is None:
+                continue
+
+            digest = content_hash(test_data)
+            if entry.get("hash") and entry["hash"] != digest:
+                raise BundleError(f"{mock.slug}/{name}: hash mos kelmadi (fayl buzilgan)")
+
+            model, dump, load = SECTION_CODECS[name]
+            test = model.objects.filter(section=section).first()
+            if test is not None and content_hash(dump(test)) == digest:
+                results.append((name, "unchanged"))
+                continue
+            status = "updated" if test is not None else "created"
+            load(test or model(section=section), test_data)
+            results.append((name, status))
+    invalidate_catalog()
+    return results
+
+
+def read_bundle(lines):
+    """Header ni tekshiradi va mock dict larini birma-bir beradi."""
+    lines = iter(lines)
+    try:
+        header = json.loads(next(lines))
+    except (StopIteration, ValueError):
+        raise BundleError("bundle header topilmadi")
+    if header.get("format") != BUNDLE_FORMAT or header.get("version") != BUNDLE_VERSION:
+        raise BundleError(f"qo'llab-quvvatlanmaydigan bundle: {header}")
+    for number, line in enumerate(lines, start=2):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as exc:
+            raise BundleError(f"{number}-qator: {exc}")
@@ -0,0 +1,86 @@
+"""
+Mock katalogi keshi (mock_list / mock_detail).
+
+Katalog holati cache da: {"version": n, "updated_at": <unix ts>}. Mock, MockSection
+yoki savollar soni o'zgarsa (signals.py) versiya yangilanadi — keshlangan ro'yxat/detail
+kalitlari eskiradi, ETag/Last-Modified ham shu holatdan olinadi.
+
+Invalidatsiya cache orqali ishlaydi: bir nechta worker process bo'lsa default cache
+umumiy (redis/memcached) bo'lishi kerak, locmem da har process o'z holatini ko'radi.
+"""
+import time
+
+from django.core.cache import cache
+from django.db.models import Case, Count, OuterRef, Subquery, When
+from django.db.models.functions import Coalesce
+
+from listening.models import ListeningQuestion
+from reading.models import ReadingQuestion
+from speaking.models import SpeakingPart
+from writing.models import WritingTask
+
+from .models import Mock
+
+STATE_KEY = "mocks:catalog:state"
+CATALOG_TIMEOUT = 60 * 60
+
+
+def _count_by_section(model):
+    """model (savol/task/part) lar sonini MockSection bo'yicha korrelyatsiyalangan subquery."""
+    return Subquery(
+        model.objects
+        .filter(test__section=OuterRef("pk"))
+        .order_by()
+        .values("test__section")
+        .annotate(n=Count("pk"))
+        .values("n")[:1]
+    )
+
+
+def sections_with_counts(mock):
+    """Barcha sectionlar savollar soni bilan — section soniga bog'liq bo'lmagan bitta so'rov."""
+    questions_count = Case(
+        When(section="listening", then=_count_by_section(ListeningQuestion)),
+        When(section="reading", then=_count_by_section(ReadingQuestion)),
+        When(section="writing", then=_count_by_section(WritingTask)),
+        When(section="speaking", then=_count_by_section(SpeakingPart)),
+    )
+    return mock.sections.annotate(questions_count=Coalesce(questions_count, 0))
+
+
+def catalog_state() -> dict:
+    state = cache.get(STATE_KEY)
+    if state is None:
+        # cache bo'sh (restart): yangi holat; add() poygada birinchisini qoldiradi
+        cache.add(STATE_KEY, {"version": time.time_ns(), "updated_at": int(time.time())}, None)
+        state = cache.get(STATE_KEY)
+    return state
+
+
+def invalidate_catalog() -> None:
+    cache.set(STATE_KEY, {"version": time.time_ns(), "updated_at": int(time.time())}, None)
+
+
+def get_mock_list(version) -> list:
+    key = f"mocks:catalog:list:{version}"
+    mocks = cache.get(key)
+    if mocks is None:
+        mocks = list(Mock.objects.filter(is_active=True).order_by("-id"))
+        cache.set(key, mocks, CATALOG_TIMEOUT)
+    return mocks
+
+
+def get_mock_detail(slug: str, version):
+    """(mock, sections) yoki mock topilmasa None. Sectionlar savollar soni bilan."""
+    key = f"mocks:catalog:detail:{slug}:{version}"
+    detail = cache.get(key)
+    if detail is None:
+        mock = Mock.objects.filter(slug=slug, is_active=True).first()
+        if mock is None:
+            return None
+        sections = list(sections_with_counts(mock))
+        for s in sections:
+            s.duration_minutes = (s.duration_seconds // 60) if s.duration_seconds else None
+        detail = (mock, sections)
+        cache.set(key, detail, CATALOG_TIMEOUT)
+    return detail
@@ -0,0 +1,64 @@
+"""
+Test kontentini ommaviy yuklash uchun umumiy yordamchilar.
+
+Seed/import komandalari (seed_listening, seed_reading, import_bundle) har model uchun
+bitta bulk upsert qiladi: bulk_create(update_conflicts=True) unique_together bo'yicha
+mavjud qatorni yangilaydi. bulk_create signal yubormaydi — shuning uchun loader oxirida
+test content_version i va mock katalogi keshi qo'lda yangilanadi (finish_load).
+"""
+import time
+from dataclasses import dataclass, field
+
+from django.db.models import F
+
+
+def bulk_upsert(model, objs, unique_fields, update_fields, batch_size=500):
+    """
+    objs ni upsert qiladi va ularga pk qo'yadi. PostgreSQL/SQLite/MariaDB pk ni
+    RETURNING orqali qaytaradi; qaytarmagan backendda unique maydonlar bo'yicha o'qiladi.
+    """
+    if not objs:
+        return objs
+    model.objects.bulk_create(
+        objs,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=update_fields,
+    )
+    if any(obj.pk is None for obj in objs):
+        attnames = [model._meta.get_field(name).attname for name in unique_fields]
+        first = attnames[0]
+        ids = {
+            tuple(row[:-1]): row[-1]
+            for row in model.objects
+            .filter(**{f"{first}__in": {getattr(obj, first) for obj in objs}})
+            .values_list(*attnames, "pk")
+        }
+        for obj in objs:
+            obj.pk = ids[tuple(getattr(obj, name) for name in attnames)]
+    return objs
+
+
+def finish_load(test_model, test_ids) -> None:
+    """Yuklangan testlar keshlarini eskirtiradi (answer key, payload, katalog)."""
+    from .catalog import invalidate_catalog
+
+    test_model.objects.filter(id__in=test_ids).update(content_version=F("content_version") + 1)
+    invalidate_catalog()
+
+
+@dataclass
+class LoadStats:
+    tests: int = 0
+    rows: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    def add(self, rows: int) -> None:
+        self.tests += 1
+        self.rows += rows
+
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        rate = self.rows / elapsed if elapsed else 0
+        return f"{self.tests} tests, {self.rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)"
@@ -0,0 +1,36 @@
+import gzip
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mocks.bundle import iter_bundle
+from mocks.models import Mock
+
+
+class Command(BaseCommand):
+    help = "Export mocks (sections + listening/reading/writing/speaking content) to a JSONL bundle."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Bundle path (.jsonl or .jsonl.gz); '-' for stdout")
+        parser.add_argument("--slug", action="append", dest="slugs", help="Mock slug; repeat for several mocks")
+
+    def handle(self, *args, **opts):
+        mocks = Mock.objects.all()
+        if opts["slugs"]:
+            mocks = mocks.filter(slug__in=opts["slugs"])
+            missing = set(opts["slugs"]) - set(mocks.values_list("slug", flat=True))
+            if missing:
+                raise CommandError(f"Mock slug={sorted(missing)} not found.")
+
+        path = opts["output"]
+        if path == "-":
+            for line in iter_bundle(mocks):
+                self.stdout.write(line, ending="")
+            return
+
+        opener = gzip.open if path.endswith(".gz") else open
+        count = -1  # header qatori
+        with opener(path, "wt", encoding="utf-8") as out:
+            for line in iter_bundle(mocks):
+                out.write(line)
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} mocks to {path}."))
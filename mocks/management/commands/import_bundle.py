@@ -0,0 +1,42 @@
+import gzip
+import sys
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mocks.bundle import BundleError, import_mock, read_bundle
+
+
+class Command(BaseCommand):
+    help = "Import a JSONL mock bundle; idempotent, unchanged section tests are skipped by content hash."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Bundle path (.jsonl or .jsonl.gz); '-' for stdin")
+
+    def handle(self, *args, **opts):
+        path = opts["path"]
+        if path == "-":
+            self._import(sys.stdin)
+            return
+        opener = gzip.open if path.endswith(".gz") else open
+        try:
+            with opener(path, "rt", encoding="utf-8") as f:
+                self._import(f)
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+    def _import(self, lines):
+        totals = Counter()
+        try:
+            for data in read_bundle(lines):
+                results = import_mock(data)
+                totals.update(status for _, status in results)
+                report = ", ".join(f"{section}={status}" for section, status in results) or "no content"
+                self.stdout.write(f"{data['slug']}: {report}")
+        except BundleError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Import done: {totals['created']} created, {totals['updated']} updated, "
+            f"{totals['unchanged']} unchanged."
+        ))
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mocks', '0002_mock_created_at_mock_description_mock_is_free_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mockaccess',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='mock_access', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
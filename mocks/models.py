@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.utils.text import slugify
 
 
@@ -45,13 +46,24 @@ class MockSection(models.Model):
         return f"{self.mock.title} — {self.section}"
 
 
+class MockAccessQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(models.Q(expires_at__isnull=True) | models.Q(expires_at__gt=timezone.now()))
+
+
 class MockAccess(models.Model):
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="mock_access")
+    # user bo'yicha qidiruvni (user, mock) unique indeksi qoplaydi; u bitta qatorni
+    # topadi, expires_at shu qatorda tekshiriladi — qo'shimcha indeks kerak emas
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="mock_access", db_index=False
+    )
     mock = models.ForeignKey(Mock, on_delete=models.CASCADE, related_name="access_list")
 
     granted_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField(null=True, blank=True)
 
+    objects = MockAccessQuerySet.as_manager()
+
     class Meta:
         unique_together = ("user", "mock")
 
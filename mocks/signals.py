@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+
+from listening.models import ListeningQuestion, ListeningTest
+from reading.models import ReadingQuestion, ReadingTest
+from speaking.models import SpeakingPart, SpeakingTest
+from writing.models import WritingTask, WritingTest
+
+from .catalog import invalidate_catalog
+from .models import Mock, MockSection
+
+CATALOG_MODELS = [Mock, MockSection, ListeningTest, ReadingTest, WritingTest, SpeakingTest]
+# detail sahifadagi savollar soni faqat qo'shish/o'chirishda o'zgaradi
+COUNTED_MODELS = [ListeningQuestion, ReadingQuestion, WritingTask, SpeakingPart]
+
+
+def catalog_changed(sender, **kwargs):
+    invalidate_catalog()
+
+
+def count_changed(sender, created=True, **kwargs):
+    if created:
+        invalidate_catalog()
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(catalog_changed, sender=model)
+    post_delete.connect(catalog_changed, sender=model)
+
+for model in COUNTED_MODELS:
+    post_save.connect(count_changed, sender=model)
+    post_delete.connect(count_changed, sender=model)
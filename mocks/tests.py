@@ -1,3 +1,147 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from attempts.tests import make_mock
+from listening.models import ListeningQuestion, ListeningTest
+from mocks.bundle import content_hash, export_mock, import_mock
+from mocks.models import Mock, MockSection
+from reading.models import ReadingQuestion
+from speaking.models import SpeakingPart, SpeakingTest
+from writing.models import WritingTask, WritingTest
+
+
+class MockDetailTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.mock = make_mock(listening_questions=3, reading_questions=5)
+        writing = WritingTest.objects.create(section=MockSection.objects.get(mock=self.mock, section="writing"))
+        WritingTask.objects.create(test=writing, task_number=1, prompt="Task 1")
+        WritingTask.objects.create(test=writing, task_number=2, prompt="Task 2", min_words=250)
+        speaking_section = MockSection.objects.create(mock=self.mock, section="speaking", order=4)
+        SpeakingPart.objects.create(test=SpeakingTest.objects.create(section=speaking_section), part_number=1, prompt="P1")
+
+    def test_section_question_counts(self):
+        res = self.client.get(f"/mocks/{self.mock.slug}/")
+        counts = {s.section: s.questions_count for s in res.context["sections"]}
+        self.assertEqual(counts, {"listening": 3, "reading": 5, "writing": 2, "speaking": 1})
+
+    def test_section_without_test_counts_zero(self):
+        mock = Mock.objects.create(title="Empty", slug="empty", is_free=True)
+        MockSection.objects.create(mock=mock, section="reading", order=1)
+        res = self.client.get("/mocks/empty/")
+        self.assertEqual(res.context["sections"][0].questions_count, 0)
+
+    def test_query_count_is_constant(self):
+        small = Mock.objects.create(title="Small", slug="small", is_free=True)
+        MockSection.objects.create(mock=small, section="listening", order=1)
+
+        # mock, sections (sanoqlar bilan)
+        with self.assertNumQueries(2):
+            self.client.get("/mocks/small/")
+        with self.assertNumQueries(2):
+            self.client.get(f"/mocks/{self.mock.slug}/")
+        # keshdan
+        with self.assertNumQueries(0):
+            self.client.get(f"/mocks/{self.mock.slug}/")
+
+
+class CatalogConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.mock = make_mock()
+
+    def test_repeat_visit_gets_304(self):
+        res = self.client.get("/mocks/")
+        self.assertEqual(res.status_code, 200)
+        self.assertContains(res, self.mock.title)
+        self.assertIn("Last-Modified", res)
+        self.assertIn("Cookie", res["Vary"])
+
+        with self.assertNumQueries(0):
+            res = self.client.get("/mocks/", HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(res.status_code, 304)
+
+    def test_detail_etag_changes_on_section_save(self):
+        url = f"/mocks/{self.mock.slug}/"
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        section = MockSection.objects.get(mock=self.mock, section="reading")
+        section.duration_seconds = 60 * 45
+        section.save()
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertContains(res, "45 min")
+
+    def test_inactive_mock_disappears_from_cached_list(self):
+        self.client.get("/mocks/")
+        self.mock.is_active = False
+        self.mock.save()
+        self.assertNotContains(self.client.get("/mocks/"), self.mock.title)
+        self.assertEqual(self.client.get(f"/mocks/{self.mock.slug}/").status_code, 404)
+
+    def test_etag_depends_on_user(self):
+        etag = self.client.get("/mocks/")["ETag"]
+        self.client.force_login(get_user_model().objects.create_user("candidate", password="pass12345"))
+        self.assertEqual(self.client.get("/mocks/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class BundleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.mock = make_mock(slug="bundle", listening_questions=3, reading_questions=4)
+        writing = WritingTest.objects.create(section=MockSection.objects.get(mock=self.mock, section="writing"))
+        WritingTask.objects.create(test=writing, task_number=1, prompt="Task 1")
+        speaking_section = MockSection.objects.create(mock=self.mock, section="speaking", order=4)
+        SpeakingPart.objects.create(test=SpeakingTest.objects.create(section=speaking_section), part_number=1, prompt="P1")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "mocks.jsonl.gz")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_into_empty_database(self):
+        data = export_mock(self.mock)
+        self.mock.delete()
+
+        self.assertEqual(import_mock(data), [
+            ("listening", "created"), ("reading", "created"), ("writing", "created"), ("speaking", "created"),
+        ])
+        mock = Mock.objects.get(slug="bundle")
+        self.assertEqual(export_mock(mock), data)
+        self.assertEqual(ListeningTest.objects.get(section__mock=mock).audio.name, "listening_audio/test.mp3")
+
+    def test_reimport_skips_unchanged_and_updates_changed(self):
+        data = export_mock(self.mock)
+        self.assertEqual({status for _, status in import_mock(data)}, {"unchanged"})
+
+        reading = next(s for s in data["sections"] if s["section"] == "reading")
+        reading["test"]["questions"][0]["prompt"] = "Changed"
+        del reading["test"]["questions"][-1]
+        reading["hash"] = content_hash(reading["test"])
+        question = ReadingQuestion.objects.get(test__section__mock=self.mock, order=1)
+
+        results = dict(import_mock(data))
+        self.assertEqual(results["reading"], "updated")
+        self.assertEqual(results["listening"], "unchanged")
+        # savol o'sha qator (nomzod javoblari saqlanadi), ortiqchasi o'chirildi
+        question.refresh_from_db()
+        self.assertEqual(question.prompt, "Changed")
+        self.assertEqual(ReadingQuestion.objects.filter(test__section__mock=self.mock).count(), 3)
+
+    def test_commands_stream_gzip_bundle(self):
+        call_command("export_bundle", self.path, stdout=StringIO())
+        ListeningQuestion.objects.filter(test__section__mock=self.mock, order=2).update(prompt="Drifted")
+
+        out = StringIO()
+        call_command("import_bundle", self.path, stdout=out)
+        self.assertIn("bundle: listening=updated, reading=unchanged", out.getvalue())
+        self.assertIn("1 updated, 3 unchanged", out.getvalue())
+        self.assertEqual(ListeningQuestion.objects.get(test__section__mock=self.mock, order=2).prompt, "Q2")
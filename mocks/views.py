@@ -1,9 +1,17 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.http import Http404
 from django.shortcuts import render, get_object_or_404, redirect
 from django.utils import timezone
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
+from django.views.decorators.vary import vary_on_cookie
 from django.contrib.auth.decorators import login_required
 
+from .catalog import catalog_state, get_mock_detail, get_mock_list
 from .models import Mock, MockSection, MockAccess
+from attempts import answer_buffer, channel
+from attempts.context import enter_section, store_context
 from attempts.models import Attempt
 
 
@@ -12,40 +20,51 @@ def _has_access(user, mock: Mock) -> bool:
         return True
     if not user.is_authenticated:
         return False
-    return MockAccess.objects.filter(user=user, mock=mock).exists()
-
-
-def _section_questions_count(section: MockSection) -> int | None:
-    try:
-        if section.section == "listening" and hasattr(section, "listening_test"):
-            return section.listening_test.questions.count()
-        if section.section == "reading" and hasattr(section, "reading_test"):
-            return section.reading_test.questions.count()
-        if section.section == "writing" and hasattr(section, "writing_test"):
-            return section.writing_test.tasks.count()
-        if section.section == "speaking" and hasattr(section, "speaking_test"):
-            return section.speaking_test.parts.count()
-    except Exception:
+    return MockAccess.objects.filter(user=user, mock=mock).active().exists()
+
+
+def _user_tag(request) -> str:
+    return f"u{request.user.pk}" if request.user.is_authenticated else "anon"
+
+
+def _catalog_last_modified(request, *args, **kwargs):
+    return datetime.fromtimestamp(catalog_state()["updated_at"], tz=dt_timezone.utc)
+
+
+def _mock_list_etag(request):
+    return f'list-{catalog_state()["version"]}-{_user_tag(request)}'
+
+
+def _mock_detail_etag(request, slug):
+    version = catalog_state()["version"]
+    detail = get_mock_detail(slug, version)
+    if detail is None:
         return None
-    return None
+    access = int(_has_access(request.user, detail[0]))
+    return f"detail-{slug}-{version}-{_user_tag(request)}-{access}"
 
 
+# Katalog sahifalari: cache dan render, qayta kelganlarga 304 (ETag / Last-Modified)
 @require_http_methods(["GET"])
+@vary_on_cookie
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_mock_list_etag, last_modified_func=_catalog_last_modified)
 def mock_list(request):
-    mocks = Mock.objects.filter(is_active=True).order_by("-id")
+    mocks = get_mock_list(catalog_state()["version"])
     return render(request, "mocks/start_mock.html", {"mocks": mocks})
 
 
 @require_http_methods(["GET"])
+@vary_on_cookie
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_mock_detail_etag, last_modified_func=_catalog_last_modified)
 def mock_detail(request, slug):
-    mock = get_object_or_404(Mock, slug=slug, is_active=True)
+    detail = get_mock_detail(slug, catalog_state()["version"])
+    if detail is None:
+        raise Http404("Mock not found")
+    mock, sections = detail
     has_access = _has_access(request.user, mock)
 
-    sections = list(mock.sections.all())
-    for s in sections:
-        s.duration_minutes = (s.duration_seconds // 60) if s.duration_seconds else None
-        s.questions_count = _section_questions_count(s)
-
     return render(
         request,
         "mocks/mock_detail.html",
@@ -72,18 +91,19 @@ def mock_start(request, slug):
     # oldingi active attemptni terminate
     active_attempt_id = request.session.get("active_attempt_id")
     if active_attempt_id:
-        Attempt.objects.filter(id=active_attempt_id, status="in_progress").update(
+        answer_buffer.flush_attempt(active_attempt_id)
+        terminated = Attempt.objects.filter(id=active_attempt_id, status="in_progress").update(
             status="terminated",
             finished_at=timezone.now(),
         )
+        if terminated:
+            # eski attempt ochiq tabda bo'lsa, kanal stream uni darhol yopadi
+            channel.publish_status(active_attempt_id, "terminated")
 
-    attempt = Attempt.objects.create(
-        mock=mock,
-        status="in_progress",
-        current_section=start_section,
-    )
+    attempt = Attempt(mock=mock, user=request.user, status="in_progress")
+    enter_section(attempt, start_section)
+    attempt.save()
 
-    request.session["active_attempt_id"] = attempt.id
-    request.session["active_mock_slug"] = mock.slug
+    store_context(request, attempt, mock.slug)
 
     return redirect(f"/{start_section}/")
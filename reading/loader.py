@@ -0,0 +1,139 @@
+"""
+Reading test kontentini bulk yuklash (seed_reading, import_bundle).
+
+spec:
+    {"passages": [{"order": 1, "title": "...", "content": "<p>...</p>",
+                   "groups": [{"order": 1, "group_type": "tfng", "title": "...",
+                               "instructions": "...", "data": {}}, ...]}, ...],
+     "questions": [{"order": 1, "passage": 1, "group": 1, "qtype": "tfng", "prompt": "...",
+                    "instructions": "", "data": {}, "answer_key": {},
+                    "options": [["A", "..."], ...]}, ...]}
+
+question["passage"] — passage order, question["group"] — o'sha passage ichidagi group order.
+Har model bitta bulk upsert: test uchun 4 ta yozish so'rovi.
+"""
+from django.db import transaction
+
+from mocks.loader import bulk_upsert
+
+from .models import ReadingOption, ReadingPassage, ReadingQuestion, ReadingQuestionGroup
+
+PASSAGE_FIELDS = ["title", "content"]
+GROUP_FIELDS = ["title", "group_type", "instructions", "data"]
+QUESTION_FIELDS = ["passage", "group", "passage_order", "qtype", "prompt", "instructions", "data", "answer_key"]
+
+
+def load_test(test, spec: dict, replace: bool = False, prune: bool = False) -> int:
+    """
+    Bitta tranzaksiyada upsert qiladi, yozilgan qatorlar sonini qaytaradi.
+    replace=True: avval testning eski passage/group/savol/variantlari o'chiriladi.
+    prune=True: spec da yo'q passage/group/savol/variantlar o'chiriladi (qolgan
+    savollarning nomzod javoblari saqlanadi).
+    Keshlarni yangilash chaqiruvchida (mocks.loader.finish_load).
+    """
+    passages_spec = spec.get("passages", [])
+    with transaction.atomic():
+        if replace:
+            ReadingQuestion.objects.filter(test=test).delete()
+            ReadingPassage.objects.filter(test=test).delete()
+
+        passages = bulk_upsert(
+            ReadingPassage,
+            [
+                ReadingPassage(test=test, order=p["order"], title=p.get("title", ""), content=p.get("content", ""))
+                for p in passages_spec
+            ],
+            unique_fields=["test", "order"],
+            update_fields=PASSAGE_FIELDS,
+        )
+        passage_ids = {p.order: p.pk for p in passages}
+
+        groups = bulk_upsert(
+            ReadingQuestionGroup,
+            [
+                ReadingQuestionGroup(
+                    passage_id=passage_ids[p["order"]],
+                    order=g["order"],
+                    title=g.get("title", ""),
+                    group_type=g.get("group_type", "none"),
+                    instructions=g.get("instructions", ""),
+                    data=g.get("data") or {},
+                )
+                for p in passages_spec
+                for g in p.get("groups", [])
+            ],
+            unique_fields=["passage", "order"],
+            update_fields=GROUP_FIELDS,
+        )
+        group_ids = {(g.passage_id, g.order): g.pk for g in groups}
+
+        questions = []
+        for q in spec.get("questions", []):
+            passage_id = passage_ids[q["passage"]]
+            questions.append(ReadingQuestion(
+                test=test,
+                order=q["order"],
+                passage_id=passage_id,
+                group_id=group_ids.get((passage_id, q.get("group"))),
+                passage_order=q["passage"],
+                qtype=q["qtype"],
+                prompt=q.get("prompt", ""),
+                instructions=q.get("instructions", ""),
+                data=q.get("data") or {},
+                answer_key=q.get("answer_key") or {},
+            ))
+        questions = bulk_upsert(
+            ReadingQuestion, questions, unique_fields=["test", "order"], update_fields=QUESTION_FIELDS,
+        )
+        question_ids = {q.order: q.pk for q in questions}
+
+        options = bulk_upsert(
+            ReadingOption,
+            [
+                ReadingOption(question_id=question_ids[q["order"]], key=key, text=text)
+                for q in spec.get("questions", [])
+                for key, text in q.get("options", ())
+            ],
+            unique_fields=["question", "key"],
+            update_fields=["text"],
+        )
+
+        if prune:
+            ReadingOption.objects.filter(question__test=test).exclude(id__in=[o.pk for o in options]).delete()
+            ReadingQuestion.objects.filter(test=test).exclude(id__in=question_ids.values()).delete()
+            ReadingQuestionGroup.objects.filter(passage__test=test).exclude(id__in=group_ids.values()).delete()
+            ReadingPassage.objects.filter(test=test).exclude(id__in=passage_ids.values()).delete()
+
+    return len(passages) + len(groups) + len(questions) + len(options)
+
+
+def dump_test(test) -> dict:
+    """load_test ning teskarisi: testning passage/group/savol/variantlari spec ko'rinishida."""
+    passages = list(ReadingPassage.objects.filter(test=test).order_by("order"))
+    groups = {}
+    group_orders = {}
+    for g in ReadingQuestionGroup.objects.filter(passage__test=test).order_by("order"):
+        group_orders[g.id] = g.order
+        groups.setdefault(g.passage_id, []).append(
+            {"order": g.order, "group_type": g.group_type, "title": g.title,
+             "instructions": g.instructions, "data": g.data}
+        )
+    passage_orders = {p.id: p.order for p in passages}
+    options = {}
+    for question_id, key, text in (
+        ReadingOption.objects.filter(question__test=test).order_by("key").values_list("question_id", "key", "text")
+    ):
+        options.setdefault(question_id, []).append([key, text])
+
+    return {
+        "passages": [
+            {"order": p.order, "title": p.title, "content": p.content, "groups": groups.get(p.id, [])}
+            for p in passages
+        ],
+        "questions": [
+            {"order": q.order, "passage": passage_orders[q.passage_id], "group": group_orders.get(q.group_id),
+             "qtype": q.qtype, "prompt": q.prompt, "instructions": q.instructions, "data": q.data,
+             "answer_key": q.answer_key, "options": options.get(q.id, [])}
+            for q in ReadingQuestion.objects.filter(test=test).order_by("order")
+        ],
+    }
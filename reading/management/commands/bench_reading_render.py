@@ -0,0 +1,112 @@
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.test import RequestFactory, override_settings
+
+from attempts.models import Attempt
+from mocks.models import Mock, MockSection
+from reading.models import ReadingOption, ReadingPassage, ReadingQuestion, ReadingQuestionGroup, ReadingTest
+from reading.payload import PAYLOAD_TIMEOUT, get_payload
+
+
+class Rollback(Exception):
+    pass
+
+
+# o'lchov alohida bo'sh locmem keshda: ishlayotgan default keshga tegilmaydi
+BENCH_CACHES = {
+    **settings.CACHES,
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "bench-reading-render",
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark reading/test.html render time for a 40-question test with and without "
+        "the question fragment cache. Test data is created in a transaction and rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+
+    def handle(self, *args, **opts):
+        try:
+            with override_settings(CACHES=BENCH_CACHES), transaction.atomic():
+                self.run(opts["iterations"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def build_test(self):
+        mock = Mock.objects.create(title="Render benchmark", slug="render-benchmark-tmp")
+        section = MockSection.objects.create(mock=mock, section="reading", order=1, duration_seconds=3600)
+        test = ReadingTest.objects.create(section=section)
+
+        passages = [
+            ReadingPassage.objects.create(test=test, order=p, content="<p>Lorem ipsum.</p>" * 40)
+            for p in range(1, 4)
+        ]
+        kinds = ["tfng", "mcq_single", "short", "mcq_multi"]
+        groups = {}
+        for order in range(1, 41):
+            passage = passages[(order - 1) * 3 // 40]
+            qtype = kinds[(order - 1) // 3 % len(kinds)]
+            group_key = (passage.order, (order - 1) // 3)
+            if group_key not in groups:
+                groups[group_key] = ReadingQuestionGroup.objects.create(
+                    passage=passage, order=len(groups) + 1, group_type="mcq",
+                )
+            q = ReadingQuestion.objects.create(
+                test=test, passage=passage, group=groups[group_key], order=order,
+                passage_order=passage.order, qtype=qtype, prompt=f"Question {order} prompt text",
+            )
+            if qtype.startswith("mcq"):
+                ReadingOption.objects.bulk_create(
+                    ReadingOption(question=q, key=k, text=f"Option {k}") for k in "ABCDE"
+                )
+        attempt = Attempt.objects.create(mock=mock, current_section="reading")
+        test.refresh_from_db()
+        return test, attempt
+
+    def run(self, iterations):
+        test, attempt = self.build_test()
+        request = RequestFactory().get("/reading/")
+        request.user = AnonymousUser()
+        payload = get_payload(test)
+
+        def render(fragment_timeout):
+            context = {
+                "attempt": attempt,
+                "test": test,
+                "passages": payload,
+                "fragment_timeout": fragment_timeout,
+                "saved_answers": {},
+                "total_seconds": test.duration_seconds,
+            }
+            started = time.perf_counter()
+            render_to_string("reading/test.html", context, request=request)
+            return (time.perf_counter() - started) * 1000
+
+        render(0)  # template yuklanishi (warm-up)
+        before = [render(0) for _ in range(iterations)]  # timeout=0: fragment har safar qayta render
+        render(PAYLOAD_TIMEOUT)
+        after = [render(PAYLOAD_TIMEOUT) for _ in range(iterations)]
+
+        questions = ReadingQuestion.objects.filter(test=test).count()
+        self.stdout.write(f"reading/test.html, {questions} questions, {iterations} iterations")
+        for label, samples in (("uncached", before), ("fragment cache", after)):
+            self.stdout.write(
+                f"  {label:<15} median {statistics.median(samples):.3f} ms  "
+                f"p95 {sorted(samples)[int(len(samples) * 0.95) - 1]:.3f} ms"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"  speedup x{statistics.median(before) / statistics.median(after):.1f}"
+        ))
@@ -0,0 +1,95 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from mocks.loader import LoadStats, finish_load
+from reading.loader import load_test
+from reading.models import ReadingTest
+
+PARAGRAPHS = "".join(
+    f"<p><b>{label}</b> Lorem ipsum dolor sit amet, consectetur adipiscing elit. Sed do eiusmod tempor "
+    f"incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud exercitation.</p>"
+    for label in "ABCDEFG"
+)
+HEADINGS = ["i Early research", "ii A change of direction", "iii Public reaction", "iv Costs and benefits",
+            "v Unexpected results", "vi Looking ahead", "vii Practical applications"]
+
+# (passage, group order, group_type, savollar oralig'i, qtype, title, instructions)
+BLOCKS = [
+    (1, 1, "tfng", range(1, 8), "tfng", "Questions 1–7",
+     "Do the following statements agree with the information given in the passage?"),
+    (1, 2, "short", range(8, 14), "short", "Questions 8–13",
+     "Complete the sentences. Choose NO MORE THAN TWO WORDS from the passage."),
+    (2, 1, "headings", range(14, 20), "heading", "Questions 14–19",
+     "Choose the correct heading for each paragraph from the list of headings below."),
+    (2, 2, "mcq", range(20, 27), "mcq_single", "Questions 20–26", "Choose the correct letter, A, B, C or D."),
+    (3, 1, "tfng", range(27, 34), "yesno", "Questions 27–33",
+     "Do the following statements agree with the claims of the writer?"),
+    (3, 2, "mcq_multi", range(34, 36), "mcq_multi", "Questions 34–35", "Choose TWO letters, A–E."),
+    (3, 3, "matching", range(36, 41), "matching", "Questions 36–40",
+     "Match each statement with the correct person, A–E."),
+]
+
+
+def _question(order, passage, group, qtype):
+    q = {"order": order, "passage": passage, "group": group, "qtype": qtype,
+         "prompt": f"Statement {order} about the passage."}
+    if qtype == "tfng":
+        q["answer_key"] = {"value": ("True", "False", "Not Given")[order % 3]}
+    elif qtype == "yesno":
+        q["answer_key"] = {"value": ("Yes", "No", "Not Given")[order % 3]}
+    elif qtype == "short":
+        q.update(data={"max_words": 2}, answer_key={"values": [f"answer {order}"], "max_words": 2})
+    elif qtype == "heading":
+        q.update(prompt=f"Paragraph {'ABCDEFG'[order - 14]}", answer_key={"value": HEADINGS[order - 14].split()[0]})
+    elif qtype == "mcq_single":
+        q.update(answer_key={"value": "ABCD"[order % 4]}, options=[[k, f"Option {k}"] for k in "ABCD"])
+    elif qtype == "mcq_multi":
+        q.update(answer_key={"values": ["A", "C"]}, options=[[k, f"Option {k}"] for k in "ABCDE"])
+    else:
+        q.update(data={"pool": list("ABCDE")}, answer_key={"value": "ABCDE"[order % 5]})
+    return q
+
+
+def sample_spec() -> dict:
+    """40 savollik, 3 passage li namunaviy reading (reading.loader formatida)."""
+    passages = {
+        order: {"order": order, "title": f"Passage {order}", "content": PARAGRAPHS, "groups": []}
+        for order in (1, 2, 3)
+    }
+    questions = []
+    for passage, group, group_type, orders, qtype, title, instructions in BLOCKS:
+        data = {"headings": HEADINGS} if group_type == "headings" else {}
+        passages[passage]["groups"].append({
+            "order": group, "group_type": group_type, "title": title,
+            "instructions": instructions, "data": data,
+        })
+        questions += [_question(order, passage, group, qtype) for order in orders]
+    return {"passages": list(passages.values()), "questions": questions}
+
+
+class Command(BaseCommand):
+    help = "Seed IELTS-style Reading (3 passages, 40 questions) for one or many ReadingTests."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--test-id", type=int, action="append", dest="test_ids",
+                            help="ReadingTest ID; repeat for several tests")
+        parser.add_argument("--all", action="store_true", help="Seed every ReadingTest")
+        parser.add_argument("--force", action="store_true", help="Delete existing passages/questions for these tests first")
+
+    def handle(self, *args, **opts):
+        if opts["all"]:
+            tests = list(ReadingTest.objects.order_by("id"))
+        elif opts["test_ids"]:
+            tests = list(ReadingTest.objects.filter(id__in=opts["test_ids"]).order_by("id"))
+            missing = set(opts["test_ids"]) - {t.id for t in tests}
+            if missing:
+                raise CommandError(f"ReadingTest id={sorted(missing)} not found.")
+        else:
+            raise CommandError("Pass --test-id ID (repeatable) or --all.")
+
+        spec = sample_spec()
+        stats = LoadStats()
+        for test in tests:
+            stats.add(load_test(test, spec, replace=opts["force"]))
+        finish_load(ReadingTest, [t.id for t in tests])
+
+        self.stdout.write(self.style.SUCCESS(f"Seed done: {stats.summary()}."))
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reading', '0002_readingtest_duration_seconds_readingpassage_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='readingtest',
+            name='content_version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
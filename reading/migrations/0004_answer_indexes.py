@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attempts', '0003_in_progress_index'),
+        ('reading', '0003_test_content_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='readingattemptanswer',
+            name='attempt',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reading_answers', to='attempts.attempt'),
+        ),
+    ]
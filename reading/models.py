@@ -12,6 +12,8 @@ class ReadingTest(models.Model):
     )
     title = models.CharField(max_length=120, blank=True)
     duration_seconds = models.PositiveIntegerField(default=3600)  # 60 min
+    # kontent (passage/group/savol/variant) o'zgarganda oshadi (signals.py) — keshlar shu bo'yicha yangilanadi
+    content_version = models.PositiveIntegerField(default=1, editable=False)
 
     def __str__(self):
         return f"Reading — {self.section.mock.title}"
@@ -146,7 +148,9 @@ class ReadingOption(models.Model):
 from attempts.models import Attempt
 
 class ReadingAttemptAnswer(models.Model):
-    attempt = models.ForeignKey(Attempt, on_delete=models.CASCADE, related_name="reading_answers")
+    # alohida attempt indeksi kerak emas: (attempt, question) unique indeksi attempt bo'yicha
+    # qidiruvni ham qoplaydi, autosave upsert har yozishda bitta indeksni kam yangilaydi
+    attempt = models.ForeignKey(Attempt, on_delete=models.CASCADE, related_name="reading_answers", db_index=False)
     question = models.ForeignKey(ReadingQuestion, on_delete=models.CASCADE, related_name="attempt_answers")
     response = models.JSONField(default=dict, blank=True)  # {"value":...} or {"values":[...]} or {"text":...}
     created_at = models.DateTimeField(auto_now_add=True)
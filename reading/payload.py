@@ -0,0 +1,64 @@
+"""
+Reading sahifasi uchun oldindan serializatsiya qilingan test kontenti
+(passage -> group -> savol -> variant). listening/payload.py bilan bir xil:
+kalit test.content_version bo'yicha, admin saqlasa versiya oshadi.
+"""
+import json
+
+from django.core.cache import cache
+
+from .models import ReadingPassage
+
+PAYLOAD_TIMEOUT = 60 * 60 * 24
+
+
+def payload_key(test) -> str:
+    return f"reading:payload:{test.id}:v{test.content_version}"
+
+
+def build_payload(test) -> list:
+    passages = (
+        ReadingPassage.objects
+        .filter(test=test)
+        .prefetch_related("groups__questions__options")
+        .order_by("order")
+    )
+    return [
+        {
+            "id": p.id,
+            "order": p.order,
+            "title": p.title,
+            "content": p.content,
+            "groups": [
+                {
+                    "id": g.id,
+                    "order": g.order,
+                    "title": g.title,
+                    "group_type": g.group_type,
+                    "group_type_display": g.get_group_type_display(),
+                    "instructions": g.instructions,
+                    "questions": [
+                        {
+                            "id": q.id,
+                            "order": q.order,
+                            "qtype": q.qtype,
+                            "prompt": q.prompt,
+                            "options": [{"key": o.key, "text": o.text} for o in q.options.all()],
+                        }
+                        for q in g.questions.all()
+                    ],
+                }
+                for g in p.groups.all()
+            ],
+        }
+        for p in passages
+    ]
+
+
+def get_payload(test) -> list:
+    key = payload_key(test)
+    raw = cache.get(key)
+    if raw is None:
+        raw = json.dumps(build_payload(test), separators=(",", ":"))
+        cache.set(key, raw, PAYLOAD_TIMEOUT)
+    return json.loads(raw)
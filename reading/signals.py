@@ -0,0 +1,30 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ReadingOption, ReadingPassage, ReadingQuestion, ReadingQuestionGroup, ReadingTest
+
+
+def bump_content_version(**filters):
+    """Test kontenti o'zgardi — keshlangan answer key va payloadlar eskiradi."""
+    ReadingTest.objects.filter(**filters).update(content_version=F("content_version") + 1)
+
+
+@receiver([post_save, post_delete], sender=ReadingPassage)
+def passage_changed(sender, instance, **kwargs):
+    bump_content_version(id=instance.test_id)
+
+
+@receiver([post_save, post_delete], sender=ReadingQuestionGroup)
+def group_changed(sender, instance, **kwargs):
+    bump_content_version(passages__id=instance.passage_id)
+
+
+@receiver([post_save, post_delete], sender=ReadingQuestion)
+def question_changed(sender, instance, **kwargs):
+    bump_content_version(id=instance.test_id)
+
+
+@receiver([post_save, post_delete], sender=ReadingOption)
+def option_changed(sender, instance, **kwargs):
+    bump_content_version(questions__id=instance.question_id)
@@ -1,3 +1,69 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from attempts.models import Attempt
+from attempts.tests import make_mock
+from reading.loader import load_test
+from reading.management.commands import seed_reading
+from reading.models import ReadingOption, ReadingPassage, ReadingQuestion, ReadingQuestionGroup, ReadingTest
+
+
+class ReadingPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.mock = make_mock()
+        self.test = ReadingTest.objects.get(section__mock=self.mock)
+        self.passage = ReadingPassage.objects.get(test=self.test)
+        group = ReadingQuestionGroup.objects.create(passage=self.passage, order=1, group_type="mcq")
+        ReadingQuestion.objects.filter(test=self.test).update(group=group)
+        for q in ReadingQuestion.objects.filter(test=self.test):
+            ReadingOption.objects.create(question=q, key="B", text=f"Option for {q.order}")
+
+        user = get_user_model().objects.create_user("candidate", password="pass12345")
+        self.client.force_login(user)
+        attempt = Attempt.objects.create(mock=self.mock, current_section="reading")
+        session = self.client.session
+        session["active_attempt_id"] = attempt.id
+        session.save()
+
+    def test_hot_cache_renders_without_content_queries(self):
+        self.client.get("/reading/")
+        # user, test (+mock), saqlangan javoblar
+        with self.assertNumQueries(3):
+            res = self.client.get("/reading/")
+        self.assertContains(res, "Multiple choice")
+        self.assertContains(res, "Option for 3")
+
+    def test_passage_edit_invalidates_payload(self):
+        self.client.get("/reading/")
+        self.passage.content = "<p>Updated passage</p>"
+        self.passage.save()
+        self.assertContains(self.client.get("/reading/"), "Updated passage")
+
+
+class SeedReadingTests(TestCase):
+    def test_command_seeds_passages_groups_and_questions(self):
+        tests = [ReadingTest.objects.get(section__mock=make_mock(slug=f"seed-{i}", reading_questions=0))
+                 for i in range(2)]
+        ReadingPassage.objects.filter(test__in=tests).delete()
+        out = StringIO()
+        call_command("seed_reading", "--test-id", str(tests[0].id), "--test-id", str(tests[1].id), stdout=out)
+        self.assertIn("2 tests", out.getvalue())
+
+        test = tests[1]
+        self.assertEqual(test.passages.count(), 3)
+        self.assertEqual(test.questions.count(), 40)
+        q = ReadingQuestion.objects.get(test=test, order=20)
+        self.assertEqual((q.passage.order, q.group.order, q.qtype), (2, 2, "mcq_single"))
+        self.assertEqual(q.options.count(), 4)
+
+    def test_bulk_load_is_a_few_queries_per_test(self):
+        test = ReadingTest.objects.get(section__mock=make_mock(reading_questions=0))
+        ReadingPassage.objects.filter(test=test).delete()
+        # savepoint + passage/group/savol/variant upsert + release
+        with self.assertNumQueries(6):
+            load_test(test, seed_reading.sample_spec())
@@ -1,9 +1,24 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# ASYNC_VIEWS (ASGI profili): autosave/kanal/submit/terminate async variantlari
+if settings.ASYNC_VIEWS:
+    save_answers, channel_save, submit, terminate = (
+        views.reading_save_answers_async, views.reading_channel_save_answers_async,
+        views.reading_submit_async, views.reading_terminate_async,
+    )
+else:
+    save_answers, channel_save, submit, terminate = (
+        views.reading_save_answers, views.reading_channel_save_answers,
+        views.reading_submit, views.reading_terminate,
+    )
+
 urlpatterns = [
     path("", views.reading_page, name="reading_page"),
     path("save-answer/", views.reading_save_answer, name="reading_save_answer"),
-    path("submit/", views.reading_submit, name="reading_submit"),
-    path("terminate/", views.reading_terminate, name="reading_terminate"),
+    path("save-answers/", save_answers, name="reading_save_answers"),
+    path("channel/save-answers/", channel_save, name="reading_channel_save_answers"),
+    path("submit/", submit, name="reading_submit"),
+    path("terminate/", terminate, name="reading_terminate"),
 ]
@@ -1,15 +1,23 @@
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, HttpResponseForbidden
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST, require_http_methods
 
-from attempts.models import Attempt
-from mocks.models import MockSection
-from .models import (
-    ReadingTest, ReadingPassage, ReadingQuestionGroup,
-    ReadingQuestion, ReadingAttemptAnswer
+from attempts import answer_buffer
+from attempts.channel import channel_token_required, issue_token
+from attempts.answer_keys import aanswer_key_for_test_id, answer_key_for_test_id
+from attempts.answers import astore_answers, load_answers, parse_answer_batch, store_answers
+from attempts.context import (
+    aadvance_section, advance_section, astore_context, attempt_required, get_context, refresh_context, section_url,
+    store_context,
 )
+from attempts.models import Attempt
+from attempts.scoring import agrade_attempt, grade_attempt
+from .models import ReadingTest
+from .payload import PAYLOAD_TIMEOUT, get_payload
 
 def _get_active_attempt(request):
     attempt_id = request.session.get("active_attempt_id")
@@ -17,10 +25,6 @@ def _get_active_attempt(request):
         return None
     return Attempt.objects.select_related("mock").filter(id=attempt_id).first()
 
-def _get_reading_test(attempt):
-    section = get_object_or_404(MockSection, mock=attempt.mock, section="reading")
-    return get_object_or_404(ReadingTest, section=section)
-
 def _ensure_attempt_ok(request):
     attempt = _get_active_attempt(request)
     if not attempt:
@@ -34,31 +38,30 @@ def _ensure_attempt_ok(request):
 @login_required
 @require_http_methods(["GET"])
 def reading_page(request):
-    attempt = _get_active_attempt(request)
-    if not attempt:
+    ctx = get_context(request)
+    if not ctx:
         return redirect("mock_list")
-    if attempt.status != "in_progress":
-        return redirect("mock_detail", slug=attempt.mock.slug)
-    if attempt.current_section != "reading":
-        return redirect("mock_detail", slug=attempt.mock.slug)
-
-    test = _get_reading_test(attempt)
+    ctx = refresh_context(request, ctx)
+    if ctx.status != "in_progress":
+        return redirect("mock_detail", slug=ctx.mock_slug)
+    if ctx.current_section != "reading":
+        return redirect("mock_detail", slug=ctx.mock_slug)
 
-    passages = (
-        ReadingPassage.objects
-        .filter(test=test)
-        .prefetch_related("groups__questions__options")
-        .order_by("order")
-    )
+    test = get_object_or_404(ReadingTest.objects.select_related("section__mock"), id=ctx.test_id)
 
     return render(request, "reading/test.html", {
-        "attempt": attempt,
+        "mock": test.section.mock,
         "test": test,
-        "passages": passages,
-        "total_seconds": test.duration_seconds,
+        # fragment keshi issiq bo'lsa payload umuman o'qilmaydi
+        "passages": SimpleLazyObject(lambda: get_payload(test)),
+        "fragment_timeout": PAYLOAD_TIMEOUT,
+        "saved_answers": load_answers("reading", ctx.attempt_id),
+        # qolgan vaqt server deadline bo'yicha (sahifa yangilansa taymer qaytadan boshlanmaydi)
+        "total_seconds": ctx.remaining_seconds(test.duration_seconds),
+        "channel_token": issue_token(ctx),
     })
 
-def _normalize_response(q: ReadingQuestion, raw_value: str) -> dict:
+def _normalize_response(q, raw_value: str) -> dict:
     raw_value = (raw_value or "").strip()
 
     if q.qtype in ("mcq_multi",):
@@ -70,30 +73,93 @@ def _normalize_response(q: ReadingQuestion, raw_value: str) -> dict:
 
     return {"value": raw_value}
 
-@login_required
+@attempt_required("reading")
 @require_POST
 def reading_save_answer(request):
-    attempt = _ensure_attempt_ok(request)
-    if not attempt:
-        return HttpResponseForbidden()
-
-    test = _get_reading_test(attempt)
+    ctx = request.attempt_ctx
 
     qid = request.POST.get("question_id")
     value = request.POST.get("value", "")
     if not qid:
         return JsonResponse({"ok": False, "error": "question_id required"}, status=400)
 
-    question = get_object_or_404(ReadingQuestion, id=qid, test=test)
+    try:
+        question = answer_key_for_test_id("reading", ctx.test_id).questions[int(qid)]
+    except (KeyError, ValueError):
+        raise Http404
     response = _normalize_response(question, value)
 
-    ReadingAttemptAnswer.objects.update_or_create(
-        attempt=attempt,
-        question=question,
-        defaults={"response": response},
-    )
+    store_answers("reading", ctx.attempt_id, {question.qid: response})
     return JsonResponse({"ok": True})
 
+@attempt_required("reading")
+@require_POST
+def reading_save_answers(request):
+    """Batch autosave (listening_save_answers bilan bir xil protokol)."""
+    return _save_batch(request)
+
+@attempt_required("reading")
+@require_POST
+async def reading_save_answers_async(request):
+    """reading_save_answers ning async varianti (ASYNC_VIEWS)."""
+    return await _asave_batch(request)
+
+@csrf_exempt
+@channel_token_required("reading")
+@require_POST
+def reading_channel_save_answers(request):
+    """
+    Exam kanali orqali autosave (attempts/channel.py): attempt X-Attempt-Token dan,
+    sessiya, user va CSRF o'qilmaydi. Bo'sh batch — heartbeat.
+    """
+    return _save_batch(request)
+
+@csrf_exempt
+@channel_token_required("reading")
+@require_POST
+async def reading_channel_save_answers_async(request):
+    return await _asave_batch(request)
+
+def _save_batch(request):
+    ctx = request.attempt_ctx
+
+    latest = parse_answer_batch(request.body)
+    if latest is None:
+        return JsonResponse({"ok": False, "error": "invalid batch"}, status=400)
+
+    key = answer_key_for_test_id("reading", ctx.test_id)
+    answers, rejected = _validate_batch(key, latest)
+    if answers:
+        store_answers("reading", ctx.attempt_id, answers)
+    return _batch_saved(latest, answers, rejected)
+
+async def _asave_batch(request):
+    ctx = request.attempt_ctx
+
+    latest = parse_answer_batch(request.body)
+    if latest is None:
+        return JsonResponse({"ok": False, "error": "invalid batch"}, status=400)
+
+    key = await aanswer_key_for_test_id("reading", ctx.test_id)
+    answers, rejected = _validate_batch(key, latest)
+    if answers:
+        await astore_answers("reading", ctx.attempt_id, answers)
+    return _batch_saved(latest, answers, rejected)
+
+def _validate_batch(key, latest):
+    answers, rejected = {}, []
+    for qid, (seq, value) in latest.items():
+        q = key.questions.get(qid)
+        if q is None:
+            rejected.append(qid)
+            continue
+        answers[qid] = _normalize_response(q, value)
+    return answers, rejected
+
+def _batch_saved(latest, answers, rejected):
+    ack = max((seq for seq, _ in latest.values()), default=0)
+    return JsonResponse({"ok": True, "saved": len(answers), "rejected": rejected, "ack": ack})
+
 @login_required
 @require_POST
 def reading_submit(request):
@@ -101,9 +167,12 @@ def reading_submit(request):
     if not attempt:
         return JsonResponse({"ok": False, "redirect": "/mocks/"}, status=400)
 
-    attempt.current_section = "writing"
-    attempt.save(update_fields=["current_section"])
-    return JsonResponse({"ok": True, "redirect": "/writing/"})
+    # o'tishni yutgan so'rov baholaydi (parallel submit/sweeper ikki marta baholamaydi)
+    if advance_section(attempt, "reading", "writing"):
+        answer_buffer.flush_attempt(attempt.id, ["reading"])
+        grade_attempt(attempt, "reading")
+    store_context(request, attempt)
+    return JsonResponse({"ok": True, "redirect": section_url(attempt)})
 
 @login_required
 @require_POST
@@ -112,9 +181,48 @@ def reading_terminate(request):
     if not attempt:
         return JsonResponse({"ok": False, "redirect": "/mocks/"}, status=400)
 
+    answer_buffer.flush_attempt(attempt.id)
     if attempt.status == "in_progress":
         attempt.status = "terminated"
         attempt.finished_at = timezone.now()
         attempt.save(update_fields=["status", "finished_at"])
+    store_context(request, attempt)
+
+    return JsonResponse({"ok": True, "redirect": f"/mocks/{attempt.mock.slug}/"})
+
+async def _aget_active_attempt(request):
+    attempt_id = await request.session.aget("active_attempt_id")
+    if not attempt_id:
+        return None
+    return await Attempt.objects.select_related("mock").filter(id=attempt_id).afirst()
+
+@login_required
+@require_POST
+async def reading_submit_async(request):
+    """reading_submit ning async varianti (ASYNC_VIEWS)."""
+    attempt = await _aget_active_attempt(request)
+    if not attempt or attempt.status != "in_progress" or attempt.current_section != "reading":
+        return JsonResponse({"ok": False, "redirect": "/mocks/"}, status=400)
+
+    if await aadvance_section(attempt, "reading", "writing"):
+        await answer_buffer.aflush_attempt(attempt.id, ["reading"])
+        await agrade_attempt(attempt, "reading")
+    await astore_context(request, attempt)
+    return JsonResponse({"ok": True, "redirect": section_url(attempt)})
+
+@login_required
+@require_POST
+async def reading_terminate_async(request):
+    """reading_terminate ning async varianti (ASYNC_VIEWS)."""
+    attempt = await _aget_active_attempt(request)
+    if not attempt:
+        return JsonResponse({"ok": False, "redirect": "/mocks/"}, status=400)
+
+    await answer_buffer.aflush_attempt(attempt.id)
+    if attempt.status == "in_progress":
+        attempt.status = "terminated"
+        attempt.finished_at = timezone.now()
+        await attempt.asave(update_fields=["status", "finished_at"])
+    await astore_context(request, attempt)
 
     return JsonResponse({"ok": True, "redirect": f"/mocks/{attempt.mock.slug}/"})
@@ -0,0 +1,86 @@
+// Autosave: o'zgarishlar navbatga yig'iladi va FLUSH_MS da bir marta batch bo'lib yuboriladi.
+// Listening va reading sahifalari uchun umumiy (save-answers/ endpointlari bilan bir xil protokol).
+// options.token berilsa exam kanali ishlatiladi: options.channelSaveUrl ga X-Attempt-Token bilan
+// (sessiya/CSRF siz), jimlikda HEARTBEAT_MS da bo'sh batch (heartbeat); 409 — holat o'zgargan,
+// options.onConflict(state) chaqiriladi.
+// Bir vaqtda bitta so'rov: keyingi batch oldingisi tugagach yuboriladi (eski batch yangisini
+// ustidan yozmaydi). Tarmoq xatosi va 5xx da batch qayta navbatga qo'yiladi; boshqa 4xx
+// (403 — vaqt tugagan/ruxsat yo'q, 400) options.onError(status, data) ga beriladi.
+window.createAutosave = function(saveUrl, csrfToken, options) {
+  const FLUSH_MS = 1500;
+  const HEARTBEAT_MS = 30000;
+  options = options || {};
+  const url = options.token ? options.channelSaveUrl : saveUrl;
+  const headers = options.token
+    ? { "X-Attempt-Token": options.token, "Content-Type": "application/json" }
+    : { "X-CSRFToken": csrfToken, "Content-Type": "application/json" };
+  const pending = new Map();
+  let clientSeq = 0;
+  let flushTimer = null;
+  let inFlight = null;
+  let lastSent = Date.now();
+
+  function post(answers, keepalive) {
+    lastSent = Date.now();
+    return fetch(url, {
+      method: "POST",
+      keepalive: !!keepalive,
+      headers,
+      body: JSON.stringify({answers})
+    });
+  }
+
+  function schedule() {
+    if(!flushTimer) flushTimer = setTimeout(flush, FLUSH_MS);
+  }
+
+  function requeue(answers) {
+    // yangiroq qiymat kelmagan bo'lsa qayta navbatga qo'yamiz
+    answers.forEach(a => {
+      if(!pending.has(a.question_id)) pending.set(a.question_id, {value: a.value, seq: a.client_seq});
+    });
+    schedule();
+  }
+
+  function flush(keepalive) {
+    clearTimeout(flushTimer);
+    flushTimer = null;
+    if(inFlight) return inFlight.then(() => flush(keepalive));
+    if(!pending.size) return Promise.resolve();
+
+    const answers = Array.from(pending, ([qid, a]) => ({question_id: qid, value: a.value, client_seq: a.seq}));
+    pending.clear();
+
+    inFlight = post(answers, keepalive)
+      .then((res) => {
+        if(res.ok) return;
+        if(res.status >= 500) { requeue(answers); return; }
+        return res.json().catch(() => ({})).then((data) => {
+          if(res.status === 409 && options.onConflict) options.onConflict(data.state);
+          else if(options.onError) options.onError(res.status, data);
+        });
+      })
+      .catch(() => requeue(answers))
+      .finally(() => { inFlight = null; });
+    return inFlight;
+  }
+
+  function save(qid, value) {
+    pending.set(qid, {value, seq: ++clientSeq});
+    schedule();
+  }
+
+  if(options.token) {
+    setInterval(() => {
+      if(!pending.size && !inFlight && Date.now() - lastSent >= HEARTBEAT_MS) {
+        post([]).then((res) => {
+          if(res.status === 409 && options.onConflict) res.json().then((data) => options.onConflict(data.state));
+        }).catch(() => {});
+      }
+    }, HEARTBEAT_MS);
+  }
+
+  window.addEventListener("pagehide", () => flush(true));
+
+  return {save, flush};
+};
@@ -0,0 +1,12 @@
+// Exam kanali (attempts/channel.py): server SSE orqali holat, taymer va "time up" ni yuboradi.
+// ASGI da ulanish ochiq turadi; WSGI da server har safar bitta snapshot yuborib yopadi va
+// EventSource "retry" bo'yicha qayta ulanadi. Handlerlar: onState, onTick, onTimeUp.
+window.openExamChannel = function(url, handlers) {
+  if(!url || !window.EventSource) return null;
+  const source = new EventSource(url);
+  const on = (name, fn) => source.addEventListener(name, (e) => { if(fn) fn(JSON.parse(e.data)); });
+  on("state", handlers.onState);
+  on("tick", handlers.onTick);
+  on("time_up", handlers.onTimeUp);
+  return source;
+};
@@ -1,91 +1,149 @@
-document.addEventListener("DOMContentLoaded", function() {
-    const audio = document.getElementById("mainAudio");
-    const checkAudio = document.getElementById("checkAudio");
-    const overlay = document.getElementById("startOverlay");
-    const content = document.getElementById("listeningContent");
-    const groups = Array.from(document.querySelectorAll(".listening-group"));
-    
-    let currentStep = 1;
-    let timeRemaining = TOTAL_TIME;
-    let testStarted = false;
-
-    // 1. START TEST
-    document.getElementById("btnStart").onclick = () => {
-        checkAudio.pause();
-        overlay.style.display = "none";
-        content.style.display = "block";
-        testStarted = true;
-        audio.play();
-        startTimer();
-    };
-
-    // 2. TIMER LOGIC
-    function startTimer() {
-        const timerText = document.getElementById("timerText");
-        const interval = setInterval(() => {
-            if (timeRemaining <= 0) {
-                clearInterval(interval);
-                finishTest();
-            }
-            timeRemaining--;
-            const m = Math.floor(timeRemaining / 60);
-            const s = timeRemaining % 60;
-            timerText.textContent = `${String(m).padStart(2, '0')}:${String(s).padStart(2, '0')}`;
-        }, 1000);
+// Listening test sahifasi. Konfiguratsiya #listeningApp data-* atributlarida (templates/listening/test.html).
+(function(){
+  const app = document.getElementById("listeningApp");
+  const cfg = app.dataset;
+  const TOTAL = Number(cfg.totalSeconds);
+
+  const overlay = document.getElementById("startOverlay");
+  const btnStart = document.getElementById("btnStart");
+  const content = document.getElementById("listeningContent");
+  const timerText = document.getElementById("timerText");
+  const checkAudio = document.getElementById("checkAudio");
+  const audio = document.getElementById("mainAudio");
+  const parts = Array.from(document.querySelectorAll(".listening-part"));
+  const partLabel = document.getElementById("partLabel");
+  const btnPrev = document.getElementById("btnPrev");
+  const btnNext = document.getElementById("btnNext");
+  const btnFinish = document.getElementById("btnFinish");
+  document.getElementById("partTotal").textContent = parts.length;
+
+  let time = TOTAL;
+  let interval = null;
+  let testStarted = false;
+  let allowEnd = false;
+  let step = 1;
+  let lastGoodTime = 0;
+
+  // holat serverda o'zgargan (submit boshqa tabda, sweeper, proktor): sahifa view i yo'naltiradi
+  function leave(state){
+    if(state && state.status === "in_progress" && state.section === "listening") return;
+    allowEnd = true;
+    clearInterval(interval);
+    audio.pause();
+    window.location.href = "/listening/";
+  }
+
+  const saveStatus = document.getElementById("saveStatus");
+  const autosave = window.createAutosave(cfg.saveUrl, cfg.csrf, {
+    token: cfg.channelToken, channelSaveUrl: cfg.channelSaveUrl, onConflict: leave,
+    // 403: vaqt tugagan yoki attempt yopilgan — sahifa view i yo'naltiradi
+    onError: (status, data) => {
+      if(status === 403) leave(null);
+      else saveStatus.textContent = "Saqlanmadi: " + (data.error || status);
+    },
+  });
+
+  window.openExamChannel(cfg.channelUrl, {
+    onState: leave,
+    // server bo'yicha qolgan vaqt: klient taymeri shunga to'g'rilanadi
+    onTick: (t) => { if(t.remaining !== null){ time = t.remaining; timerText.textContent = fmt(time); } },
+    onTimeUp: () => finishTest(true),
+  });
+
+  function fmt(s){
+    return Math.floor(s/60).toString().padStart(2,'0') + ":" + (s%60).toString().padStart(2,'0');
+  }
+  timerText.textContent = fmt(time);
+
+  window.handleInputSave = (el) => {
+    const qid = el.closest('.options-container').dataset.qid;
+    autosave.save(qid, el.value);
+  };
+
+  window.handleOptionSave = (el) => {
+    const container = el.closest('.options-container');
+    const qid = container.dataset.qid;
+    const type = container.dataset.qtype;
+
+    if(type !== 'mcq_multi' && el.tagName !== 'SELECT') {
+      container.querySelectorAll('.opt-item').forEach(l => l.classList.remove('active'));
     }
 
-    // 3. NAVIGATION (MAP Fix bilan)
-    function showStep(step) {
-        groups.forEach(g => g.style.display = "none");
-        const activeGroup = document.querySelector(`.listening-group[data-step="${step}"]`);
-        if (activeGroup) {
-            activeGroup.style.display = "block";
-            document.getElementById("groupLabel").textContent = step;
-        }
-        window.scrollTo(0, 0);
+    if(el.tagName !== 'SELECT' && el.checked) el.closest('.opt-item').classList.add('active');
+
+    let val = el.value;
+    if(type === 'mcq_multi') {
+      val = Array.from(container.querySelectorAll('input:checked')).map(i => i.value).join(',');
     }
+    autosave.save(qid, val);
+  };
 
-    document.getElementById("btnNext").onclick = () => {
-        if (currentStep < groups.length) {
-            currentStep++;
-            showStep(currentStep);
+  // Oldin saqlangan javoblarni tiklash (sahifa yangilansa ham)
+  function restoreAnswers() {
+    const saved = JSON.parse(document.getElementById('savedAnswers').textContent);
+    Object.entries(saved).forEach(([qid, resp]) => {
+      const container = document.querySelector(`.options-container[data-qid="${qid}"]`);
+      if(!container) return;
+      const picked = resp.values || [resp.value ?? resp.text ?? ''];
+      container.querySelectorAll('input, select').forEach(el => {
+        if(el.type === 'radio' || el.type === 'checkbox') {
+          el.checked = picked.includes(el.value);
+          if(el.checked) el.closest('.opt-item').classList.add('active');
+        } else {
+          el.value = picked[0];
         }
-    };
+      });
+    });
+  }
 
-    document.getElementById("btnPrev").onclick = () => {
-        if (currentStep > 1) {
-            currentStep--;
-            showStep(currentStep);
-        }
-    };
-
-    // 4. AUTO-SAVE (Map tanlash muammosini hal qiladi)
-    document.addEventListener("change", (e) => {
-        if (e.target.hasAttribute("data-qid")) {
-            const qid = e.target.getAttribute("data-qid");
-            const val = e.target.value;
-            
-            fetch(SAVE_URL, {
-                method: "POST",
-                headers: { 
-                    "X-CSRFToken": CSRF_TOKEN,
-                    "Content-Type": "application/x-www-form-urlencoded" 
-                },
-                body: `question_id=${qid}&value=${encodeURIComponent(val)}`
-            });
-        }
+  function renderParts(){
+    parts.forEach((p, i) => p.style.display = (i + 1 === step) ? "block" : "none");
+    partLabel.textContent = step;
+    btnPrev.style.visibility = (step === 1) ? "hidden" : "visible";
+    btnNext.textContent = (step === parts.length) ? "Finish ✅" : "Next ➡️";
+    window.scrollTo(0,0);
+  }
+
+  btnStart.onclick = () => {
+    checkAudio.pause();
+    overlay.style.display = "none";
+    content.style.display = "block";
+    testStarted = true;
+    audio.play();
+    renderParts();
+
+    interval = setInterval(() => {
+      time--;
+      timerText.textContent = fmt(time);
+      if(time <= 0) finishTest(true);
+    }, 1000);
+  };
+
+  btnNext.onclick = () => {
+    if(step < parts.length){ step++; renderParts(); }
+    else finishTest();
+  };
+  btnPrev.onclick = () => { if(step > 1){ step--; renderParts(); } };
+
+  async function finishTest(force) {
+    if(allowEnd) return;
+    if(force !== true && !confirm("Testni yakunlaysizmi?")) return;
+    allowEnd = true;
+    audio.pause();
+    await autosave.flush();
+    const res = await fetch(cfg.submitUrl, {
+      method: 'POST',
+      headers: { 'X-CSRFToken': cfg.csrf }
     });
+    const data = await res.json();
+    window.location.href = data.redirect;
+  }
+  btnFinish.onclick = () => finishTest();
 
-    // 5. FINISH
-    async function finishTest() {
-        if(confirm("Testni yakunlaysizmi?")) {
-            const res = await fetch(SUBMIT_URL, {
-                method: "POST",
-                headers: { "X-CSRFToken": CSRF_TOKEN }
-            });
-            const data = await res.json();
-            window.location.href = data.redirect;
-        }
-    }
-    document.getElementById("btnFinish").onclick = finishTest;
-});
\ No newline at end of file
+  restoreAnswers();
+
+  // Audio security
+  audio.ontimeupdate = () => { if(!audio.seeking) lastGoodTime = audio.currentTime; };
+  audio.onseeking = () => { if(Math.abs(audio.currentTime - lastGoodTime) > 1.5) audio.currentTime = lastGoodTime; };
+  audio.onpause = () => { if(!allowEnd && testStarted) audio.play(); };
+})();
@@ -0,0 +1,125 @@
+// Reading test sahifasi. Konfiguratsiya #readingApp data-* atributlarida (templates/reading/test.html).
+(function(){
+  const cfg = document.getElementById("readingApp").dataset;
+  const TOTAL = Number(cfg.totalSeconds);
+
+  const timerText = document.getElementById("timerText");
+  const parts = Array.from(document.querySelectorAll(".reading-passage"));
+  const passageLabel = document.getElementById("passageLabel");
+  const btnPrev = document.getElementById("btnPrev");
+  const btnNext = document.getElementById("btnNext");
+  const btnFinish = document.getElementById("btnFinish");
+
+  let time = TOTAL;
+  let interval = null;
+  let step = 1;
+
+  function fmt(s){
+    const m = Math.floor(s/60);
+    const r = s%60;
+    return String(m).padStart(2,'0') + ":" + String(r).padStart(2,'0');
+  }
+  function showTime(){ timerText.textContent = fmt(time); }
+
+  function render(){
+    parts.forEach(p => p.style.display = (Number(p.dataset.step) === step) ? "" : "none");
+    passageLabel.textContent = String(step);
+    btnPrev.disabled = (step === 1);
+    btnNext.textContent = (step === parts.length) ? "Finish ✅" : "Next ➡️";
+  }
+
+  function startTimer(){
+    clearInterval(interval);
+    interval = setInterval(() => {
+      time--;
+      showTime();
+      if(time <= 0){
+        clearInterval(interval);
+        btnFinish.click();
+      }
+    }, 1000);
+  }
+
+  let leaving = false;
+  let submitting = false;
+
+  // holat serverda o'zgargan (submit boshqa tabda, sweeper, proktor): sahifa view i yo'naltiradi
+  function leave(state){
+    if(leaving || (state && state.status === "in_progress" && state.section === "reading")) return;
+    leaving = true;
+    clearInterval(interval);
+    window.location.href = "/reading/";
+  }
+
+  const saveStatus = document.getElementById("saveStatus");
+  const autosave = window.createAutosave(cfg.saveUrl, cfg.csrf, {
+    token: cfg.channelToken, channelSaveUrl: cfg.channelSaveUrl, onConflict: leave,
+    // 403: vaqt tugagan yoki attempt yopilgan — sahifa view i yo'naltiradi
+    onError: (status, data) => {
+      if(status === 403) leave(null);
+      else saveStatus.textContent = "Saqlanmadi: " + (data.error || status);
+    },
+  });
+
+  window.openExamChannel(cfg.channelUrl, {
+    onState: leave,
+    onTick: (t) => { if(t.remaining !== null){ time = t.remaining; showTime(); } },
+    onTimeUp: () => btnFinish.click(),
+  });
+
+  document.addEventListener("change", (e) => {
+    const el = e.target;
+
+    if(el.matches("[data-qid][data-qtype]")){
+      autosave.save(el.getAttribute("data-qid"), el.value || "");
+      return;
+    }
+
+    if(el.classList.contains("mcq-multi-opt")){
+      const wrap = el.closest("[data-qid][data-qtype='mcq_multi']");
+      if(!wrap) return;
+      const qid = wrap.getAttribute("data-qid");
+      const values = Array.from(wrap.querySelectorAll(".mcq-multi-opt:checked")).map(x => x.value);
+      autosave.save(qid, values.join(","));
+    }
+  });
+
+  btnPrev.addEventListener("click", () => { if(step>1){ step--; render(); }});
+  btnNext.addEventListener("click", () => { if(step<parts.length){ step++; render(); } else { btnFinish.click(); }});
+
+  btnFinish.addEventListener("click", async () => {
+    // taymer, time_up eventi va tugma bir vaqtda chaqirishi mumkin — submit bir marta
+    if(submitting) return;
+    submitting = true;
+    clearInterval(interval);
+    try{
+      await autosave.flush();
+      const res = await fetch(cfg.submitUrl, { method: "POST", headers: { "X-CSRFToken": cfg.csrf } });
+      const data = await res.json();
+      window.location.href = data.redirect || "/writing/";
+    }catch(e){
+      window.location.href = "/writing/";
+    }
+  });
+
+  // Oldin saqlangan javoblarni tiklash
+  function restoreAnswers(){
+    const saved = JSON.parse(document.getElementById("savedAnswers").textContent);
+    Object.entries(saved).forEach(([qid, resp]) => {
+      const el = document.querySelector(`[data-qid="${qid}"]`);
+      if(!el) return;
+      if(el.dataset.qtype === "mcq_multi"){
+        const values = resp.values || [];
+        el.querySelectorAll(".mcq-multi-opt").forEach(x => { x.checked = values.includes(x.value); });
+      } else {
+        el.value = resp.value ?? resp.text ?? "";
+      }
+    });
+  }
+
+  // init
+  restoreAnswers();
+  showTime();
+  render();
+  startTimer();
+})();
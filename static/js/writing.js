@@ -0,0 +1,190 @@
+// Writing sahifasi. Konfiguratsiya #writingApp data-* atributlarida (templates/writing/test.html).
+// Autosave butun esseni emas, serverda tasdiqlangan matnga nisbatan bitta splice patch
+// yuboradi: [at, delete, insert] (code point bo'yicha) va base = server versiyasi
+// (writing/essays.py). Har task uchun bir vaqtda bitta so'rov; versiya mos kelmasa server
+// o'z matnini qaytaradi va joriy matn shu versiya ustiga qayta diff qilinadi.
+(function(){
+  const cfg = document.getElementById("writingApp").dataset;
+  const FLUSH_MS = 1500;
+  const HEARTBEAT_MS = 30000;
+
+  const timerText = document.getElementById("timerText");
+  const btnFinish = document.getElementById("btnFinish");
+  const url = cfg.channelToken ? cfg.channelSaveUrl : cfg.saveUrl;
+  const headers = cfg.channelToken
+    ? { "X-Attempt-Token": cfg.channelToken, "Content-Type": "application/json" }
+    : { "X-CSRFToken": cfg.csrf, "Content-Type": "application/json" };
+
+  let time = Number(cfg.totalSeconds);
+  let interval = null;
+  let flushTimer = null;
+  let inFlight = null;
+  let lastSent = Date.now();
+  let leaving = false;
+  let submitting = false;
+
+  // task id -> {el, acked: server matni, version}
+  const essays = new Map();
+  const saved = JSON.parse(document.getElementById("savedEssays").textContent);
+
+  function fmt(s){
+    const m = Math.floor(s/60);
+    const r = s%60;
+    return String(m).padStart(2,'0') + ":" + String(r).padStart(2,'0');
+  }
+  function showTime(){ timerText.textContent = fmt(Math.max(0, time)); }
+
+  function countWords(text){
+    const trimmed = text.trim();
+    return trimmed ? trimmed.split(/\s+/).length : 0;
+  }
+
+  function showWords(taskId, words){
+    const el = document.querySelector(`[data-word-count="${taskId}"]`);
+    if(el) el.textContent = String(words);
+  }
+
+  function showStatus(taskId, text){
+    const el = document.querySelector(`[data-save-status="${taskId}"]`);
+    if(el) el.textContent = text;
+  }
+
+  // eski va yangi matn orasidagi bitta splice: umumiy prefiks va suffiksdan tashqari qism
+  function diff(before, after){
+    const a = Array.from(before), b = Array.from(after);
+    let start = 0;
+    while(start < a.length && start < b.length && a[start] === b[start]) start++;
+    let endA = a.length, endB = b.length;
+    while(endA > start && endB > start && a[endA-1] === b[endB-1]){ endA--; endB--; }
+    if(start === endA && start === endB) return null;
+    return [start, endA - start, b.slice(start, endB).join("")];
+  }
+
+  function pendingPatches(){
+    const patches = [];
+    essays.forEach((essay, taskId) => {
+      const op = diff(essay.acked, essay.el.value);
+      if(op) patches.push({task: Number(taskId), base: essay.version, ops: [op], text: essay.el.value});
+    });
+    return patches;
+  }
+
+  function post(patches, keepalive){
+    lastSent = Date.now();
+    return fetch(url, {
+      method: "POST",
+      keepalive: !!keepalive,
+      headers,
+      body: JSON.stringify({patches: patches.map(({task, base, ops}) => ({task, base, ops}))})
+    });
+  }
+
+  function applyResult(patches, data){
+    patches.forEach(p => {
+      const essay = essays.get(String(p.task));
+      const ok = data.saved && data.saved[p.task];
+      const conflict = data.conflicts && data.conflicts[p.task];
+      if(ok){
+        essay.acked = p.text;
+        essay.version = ok.version;
+        showStatus(p.task, "Saqlandi");
+      } else if(conflict){
+        // server versiyasi ustiga qayta diff — joriy matn yo'qolmaydi
+        essay.acked = conflict.text;
+        essay.version = conflict.version;
+        schedule();
+      }
+    });
+  }
+
+  function flush(keepalive){
+    clearTimeout(flushTimer);
+    flushTimer = null;
+    if(inFlight) return inFlight.then(() => flush(keepalive));
+    const patches = pendingPatches();
+    if(!patches.length) return Promise.resolve();
+
+    patches.forEach(p => showStatus(p.task, "Saqlanmoqda…"));
+    inFlight = post(patches, keepalive)
+      .then((res) => {
+        if(res.status === 409){ res.json().then((data) => leave(data.state)); return; }
+        if(res.status === 403){ leave(null); return; }
+        return res.json().then((data) => applyResult(patches, data));
+      })
+      .catch(() => {
+        patches.forEach(p => showStatus(p.task, "Tarmoq xatosi"));
+        schedule();
+      })
+      .finally(() => { inFlight = null; });
+    return inFlight;
+  }
+
+  function schedule(){
+    if(!flushTimer) flushTimer = setTimeout(flush, FLUSH_MS);
+  }
+
+  // holat serverda o'zgargan (sweeper, proktor, boshqa tab): sahifa view i yo'naltiradi
+  function leave(state){
+    if(leaving || (state && state.status === "in_progress" && state.section === "writing")) return;
+    leaving = true;
+    clearInterval(interval);
+    window.location.href = "/writing/";
+  }
+
+  function startTimer(){
+    clearInterval(interval);
+    interval = setInterval(() => {
+      time--;
+      showTime();
+      if(time <= 0){
+        clearInterval(interval);
+        btnFinish.click();
+      }
+    }, 1000);
+  }
+
+  document.querySelectorAll(".writing-essay").forEach(el => {
+    const taskId = el.dataset.task;
+    const state = saved[taskId] || {text: "", version: 0, words: 0};
+    el.value = state.text;
+    essays.set(taskId, {el, acked: state.text, version: state.version});
+    showWords(taskId, state.words);
+    el.addEventListener("input", () => {
+      showWords(taskId, countWords(el.value));
+      schedule();
+    });
+  });
+
+  window.openExamChannel(cfg.channelUrl, {
+    onState: leave,
+    onTick: (t) => { if(t.remaining !== null){ time = t.remaining; showTime(); } },
+    onTimeUp: () => btnFinish.click(),
+  });
+
+  if(cfg.channelToken){
+    setInterval(() => {
+      if(!flushTimer && !inFlight && Date.now() - lastSent >= HEARTBEAT_MS) post([]).catch(() => {});
+    }, HEARTBEAT_MS);
+  }
+
+  btnFinish.addEventListener("click", async () => {
+    // taymer, time_up eventi va tugma bir vaqtda chaqirishi mumkin — submit bir marta
+    if(submitting) return;
+    submitting = true;
+    clearInterval(interval);
+    leaving = true;
+    try{
+      await flush();
+      const res = await fetch(cfg.submitUrl, { method: "POST", headers: { "X-CSRFToken": cfg.csrf } });
+      const data = await res.json();
+      window.location.href = data.redirect || "/mocks/";
+    }catch(e){
+      window.location.href = "/mocks/";
+    }
+  });
+
+  window.addEventListener("pagehide", () => { if(!leaving) flush(true); });
+
+  showTime();
+  startTimer();
+})();
@@ -1,3 +1,15 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import WritingAnswer
+
+
+@admin.register(WritingAnswer)
+class WritingAnswerAdmin(admin.ModelAdmin):
+    list_display = ("attempt", "task", "word_count", "min_words", "version", "updated_at")
+    list_select_related = ("task",)
+    raw_id_fields = ("attempt", "task")
+    readonly_fields = ("version", "word_count", "created_at", "updated_at")
+
+    @admin.display(description="Min words")
+    def min_words(self, obj):
+        return obj.task.min_words
@@ -0,0 +1,150 @@
+"""
+Writing esselarini patch bilan saqlash.
+
+Klient har autosave da butun esseni emas, oxirgi tasdiqlangan (ack) matnga nisbatan
+o'zgarishni yuboradi:
+
+    {"patches": [{"task": 7, "base": 12, "ops": [[at, delete, insert], ...]}]}
+
+at/delete — Unicode belgilar (code point) bo'yicha, ops ketma-ket qo'llanadi. base —
+klient ko'rgan WritingAnswer.version (hali yozuv yo'q bo'lsa 0). Server versiya mos
+kelsagina qo'llaydi: UPDATE ... WHERE version = base (compare-and-swap, qator lock siz).
+Mos kelmasa (boshqa tab, qayta yuborilgan eski so'rov) patch rad etiladi va javobda
+serverdagi matn qaytadi — klient o'z matnini shu versiya ustiga qayta diff qiladi.
+
+word_count to'liq qayta sanalmaydi: patch oynasi bo'sh joy chegaralarigacha kengaytiriladi
+va faqat shu oynadagi so'zlar farqi qo'shiladi (oynadan tashqaridagi so'zlarga tegmaydi).
+So'z — bo'sh joy bilan ajratilgan qism (str.split), klientdagi hisob bilan bir xil.
+"""
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import WritingAnswer, WritingTask
+
+MAX_PATCHES = 10
+MAX_OPS = 50
+MAX_ESSAY_CHARS = 20000
+
+
+class PatchError(ValueError):
+    pass
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def splice(text: str, word_count: int, at: int, delete: int, insert: str) -> tuple[str, int]:
+    """text[at:at+delete] ni insert bilan almashtiradi; (yangi matn, yangi so'zlar soni)."""
+    end = at + delete
+    if at < 0 or delete < 0 or end > len(text):
+        raise PatchError("patch out of range")
+    lo = at
+    while lo > 0 and not text[lo - 1].isspace():
+        lo -= 1
+    hi = end
+    while hi < len(text) and not text[hi].isspace():
+        hi += 1
+    before = count_words(text[lo:hi])
+    after = count_words(text[lo:at] + insert + text[end:hi])
+    return text[:at] + insert + text[end:], word_count - before + after
+
+
+def apply_ops(text: str, word_count: int, ops) -> tuple[str, int]:
+    for at, delete, insert in ops:
+        text, word_count = splice(text, word_count, at, delete, insert)
+    if len(text) > getattr(settings, "WRITING_MAX_ESSAY_CHARS", MAX_ESSAY_CHARS):
+        raise PatchError("essay too long")
+    return text, word_count
+
+
+def parse_patches(body: bytes) -> list | None:
+    """[(task_id, base, ops), ...] yoki noto'g'ri body bo'lsa None."""
+    try:
+        items = json.loads(body or b"{}")["patches"]
+    except (ValueError, KeyError, TypeError):
+        return None
+    if not isinstance(items, list) or len(items) > MAX_PATCHES:
+        return None
+
+    patches = []
+    for item in items:
+        try:
+            task_id, base, ops = int(item["task"]), int(item["base"]), item["ops"]
+            if not isinstance(ops, list) or len(ops) > MAX_OPS:
+                return None
+            ops = [(int(at), int(delete), str(insert)) for at, delete, insert in ops]
+        except (KeyError, TypeError, ValueError):
+            return None
+        patches.append((task_id, base, ops))
+    return patches
+
+
+def _essay(row) -> dict:
+    return {"version": row["version"], "words": row["word_count"], "text": row["text"]}
+
+
+def save_patches(attempt_id: int, test_id: int, patches) -> dict:
+    """
+    Patchlarni qo'llaydi. So'rovlar: testning tasklari, attemptning esselari va har
+    patchga bitta UPDATE (yoki birinchi saqlashda INSERT).
+    Qaytaradi: {"saved": {task: {version, words}}, "conflicts": {task: {version, words, text}},
+    "rejected": [task, ...]}.
+    """
+    min_words = dict(WritingTask.objects.filter(test_id=test_id).values_list("id", "min_words"))
+    rows = {
+        row["task_id"]: row
+        for row in WritingAnswer.objects
+        .filter(attempt_id=attempt_id, task_id__in=[task_id for task_id, _, _ in patches])
+        .values("id", "task_id", "text", "version", "word_count")
+    }
+
+    result = {"saved": {}, "conflicts": {}, "rejected": []}
+    for task_id, base, ops in patches:
+        if task_id not in min_words:
+            result["rejected"].append(task_id)
+            continue
+        row = rows.get(task_id) or {"id": None, "text": "", "version": 0, "word_count": 0}
+        if row["version"] != base:
+            result["conflicts"][task_id] = _essay(row)
+            continue
+        try:
+            text, words = apply_ops(row["text"], row["word_count"], ops)
+        except PatchError:
+            result["rejected"].append(task_id)
+            continue
+
+        if row["id"] is None:
+            try:
+                with transaction.atomic():
+                    WritingAnswer.objects.create(
+                        attempt_id=attempt_id, task_id=task_id, text=text, version=1, word_count=words,
+                    )
+                saved = True
+            except IntegrityError:
+                saved = False  # boshqa so'rov birinchi bo'lib yaratdi
+        else:
+            # .update() auto_now ni qo'ymaydi — updated_at qo'lda
+            saved = WritingAnswer.objects.filter(id=row["id"], version=base).update(
+                text=text, version=base + 1, word_count=words, updated_at=timezone.now(),
+            ) == 1
+        if not saved:
+            current = WritingAnswer.objects.filter(attempt_id=attempt_id, task_id=task_id).values(
+                "text", "version", "word_count").first()
+            result["conflicts"][task_id] = _essay(current)
+            continue
+        rows[task_id] = {"id": row["id"], "text": text, "version": base + 1, "word_count": words}
+        result["saved"][task_id] = {"version": base + 1, "words": words, "min_words": min_words[task_id]}
+    return result
+
+
+def load_essays(attempt_id: int) -> dict:
+    """{task_id: {version, words, text}} — sahifa ochilganda klient shu holatdan boshlaydi."""
+    return {
+        row["task_id"]: _essay(row)
+        for row in WritingAnswer.objects.filter(attempt_id=attempt_id).values(
+            "task_id", "text", "version", "word_count")
+    }
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attempts', '0006_attempt_user'),
+        ('writing', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WritingAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField(blank=True)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('word_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('attempt', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='writing_answers', to='attempts.attempt')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='writing.writingtask')),
+            ],
+            options={
+                'unique_together': {('attempt', 'task')},
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from attempts.models import Attempt
 from mocks.models import MockSection
 
 class WritingTest(models.Model):
@@ -19,3 +20,22 @@ class WritingTask(models.Model):
     class Meta:
         unique_together = ("test", "task_number")
         ordering = ["task_number"]
+
+
+class WritingAnswer(models.Model):
+    """
+    Attempt + task bo'yicha esse. Autosave patch yuboradi (writing/essays.py): version har
+    saqlashda oshadi, patch faqat shu versiyaga nisbatan qabul qilinadi; word_count patch
+    oynasi bo'yicha inkremental yuritiladi.
+    """
+    # (attempt, task) unique indeksi attempt bo'yicha qidiruvni ham qoplaydi
+    attempt = models.ForeignKey(Attempt, on_delete=models.CASCADE, related_name="writing_answers", db_index=False)
+    task = models.ForeignKey(WritingTask, on_delete=models.CASCADE, related_name="answers")
+    text = models.TextField(blank=True)
+    version = models.PositiveIntegerField(default=0)
+    word_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("attempt", "task")
@@ -1,3 +1,172 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import Client, TestCase, override_settings
+from django.urls import resolve
+from django.utils import timezone
+
+from attempts.context import DEFAULT_SECTION_SECONDS
+from attempts.models import Attempt
+from attempts.tests import make_mock, reload_urls
+from config.instrumentation import capture_requests
+
+from .essays import PatchError, apply_ops, count_words, splice
+from .models import WritingAnswer, WritingTask, WritingTest
+
+
+class SpliceTests(TestCase):
+    def test_word_count_is_updated_from_the_patch_window(self):
+        cases = [
+            ("", (0, 0, "hello world")),
+            ("hello world", (5, 0, " big")),        # yangi so'z
+            ("hello world", (3, 0, "p")),           # so'z ichida: soni o'zgarmaydi
+            ("hello world", (5, 1, "")),            # ikki so'z qo'shildi
+            ("hello  world", (0, 12, "")),
+            ("one two three", (4, 3, "2 and a bit")),
+            ("tail", (4, 0, " ")),
+            ("salom, dunyo", (7, 5, "o'zbekiston bo'ylab")),
+        ]
+        for text, (at, delete, insert) in cases:
+            new_text, words = splice(text, count_words(text), at, delete, insert)
+            self.assertEqual(new_text, text[:at] + insert + text[at + delete:])
+            self.assertEqual(words, count_words(new_text), (text, at, delete, insert))
+
+    def test_out_of_range_patch_is_rejected(self):
+        with self.assertRaises(PatchError):
+            apply_ops("abc", 1, [(2, 5, "")])
+        with self.assertRaises(PatchError):
+            apply_ops("abc", 1, [(-1, 0, "x")])
+
+
+class WritingSectionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches["channel"].clear()
+        self.mock = make_mock()
+        test = WritingTest.objects.create(section=self.mock.sections.get(section="writing"))
+        self.task1 = WritingTask.objects.create(test=test, task_number=1, prompt="Describe the chart.")
+        self.task2 = WritingTask.objects.create(test=test, task_number=2, prompt="Discuss.", min_words=250)
+
+        self.user = get_user_model().objects.create_user("candidate", password="pass12345")
+        self.client.force_login(self.user)
+        self.client.get(f"/mocks/{self.mock.slug}/start/?section={self.mock.sections.get(section='writing').id}")
+        self.attempt = Attempt.objects.get(mock=self.mock)
+
+    def save(self, *patches, client=None, **headers):
+        return (client or self.client).post(
+            "/writing/save/" if client is None else "/writing/channel/save/",
+            {"patches": [{"task": task, "base": base, "ops": ops} for task, base, ops in patches]},
+            content_type="application/json", **headers,
+        )
+
+    def test_unset_duration_still_gets_server_deadline(self):
+        writing = self.mock.sections.get(section="writing")
+        writing.duration_seconds = 0
+        writing.save(update_fields=["duration_seconds"])
+        self.client.logout()  # yangi sessiya: oldingi attempt terminate qilinmaydi
+        self.client.force_login(self.user)
+        self.client.get(f"/mocks/{self.mock.slug}/start/?section={writing.id}")
+        attempt = Attempt.objects.filter(mock=self.mock).latest("id")
+
+        remaining = (attempt.section_deadline - timezone.now()).total_seconds()
+        self.assertAlmostEqual(remaining, DEFAULT_SECTION_SECONDS["writing"], delta=5)
+        # sahifa taymeri server deadline i bilan bir xil
+        self.assertAlmostEqual(self.client.get("/writing/").context["total_seconds"], remaining, delta=5)
+
+    def test_page_renders_saved_essays(self):
+        self.save((self.task1.id, 0, [[0, 0, "The chart shows"]]))
+        res = self.client.get("/writing/")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([t.id for t in res.context["tasks"]], [self.task1.id, self.task2.id])
+        self.assertEqual(res.context["essays"][self.task1.id], {"version": 1, "words": 3, "text": "The chart shows"})
+
+    def test_patches_apply_in_order_and_track_words(self):
+        res = self.save((self.task1.id, 0, [[0, 0, "The chart shows sales"]]))
+        self.assertEqual(res.json()["saved"][str(self.task1.id)], {"version": 1, "words": 4, "min_words": 150})
+        res = self.save((self.task1.id, 1, [[15, 0, " yearly"], [4, 5, "graph"]]))
+        self.assertEqual(res.json()["saved"][str(self.task1.id)]["version"], 2)
+
+        essay = WritingAnswer.objects.get(attempt=self.attempt, task=self.task1)
+        self.assertEqual((essay.text, essay.version, essay.word_count), ("The graph shows yearly sales", 2, 5))
+
+    def test_patch_save_bumps_updated_at(self):
+        self.save((self.task1.id, 0, [[0, 0, "draft"]]))
+        first = WritingAnswer.objects.get(task=self.task1).updated_at
+        self.save((self.task1.id, 1, [[5, 0, " two"]]))
+        self.assertGreater(WritingAnswer.objects.get(task=self.task1).updated_at, first)
+
+    def test_stale_base_returns_server_text(self):
+        self.save((self.task1.id, 0, [[0, 0, "first tab"]]))
+        res = self.save((self.task1.id, 0, [[0, 0, "second tab"]]))
+        body = res.json()
+        self.assertEqual(body["saved"], {})
+        self.assertEqual(body["conflicts"][str(self.task1.id)], {"version": 1, "words": 2, "text": "first tab"})
+        self.assertEqual(WritingAnswer.objects.get(task=self.task1).text, "first tab")
+
+    def test_invalid_patches(self):
+        other = WritingTask.objects.create(
+            test=WritingTest.objects.create(section=make_mock("mock-2").sections.get(section="writing")),
+            task_number=1, prompt="x",
+        )
+        res = self.save((other.id, 0, [[0, 0, "x"]]), (self.task2.id, 0, [[3, 0, "x"]]))
+        self.assertEqual(res.json()["rejected"], [other.id, self.task2.id])
+        self.assertEqual(self.client.post("/writing/save/", "nope", content_type="application/json").status_code, 400)
+        self.assertFalse(WritingAnswer.objects.exists())
+
+    def test_save_query_budget(self):
+        self.save((self.task1.id, 0, [[0, 0, "warm"]]))
+        with capture_requests() as records:
+            self.save((self.task1.id, 1, [[4, 0, " up"]]), (self.task2.id, 0, [[0, 0, "essay"]]))
+        # tasklar, esselar, UPDATE, INSERT (savepoint bilan)
+        self.assertLessEqual(records[0]["queries"], 6)
+
+    def test_channel_save_with_token(self):
+        token = self.client.get("/writing/").context["channel_token"]
+        anonymous = Client(enforce_csrf_checks=True)
+        res = self.save((self.task2.id, 0, [[0, 0, "via channel"]]), client=anonymous, HTTP_X_ATTEMPT_TOKEN=token)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(WritingAnswer.objects.get(task=self.task2).word_count, 2)
+        self.assertEqual(self.save(client=anonymous, HTTP_X_ATTEMPT_TOKEN=token).json()["saved"], {})  # heartbeat
+
+    def test_submit_finishes_attempt(self):
+        res = self.client.post("/writing/submit/")
+        self.assertEqual(res.json()["redirect"], f"/attempts/{self.attempt.id}/result/")
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.status, "submitted")
+        self.assertIsNotNone(self.attempt.finished_at)
+        self.assertEqual(self.save((self.task1.id, 0, [[0, 0, "late"]])).status_code, 403)
+        self.assertEqual(json.loads(self.client.post("/writing/submit/").content)["ok"], False)
+
+
+class AsyncWritingTests(TestCase):
+    def setUp(self):
+        self.addCleanup(reload_urls)
+        self.enterContext(override_settings(ASYNC_VIEWS=True))
+        reload_urls()
+        self.mock = make_mock()
+        writing = self.mock.sections.get(section="writing")
+        self.task = WritingTask.objects.create(test=WritingTest.objects.create(section=writing), task_number=1,
+                                               prompt="Describe.")
+        self.user = get_user_model().objects.create_user("candidate", password="pass12345")
+        self.start_url = f"/mocks/{self.mock.slug}/start/?section={writing.id}"
+
+    async def test_save_and_submit(self):
+        self.assertTrue(resolve("/writing/save/").func.__name__.endswith("_async"))
+        client = self.async_client
+        await client.aforce_login(self.user)
+        await client.get(self.start_url)
+
+        for base, ops in ((0, [[0, 0, "async essay"]]), (1, [[5, 6, ""]])):
+            response = await client.post(
+                "/writing/save/", {"patches": [{"task": self.task.id, "base": base, "ops": ops}]},
+                content_type="application/json",
+            )
+        self.assertEqual(response.json()["saved"][str(self.task.id)]["words"], 1)
+        essay = await WritingAnswer.objects.aget(task=self.task)
+        self.assertEqual((essay.text, essay.version), ("async", 2))
+
+        response = await client.post("/writing/submit/")
+        attempt = await Attempt.objects.aget(mock=self.mock)
+        self.assertEqual(response.json()["redirect"], f"/attempts/{attempt.id}/result/")
+        self.assertEqual(attempt.status, "submitted")
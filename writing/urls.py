@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.urls import path
+from . import views
+
+# ASYNC_VIEWS (ASGI profili): autosave/kanal/submit/terminate async variantlari
+if settings.ASYNC_VIEWS:
+    save, channel_save, submit, terminate = (
+        views.writing_save_async, views.writing_channel_save_async,
+        views.writing_submit_async, views.writing_terminate_async,
+    )
+else:
+    save, channel_save, submit, terminate = (
+        views.writing_save, views.writing_channel_save,
+        views.writing_submit, views.writing_terminate,
+    )
+
+urlpatterns = [
+    path("", views.writing_page, name="writing_page"),
+    path("save/", save, name="writing_save"),
+    path("channel/save/", channel_save, name="writing_channel_save"),
+    path("submit/", submit, name="writing_submit"),
+    path("terminate/", terminate, name="writing_terminate"),
+]
@@ -1,3 +1,156 @@
-from django.shortcuts import render
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST, require_http_methods
 
-# Create your views here.
+from attempts import answer_buffer
+from attempts.channel import channel_token_required, issue_token
+from attempts.context import (
+    DEFAULT_SECTION_SECONDS, aadvance_section, advance_section, astore_context, attempt_required, get_context,
+    refresh_context, section_url, store_context,
+)
+from attempts.models import Attempt
+from .essays import load_essays, parse_patches, save_patches
+from .models import WritingTest
+
+# bo'sh patchlar ro'yxati (kanal heartbeat) — DB ga murojaat yo'q
+_EMPTY = {"saved": {}, "conflicts": {}, "rejected": []}
+
+def _get_active_attempt(request):
+    attempt_id = request.session.get("active_attempt_id")
+    if not attempt_id:
+        return None
+    return Attempt.objects.select_related("mock").filter(id=attempt_id).first()
+
+async def _aget_active_attempt(request):
+    attempt_id = await request.session.aget("active_attempt_id")
+    if not attempt_id:
+        return None
+    return await Attempt.objects.select_related("mock").filter(id=attempt_id).afirst()
+
+@login_required
+@require_http_methods(["GET"])
+def writing_page(request):
+    ctx = get_context(request)
+    if not ctx:
+        return redirect("mock_list")
+    ctx = refresh_context(request, ctx)
+    if ctx.status != "in_progress" or ctx.current_section != "writing":
+        return redirect("mock_detail", slug=ctx.mock_slug)
+
+    test = get_object_or_404(WritingTest.objects.select_related("section__mock"), id=ctx.test_id)
+
+    return render(request, "writing/test.html", {
+        "mock": test.section.mock,
+        "test": test,
+        "tasks": list(test.tasks.all()),
+        "essays": load_essays(ctx.attempt_id),
+        "total_seconds": ctx.remaining_seconds(test.section.duration_seconds or DEFAULT_SECTION_SECONDS["writing"]),
+        "channel_token": issue_token(ctx),
+    })
+
+@attempt_required("writing")
+@require_POST
+def writing_save(request):
+    """Esse autosave: patchlar versiya tekshiruvi bilan qo'llanadi (writing/essays.py)."""
+    return _save_patches(request)
+
+@attempt_required("writing")
+@require_POST
+async def writing_save_async(request):
+    """writing_save ning async varianti (ASYNC_VIEWS)."""
+    return await _asave_patches(request)
+
+
+@csrf_exempt
+@channel_token_required("writing")
+@require_POST
+def writing_channel_save(request):
+    """Exam kanali orqali autosave (X-Attempt-Token). Bo'sh patchlar ro'yxati — heartbeat."""
+    return _save_patches(request)
+
+
+@csrf_exempt
+@channel_token_required("writing")
+@require_POST
+async def writing_channel_save_async(request):
+    return await _asave_patches(request)
+
+
+def _save_patches(request):
+    ctx = request.attempt_ctx
+    patches = parse_patches(request.body)
+    if patches is None:
+        return JsonResponse({"ok": False, "error": "invalid patches"}, status=400)
+    result = save_patches(ctx.attempt_id, ctx.test_id, patches) if patches else _EMPTY
+    return JsonResponse({"ok": True, **result})
+
+
+async def _asave_patches(request):
+    ctx = request.attempt_ctx
+    patches = parse_patches(request.body)
+    if patches is None:
+        return JsonResponse({"ok": False, "error": "invalid patches"}, status=400)
+    # bitta sync_to_async: o'qish, compare-and-swap va INSERT bir thread da
+    result = await sync_to_async(save_patches)(ctx.attempt_id, ctx.test_id, patches) if patches else _EMPTY
+    return JsonResponse({"ok": True, **result})
+
+@login_required
+@require_POST
+def writing_submit(request):
+    attempt = _get_active_attempt(request)
+    if not attempt or attempt.status != "in_progress" or attempt.current_section != "writing":
+        return JsonResponse({"ok": False, "redirect": "/mocks/"}, status=400)
+
+    # speaking runtime yo'q: writing oxirgi section — attempt yakunlanadi
+    advance_section(attempt, "writing", None)
+    store_context(request, attempt)
+    return JsonResponse({"ok": True, "redirect": section_url(attempt)})
+
+@login_required
+@require_POST
+def writing_terminate(request):
+    attempt = _get_active_attempt(request)
+    if not attempt:
+        return JsonResponse({"ok": False, "redirect": "/mocks/"}, status=400)
+
+    answer_buffer.flush_attempt(attempt.id)
+    if attempt.status == "in_progress":
+        attempt.status = "terminated"
+        attempt.finished_at = timezone.now()
+        attempt.save(update_fields=["status", "finished_at"])
+    store_context(request, attempt)
+
+    return JsonResponse({"ok": True, "redirect": f"/mocks/{attempt.mock.slug}/"})
+
+@login_required
+@require_POST
+async def writing_submit_async(request):
+    """writing_submit ning async varianti (ASYNC_VIEWS)."""
+    attempt = await _aget_active_attempt(request)
+    if not attempt or attempt.status != "in_progress" or attempt.current_section != "writing":
+        return JsonResponse({"ok": False, "redirect": "/mocks/"}, status=400)
+
+    await aadvance_section(attempt, "writing", None)
+    await astore_context(request, attempt)
+    return JsonResponse({"ok": True, "redirect": section_url(attempt)})
+
+@login_required
+@require_POST
+async def writing_terminate_async(request):
+    """writing_terminate ning async varianti (ASYNC_VIEWS)."""
+    attempt = await _aget_active_attempt(request)
+    if not attempt:
+        return JsonResponse({"ok": False, "redirect": "/mocks/"}, status=400)
+
+    await answer_buffer.aflush_attempt(attempt.id)
+    if attempt.status == "in_progress":
+        attempt.status = "terminated"
+        attempt.finished_at = timezone.now()
+        await attempt.asave(update_fields=["status", "finished_at"])
+    await astore_context(request, attempt)
+
+    return JsonResponse({"ok": True, "redirect": f"/mocks/{attempt.mock.slug}/"})